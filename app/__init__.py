@@ -13,14 +13,50 @@ def create_app(config_class='config.Config'):
     app = Flask(__name__)
     app.config.from_object(config_class)
     
+    # Stream uploads to disk, hashing and checking limits as they arrive
+    from app.utils.upload_utils import UploadRequest
+    app.request_class = UploadRequest
+    
     # Initialize extensions
     csrf.init_app(app)
     
+    from app.utils.logging_utils import init_request_ids
+    from app.utils.metrics import metrics
+    from app.utils.profiling import request_profiler
+    init_request_ids(app)
+    metrics.init_app(app)
+    request_profiler.init_app(app)
+    
+    from app.services.attachment_cache import attachment_cache
+    from app.services.bullet_ranker import bullet_library
+    from app.services.conversion_cache import conversion_cache
+    from app.services.conversion_pool import conversion_pool
+    from app.services.document_executor import document_executor
+    from app.services.job_service import job_manager
+    from app.services.outbox import email_outbox
+    from app.services.result_cache import result_cache
+    from app.services.skill_index import skill_catalog
+    from app.services.smtp_pool import smtp_pool
+    from app.services.workspace import workspaces
+    attachment_cache.init_app(app)
+    bullet_library.init_app(app)
+    conversion_cache.init_app(app)
+    conversion_pool.init_app(app)
+    document_executor.init_app(app)
+    job_manager.init_app(app)
+    email_outbox.init_app(app)
+    result_cache.init_app(app)
+    skill_catalog.init_app(app)
+    smtp_pool.init_app(app)
+    workspaces.init_app(app)
+    
     # Register blueprints
     from app.routes.views import main_bp
     from app.routes.api import api_bp
+    from app.routes.admin import admin_bp
     app.register_blueprint(main_bp)
     app.register_blueprint(api_bp, url_prefix='/api')
+    app.register_blueprint(admin_bp, url_prefix='/admin')
     
     # Ensure upload folder exists
     os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
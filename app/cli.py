@@ -0,0 +1,319 @@
+"""
+Headless batch tailoring, without the web server.
+
+Run with ``python -m app.cli manifest.jsonl``. Each manifest row names a
+resume, the tech stacks to inject and an output path; rows may also give an
+``email`` recipient. A CSV manifest has the columns resume, output,
+tech_stacks (a JSON object) and optionally email; a JSONL manifest has one
+object per line with the same keys. Relative paths are resolved against the
+manifest's directory.
+
+Rows run on a process pool; a .doc resume is converted once beforehand,
+however many rows use it. Every finished row is appended to a checkpoint
+file, so running the same command again after an interruption skips the
+rows that already succeeded and retries the rest.
+"""
+
+import argparse
+import concurrent.futures
+import csv
+import json
+import logging
+import os
+import shutil
+import signal
+import sys
+import tempfile
+import threading
+import time
+from types import SimpleNamespace
+from typing import Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Config keys the worker processes need; the rest of the app is not started there
+WORKER_CONFIG_PREFIXES = ('CONVERSION_', 'LIBREOFFICE_', 'SMTP_')
+
+
+def read_manifest(path: str) -> List[dict]:
+    """Load and validate manifest rows from a .csv or .jsonl file"""
+    base = os.path.dirname(os.path.abspath(path))
+    with open(path, encoding='utf-8', newline='') as f:
+        if path.lower().endswith('.csv'):
+            rows = list(csv.DictReader(f))
+        else:
+            rows = [json.loads(line) for line in f if line.strip()]
+
+    manifest = []
+    outputs = set()
+    for number, row in enumerate(rows, 1):
+        try:
+            tech_stacks = row['tech_stacks']
+            if isinstance(tech_stacks, str):
+                tech_stacks = json.loads(tech_stacks)
+            entry = {
+                'resume': os.path.join(base, row['resume']),
+                'output': os.path.join(base, row['output']),
+                'tech_stacks': tech_stacks,
+                'email': row.get('email') or None,
+            }
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"Manifest row {number} is invalid: {e}") from e
+        if not isinstance(tech_stacks, dict):
+            raise ValueError(f"Manifest row {number}: tech_stacks must be an object")
+        if not entry['output'].lower().endswith('.docx'):
+            raise ValueError(f"Manifest row {number}: output must be a .docx path")
+        if entry['output'] in outputs:
+            raise ValueError(f"Manifest row {number}: output {row['output']} is listed twice")
+        outputs.add(entry['output'])
+        manifest.append(entry)
+    return manifest
+
+
+class Checkpoint:
+    """Append-only JSONL record of finished rows, keyed by output path"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.done: Set[str] = set()
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # A line cut short by a crash; that row simply runs again
+                        continue
+                    if record.get('status') == 'done':
+                        self.done.add(record['output'])
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def record(self, output: str, files: Optional[List[str]] = None, error: Optional[str] = None):
+        """Persist one row's outcome before moving on"""
+        entry = {'output': output, 'status': 'failed' if error else 'done', 'time': time.time()}
+        if error:
+            entry['error'] = error
+        else:
+            entry['files'] = files
+            self.done.add(output)
+        self._file.write(json.dumps(entry) + '\n')
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self):
+        self._file.close()
+
+
+def _init_worker(config: dict, instance_path: str):
+    """Configure the conversion and SMTP pools inside a worker process"""
+    # Ctrl-C is handled by the parent, which lets the running rows finish
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    from app.services.document_executor import _init_worker as init_document_worker
+    from app.services.smtp_pool import smtp_pool
+    init_document_worker(config, instance_path)
+    smtp_pool.init_app(SimpleNamespace(config=config, extensions={}))
+
+
+def process_row(row: dict, anchor_method: str, pdf: bool, email: Optional[dict]) -> List[str]:
+    """Tailor one resume, then optionally convert it to PDF and email it"""
+    from app.services.conversion_service import ConversionService
+    from app.services.document_service import DocumentService
+    from app.services.email_service import EmailService
+
+    os.makedirs(os.path.dirname(row['output']), exist_ok=True)
+    files = [DocumentService.inject_bullet_points(row['resume'], row['output'], row['tech_stacks'], anchor_method)]
+    if pdf:
+        files.append(ConversionService.convert_to_pdf(files[0], os.path.dirname(row['output'])))
+    if email is not None and row['email']:
+        EmailService.send_email(row['email'], email['subject'], email['body'], [files[-1]], email['smtp_config'])
+    return files
+
+
+def convert_doc_resumes(rows: List[dict], workdir: str) -> Tuple[Dict[str, str], Dict[str, str]]:
+    """Convert each distinct .doc resume to .docx once, before the rows fan out.
+
+    DocumentService would otherwise convert a .doc next to itself in every
+    row, so workers sharing a resume would write and read the same file at
+    once. Returns ({doc path: docx path}, {doc path: error}).
+    """
+    from app.services.conversion_service import ConversionService
+
+    # soffice names outputs after the input, so resumes sharing a file name go to separate folders
+    groups: List[Dict[str, str]] = []
+    for path in sorted({row['resume'] for row in rows if row['resume'].lower().endswith('.doc')}):
+        name = os.path.basename(path)
+        group = next((group for group in groups if name not in group), None)
+        if group is None:
+            group = {}
+            groups.append(group)
+        group[name] = path
+
+    converted, errors = {}, {}
+    for number, group in enumerate(groups):
+        output_dir = os.path.join(workdir, str(number))
+        os.makedirs(output_dir)
+        for path, output_path, error in ConversionService.convert_batch(list(group.values()), 'docx', output_dir):
+            if error:
+                errors[path] = error
+            else:
+                converted[path] = output_path
+    return converted, errors
+
+
+def run_batch(
+    manifest: List[dict],
+    checkpoint: Checkpoint,
+    workers: int,
+    anchor_method: str = 'placeholders',
+    pdf: bool = False,
+    email: Optional[dict] = None,
+    worker_config: Optional[dict] = None,
+    instance_path: Optional[str] = None,
+    stop: Optional[threading.Event] = None
+) -> Dict[str, float]:
+    """Process every row not yet in the checkpoint and return run statistics.
+
+    Once stop is set, rows already running are finished and recorded and the
+    rest are left for the next run; stats['interrupted'] is then True.
+    """
+    from app.services.batch_service import BatchService
+
+    pending = [row for row in manifest if row['output'] not in checkpoint.done]
+    stats = {
+        'total': len(manifest), 'skipped': len(manifest) - len(pending),
+        'done': 0, 'failed': 0, 'interrupted': False,
+    }
+    start = time.perf_counter()
+    executor = concurrent.futures.ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(worker_config or {}, instance_path)
+    )
+    # output -> future of every submitted row not yet recorded
+    in_flight = {}
+
+    def submit(fn, row, *args):
+        in_flight[row['output']] = executor.submit(fn, row, *args)
+        return in_flight[row['output']]
+
+    def record(output, files, error):
+        in_flight.pop(output, None)
+        checkpoint.record(output, files, error)
+        stats['failed' if error else 'done'] += 1
+
+    # Converted .doc resumes live here until every row has run
+    workdir = tempfile.mkdtemp(prefix='resume-cli-')
+    try:
+        converted, conversion_errors = convert_doc_resumes(pending, workdir)
+        runnable = []
+        for row in pending:
+            if row['resume'] in conversion_errors:
+                logger.error(f"Could not convert {row['resume']}: {conversion_errors[row['resume']]}")
+                record(row['output'], None, conversion_errors[row['resume']])
+            else:
+                runnable.append(dict(row, resume=converted.get(row['resume'], row['resume'])))
+
+        tasks = ((row['output'], process_row, (row, anchor_method, pdf, email)) for row in runnable)
+        with executor:
+            for output, files, error in BatchService.run(tasks, submit, window=workers * 2):
+                record(output, files, error)
+                finished = stats['done'] + stats['failed']
+                logger.info(f"[{finished}/{len(pending)}] {'failed' if error else 'wrote'} {output}")
+                if stop is not None and stop.is_set():
+                    stats['interrupted'] = True
+                    break
+
+            executor.shutdown(wait=True, cancel_futures=True)
+            # Record the rows that were already running so they are not redone (or re-emailed)
+            for output, future in list(in_flight.items()):
+                if not future.cancelled():
+                    error = future.exception()
+                    record(output, None if error else future.result(), str(error) if error else None)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    stats['elapsed'] = time.perf_counter() - start
+    return stats
+
+
+def format_summary(stats: Dict[str, float]) -> str:
+    """One-line throughput report for a finished or interrupted run"""
+    processed = stats['done'] + stats['failed']
+    rate = processed / stats['elapsed'] if stats['elapsed'] else 0.0
+    return (
+        f"{stats['done']} tailored, {stats['failed']} failed, {stats['skipped']} skipped "
+        f"of {stats['total']} in {stats['elapsed']:.1f}s ({rate:.2f} resumes/s)"
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('manifest', help='CSV or JSONL manifest of resumes to tailor')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--anchor-method', choices=('placeholders', 'heuristics'), default='placeholders')
+    parser.add_argument('--pdf', action='store_true', help='also convert each output to PDF')
+    parser.add_argument('--email', action='store_true', help='email rows that give a recipient')
+    parser.add_argument('--subject', default='Your Tailored Resume')
+    parser.add_argument('--body', default='Please find attached your tailored resume.')
+    parser.add_argument('--checkpoint', metavar='PATH',
+                        help='progress file (default: <manifest>.checkpoint.jsonl)')
+    parser.add_argument('--restart', action='store_true', help='ignore an existing checkpoint')
+    parser.add_argument('--config', default=os.getenv('FLASK_CONFIG', 'app.config.Config'))
+    args = parser.parse_args(argv)
+
+    from app import create_app
+    from app.utils.logging_utils import configure_logging
+    configure_logging()
+    app = create_app(args.config)
+
+    try:
+        manifest = read_manifest(args.manifest)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+
+    checkpoint_path = args.checkpoint or f"{args.manifest}.checkpoint.jsonl"
+    if args.restart and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+
+    email = None
+    if args.email:
+        email = {
+            'subject': args.subject,
+            'body': args.body,
+            'smtp_config': {
+                'host': app.config['SMTP_HOST'],
+                'port': app.config['SMTP_PORT'],
+                'username': app.config['SMTP_USERNAME'],
+                'password': app.config['SMTP_PASSWORD'],
+                'sender_email': app.config['SENDER_EMAIL']
+            }
+        }
+    worker_config = {key: value for key, value in app.config.items() if key.startswith(WORKER_CONFIG_PREFIXES)}
+
+    # The first Ctrl-C stops after the running rows; a second one aborts
+    stop = threading.Event()
+
+    def interrupt(signum, frame):
+        if stop.is_set():
+            raise KeyboardInterrupt
+        logger.warning("Stopping after the rows in progress")
+        stop.set()
+    signal.signal(signal.SIGINT, interrupt)
+
+    checkpoint = Checkpoint(checkpoint_path)
+    try:
+        stats = run_batch(
+            manifest, checkpoint, max(1, args.workers), args.anchor_method,
+            args.pdf, email, worker_config, app.instance_path, stop
+        )
+    finally:
+        checkpoint.close()
+
+    print(format_summary(stats))
+    if stats['interrupted']:
+        print(f"Interrupted; rerun the same command to resume from {checkpoint_path}", file=sys.stderr)
+        return 130
+    return 1 if stats['failed'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
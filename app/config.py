@@ -8,6 +8,20 @@ class Config:
     SECRET_KEY = os.getenv('SECRET_KEY', 'dev-secret-key')
     UPLOAD_FOLDER = os.getenv('UPLOAD_FOLDER', 'uploads')
     MAX_CONTENT_LENGTH = int(os.getenv('MAX_CONTENT_LENGTH', 16 * 1024 * 1024))  # 16MB
+    MAX_UPLOAD_FILE_SIZE = int(os.getenv('MAX_UPLOAD_FILE_SIZE', 10 * 1024 * 1024))  # 10MB per file
+    UPLOAD_EXTENSIONS = ['doc', 'docx']
+    # Per-job workspaces under UPLOAD_FOLDER/jobs, swept by a janitor thread (0 disables a limit)
+    WORKSPACE_TTL = int(os.getenv('WORKSPACE_TTL', 24 * 3600))  # seconds
+    WORKSPACE_MAX_BYTES = int(os.getenv('WORKSPACE_MAX_BYTES', 2 * 1024 * 1024 * 1024))  # 2GB
+    WORKSPACE_JANITOR_INTERVAL = int(os.getenv('WORKSPACE_JANITOR_INTERVAL', 300))  # seconds
+    # 'memory' passes uploads and outputs as buffers; files are written only when a request sets keep_files
+    PIPELINE_MODE = os.getenv('PIPELINE_MODE', 'disk')
+    
+    # Set when running behind a reverse proxy (applies ProxyFix in run.py)
+    BEHIND_PROXY = os.getenv('BEHIND_PROXY', 'false').lower() == 'true'
+    # Hand download bodies to the proxy: 'x-accel' (nginx, internal location at the prefix) or 'x-sendfile'
+    DOWNLOAD_OFFLOAD = os.getenv('DOWNLOAD_OFFLOAD')
+    DOWNLOAD_OFFLOAD_PREFIX = os.getenv('DOWNLOAD_OFFLOAD_PREFIX', '/protected-uploads/')
     
     # Email settings
     SMTP_HOST = os.getenv('SMTP_HOST')
@@ -15,6 +29,66 @@ class Config:
     SMTP_USERNAME = os.getenv('SMTP_USERNAME')
     SMTP_PASSWORD = os.getenv('SMTP_PASSWORD')
     SENDER_EMAIL = os.getenv('SENDER_EMAIL')
+    SMTP_USE_TLS = os.getenv('SMTP_USE_TLS', 'true').lower() == 'true'
+    SMTP_TIMEOUT = int(os.getenv('SMTP_TIMEOUT', 30))  # seconds
+    SMTP_POOL_SIZE = int(os.getenv('SMTP_POOL_SIZE', 4))  # idle sessions kept per server/user
+    SMTP_IDLE_TIMEOUT = int(os.getenv('SMTP_IDLE_TIMEOUT', 60))  # seconds before an idle session is dropped
+    
+    # Encoded attachment bodies reused across messages (0 bytes encodes per message)
+    ATTACHMENT_CACHE_DIR = os.getenv('ATTACHMENT_CACHE_DIR')
+    ATTACHMENT_CACHE_MAX_BYTES = int(os.getenv('ATTACHMENT_CACHE_MAX_BYTES', 256 * 1024 * 1024))  # 256MB
+    
+    # Outbound email queue (when disabled, emails are sent inline during the request)
+    EMAIL_OUTBOX_ENABLED = os.getenv('EMAIL_OUTBOX_ENABLED', 'true').lower() == 'true'
+    OUTBOX_FOLDER = os.getenv('OUTBOX_FOLDER')
+    OUTBOX_CONCURRENCY = int(os.getenv('OUTBOX_CONCURRENCY', 2))
+    OUTBOX_MAX_ATTEMPTS = int(os.getenv('OUTBOX_MAX_ATTEMPTS', 5))
+    OUTBOX_BACKOFF_BASE = int(os.getenv('OUTBOX_BACKOFF_BASE', 30))  # seconds, doubled per attempt
+    OUTBOX_BACKOFF_MAX = int(os.getenv('OUTBOX_BACKOFF_MAX', 3600))  # seconds
+    OUTBOX_RETENTION = int(os.getenv('OUTBOX_RETENTION', 7 * 24 * 3600))  # seconds sent and dead records are kept; 0 keeps them
+    
+    # On-demand request profiling (X-Profile header or ?profile=1); captures are listed at /admin/profiles
+    PROFILING_ENABLED = os.getenv('PROFILING_ENABLED', 'false').lower() == 'true'
+    PROFILE_TOKEN = os.getenv('PROFILE_TOKEN')  # required to trigger a capture and by the admin routes
+    PROFILE_FOLDER = os.getenv('PROFILE_FOLDER')
+    PROFILE_MAX_FILES = int(os.getenv('PROFILE_MAX_FILES', 50))
+    PROFILE_MAX_BYTES = int(os.getenv('PROFILE_MAX_BYTES', 100 * 1024 * 1024))  # 100MB
+    
+    # LibreOffice conversion pool (0 disables it and falls back to one soffice run per file).
+    # Every process that converts keeps its own pool: each gunicorn worker, plus each of its
+    # DOCUMENT_WORKERS processes in 'process' mode, so up to
+    # gunicorn workers x (1 + DOCUMENT_WORKERS) x LIBREOFFICE_POOL_SIZE soffice processes.
+    LIBREOFFICE_BINARY = os.getenv('LIBREOFFICE_BINARY', 'soffice')
+    LIBREOFFICE_POOL_SIZE = int(os.getenv('LIBREOFFICE_POOL_SIZE', 2))
+    LIBREOFFICE_STARTUP_TIMEOUT = int(os.getenv('LIBREOFFICE_STARTUP_TIMEOUT', 30))  # seconds
+    CONVERSION_TIMEOUT = int(os.getenv('CONVERSION_TIMEOUT', 60))  # seconds
+    
+    # Cache of converted files keyed on input content (0 bytes disables it)
+    CONVERSION_CACHE_DIR = os.getenv('CONVERSION_CACHE_DIR')
+    CONVERSION_CACHE_MAX_BYTES = int(os.getenv('CONVERSION_CACHE_MAX_BYTES', 512 * 1024 * 1024))  # 512MB
+    
+    # Finished tailoring results keyed on resume content, bullets and anchor method (0 bytes disables it)
+    RESULT_CACHE_DIR = os.getenv('RESULT_CACHE_DIR')
+    RESULT_CACHE_MAX_BYTES = int(os.getenv('RESULT_CACHE_MAX_BYTES', 256 * 1024 * 1024))  # 256MB
+    RESULT_CACHE_TTL = int(os.getenv('RESULT_CACHE_TTL', 24 * 3600))  # seconds
+    
+    # JSON {skill: [phrases]} catalog compiled into the JD skill index (default: app/data/skills.json)
+    SKILL_CATALOG = os.getenv('SKILL_CATALOG')
+    # JSON {skill: [bullets]} library ranked against each JD with TF-IDF (needs numpy; unset uses JD sentences)
+    BULLET_LIBRARY = os.getenv('BULLET_LIBRARY')
+    BULLET_INDEX = os.getenv('BULLET_INDEX')  # precomputed .npz, rebuilt when the library is newer
+    
+    # Background processing jobs (POST /api/process?async=true)
+    JOBS_FOLDER = os.getenv('JOBS_FOLDER')
+    JOB_WORKERS = int(os.getenv('JOB_WORKERS', 4))
+    JOB_TTL = int(os.getenv('JOB_TTL', 3600))  # seconds a finished job stays pollable
+    JOB_MAX_AGE = int(os.getenv('JOB_MAX_AGE', 24 * 3600))  # seconds without progress before an unfinished job is dropped
+    
+    # Shared pool for document injection ('process' or 'thread')
+    DOCUMENT_EXECUTOR = os.getenv('DOCUMENT_EXECUTOR', 'process')
+    DOCUMENT_WORKERS = int(os.getenv('DOCUMENT_WORKERS', 0))  # 0 uses one worker per CPU
+    DOCUMENT_QUEUE_SIZE = int(os.getenv('DOCUMENT_QUEUE_SIZE', 32))
+    DOCUMENT_QUEUE_TIMEOUT = int(os.getenv('DOCUMENT_QUEUE_TIMEOUT', 30))  # seconds
 
 class DevelopmentConfig(Config):
     DEBUG = True
@@ -0,0 +1,29 @@
+from flask import Blueprint, request, jsonify, abort, send_from_directory
+from app.utils.profiling import PROFILE_FILE_PATTERN, request_profiler
+from functools import wraps
+
+admin_bp = Blueprint('admin', __name__)
+
+def require_profile_token(view):
+    """Hide the admin routes unless profiling is enabled and PROFILE_TOKEN matches"""
+    @wraps(view)
+    def wrapped(*args, **kwargs):
+        token = request.headers.get('X-Profile-Token') or request.args.get('token')
+        if not request_profiler.enabled or not request_profiler.authorized(token):
+            abort(404)
+        return view(*args, **kwargs)
+    return wrapped
+
+@admin_bp.route('/profiles', methods=['GET'])
+@require_profile_token
+def list_profiles():
+    """List captured request profiles, newest first"""
+    return jsonify({'profiles': request_profiler.list_profiles()}), 200
+
+@admin_bp.route('/profiles/<name>', methods=['GET'])
+@require_profile_token
+def download_profile(name):
+    """Download one pstats or allocation report"""
+    if not PROFILE_FILE_PATTERN.match(name):
+        abort(404)
+    return send_from_directory(request_profiler.folder, name, as_attachment=True)
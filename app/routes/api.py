@@ -1,16 +1,31 @@
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, request, jsonify, current_app, url_for, Response
+from app.services.batch_service import BatchService
+from app.services.document_executor import document_executor, ExecutorBusy
 from app.services.document_service import DocumentService
 from app.services.email_service import EmailService
+from app.services.jd_service import JDService
+from app.services.job_service import job_manager
+from app.services.outbox import email_outbox
+from app.services.result_cache import result_cache
+from app.services.workspace import workspaces
 from app.utils.file_utils import FileUtils
+from app.utils.metrics import metrics
+from app.utils.zip_stream import stream_zip
 from app.models import JobDescription, Resume, EmailConfig
+from werkzeug.exceptions import HTTPException
 import concurrent.futures
+import json
+import logging
 import os
 
+logger = logging.getLogger(__name__)
+
 api_bp = Blueprint('api', __name__)
 
 @api_bp.route('/process', methods=['POST'])
 def process_resumes():
     """API endpoint for resume processing"""
+    workspace_id = None
     try:
         # Validate input
         if 'resumes[]' not in request.files:
@@ -20,56 +35,295 @@ def process_resumes():
         if len(resumes) != 3:
             return jsonify({'error': 'Exactly 3 resumes required'}), 400
 
-        # Save uploaded files
-        saved_files = []
+        # Background jobs read their inputs from disk, so they always use the disk pipeline
+        run_async = request.values.get('async', 'false').lower() == 'true'
+        in_memory = current_app.config['PIPELINE_MODE'] == 'memory' and not run_async
+
         for resume in resumes:
             if not FileUtils.validate_file_type(resume.filename, ['doc', 'docx']):
                 return jsonify({'error': 'Invalid file type. Only .doc/.docx allowed'}), 400
-            file_path = FileUtils.secure_save(
-                resume,
-                current_app.config['UPLOAD_FOLDER'],
-                ['doc', 'docx']
-            )
-            saved_files.append(file_path)
 
-        # Process JDs (example - would come from request in real implementation)
-        jds = [
-            JobDescription(
+        # Tech stacks are extracted from the `jds` field's raw texts, one per resume
+        if request.form.get('jds'):
+            try:
+                raw_texts = json.loads(request.form['jds'])
+                if not isinstance(raw_texts, list) or len(raw_texts) != 3:
+                    raise ValueError("Exactly 3 job descriptions required")
+                with metrics.stage('analyze_jds'):
+                    jds = JDService.to_job_descriptions(raw_texts)
+            except (ValueError, TypeError) as e:
+                return jsonify({'error': f'Invalid job descriptions: {e}'}), 400
+        else:
+            # Example JD used when the request sends none
+            example = JobDescription(
                 raw_text="JD 1 content",
                 tech_stacks={
                     "Python": ["bullet1", "bullet2", "bullet3", "bullet4", "bullet5", "bullet6"],
                     "Flask": ["bullet1", "bullet2", "bullet3", "bullet4", "bullet5", "bullet6"],
                     "AWS": ["bullet1", "bullet2", "bullet3", "bullet4", "bullet5", "bullet6"]
                 }
-            ),
-            # JD 2 and 3 would be similar
-        ]
+            )
+            jds = [example] * 3
 
-        # Process resumes in parallel
-        processed_files = []
-        with concurrent.futures.ThreadPoolExecutor(max_workers=3) as executor:
-            futures = []
-            for i in range(3):
-                futures.append(executor.submit(
-                    DocumentService.inject_bullet_points,
+        # Save uploaded files
+        if not in_memory:
+            # Each request works in its own folder so concurrent requests never share file names
+            workspace_id, workspace = workspaces.create()
+            saved_files = []
+            with metrics.stage('save_uploads'):
+                for resume in resumes:
+                    saved_files.append(FileUtils.secure_save(
+                        resume,
+                        current_app.config['UPLOAD_FOLDER'],
+                        ['doc', 'docx'],
+                        workspace
+                    ))
+
+        anchor_method = request.form.get('anchor_method', 'placeholders')
+        if in_memory:
+            return _process_in_memory(resumes, [jds[i].tech_stacks for i in range(3)], anchor_method)
+
+        tasks = []
+        for i in range(3):
+            tasks.append((
+                os.path.basename(saved_files[i]),
+                DocumentService.inject_bullet_points,
+                (
                     saved_files[i],
-                    os.path.join(current_app.config['UPLOAD_FOLDER'], f"processed_{i}.docx"),
+                    os.path.join(workspace, f"processed_{i}.docx"),
                     jds[i].tech_stacks,
-                    request.form.get('anchor_method', 'placeholders')
-                ))
-            
-            for future in concurrent.futures.as_completed(futures):
-                processed_files.append(future.result())
+                    anchor_method
+                )
+            ))
+
+        # Job mode: hand the work to the background executor and return immediately
+        if run_async:
+            job_id = job_manager.submit([
+                (name, result_cache.run, (fn,) + args) for name, fn, args in tasks
+            ], workspace_id)
+            return jsonify({
+                'job_id': job_id,
+                'workspace': workspace_id,
+                'status_url': url_for('api.job_status', job_id=job_id)
+            }), 202
+
+        # Process resumes in parallel on the shared document pool
+        with metrics.stage('inject'):
+            futures = []
+            for _, fn, args in tasks:
+                futures.append(result_cache.submit(fn, *args))
+            processed_files = [future.result() for future in futures]
 
         return jsonify({
             'message': 'Processing complete',
-            'files': processed_files
+            'workspace': workspace_id,
+            'files': processed_files,
+            'bundle_url': url_for('main.download_bundle', workspace_id=workspace_id)
         }), 200
 
+    except HTTPException:
+        # Upload rejected while streaming (size or extension limit)
+        if workspace_id:
+            workspaces.remove(workspace_id)
+        raise
+
+    except ExecutorBusy as e:
+        if workspace_id:
+            workspaces.remove(workspace_id)
+        return jsonify({'error': str(e)}), 503
+
     except Exception as e:
-        FileUtils.cleanup_files(saved_files + processed_files)
+        if workspace_id:
+            workspaces.remove(workspace_id)
         return jsonify({'error': str(e)}), 500
 
+def _process_in_memory(resumes, tech_stacks_list, anchor_method):
+    """Tailor uploaded resumes as buffers and return them as a zip download.
+
+    Nothing touches UPLOAD_FOLDER unless the request sets keep_files, in which
+    case the outputs are written to a new workspace and their paths returned
+    instead.
+    """
+    with metrics.stage('inject'):
+        futures = []
+        for resume, tech_stacks in zip(resumes, tech_stacks_list):
+            futures.append(result_cache.submit(
+                DocumentService.inject_bullet_points_bytes,
+                resume.read(),
+                resume.filename,
+                tech_stacks,
+                anchor_method
+            ))
+        outputs = [(f"processed_{i}.docx", future.result()) for i, future in enumerate(futures)]
+
+    if request.values.get('keep_files', 'false').lower() == 'true':
+        workspace_id, workspace = workspaces.create()
+        return jsonify({
+            'message': 'Processing complete',
+            'workspace': workspace_id,
+            'files': FileUtils.write_outputs(outputs, workspace)
+        }), 200
+
+    return Response(stream_zip(outputs), mimetype='application/zip', headers={
+        'Content-Disposition': 'attachment; filename=processed_resumes.zip',
+        'X-Accel-Buffering': 'no'
+    })
+
+@api_bp.route('/batch', methods=['POST'])
+def process_batch():
+    """API endpoint tailoring any number of resumes against any number of JDs.
+
+    Expects `resumes[]` files, a `jds` field holding a JSON list of
+    {"raw_text", "tech_stacks"} objects (tech_stacks is extracted from
+    raw_text when omitted) and an optional `mapping` field with a
+    JSON list of [resume_index, jd_index] pairs (default: every combination).
+    Progress is streamed back as Server-Sent Events.
+    """
+    resumes = request.files.getlist('resumes[]')
+    if not resumes:
+        return jsonify({'error': 'No resume files uploaded'}), 400
+
+    try:
+        jds = []
+        extract = []
+        payload = json.loads(request.form.get('jds', '[]'))
+        if not isinstance(payload, list):
+            raise ValueError("jds must be a list")
+        for jd in payload:
+            if not isinstance(jd, dict):
+                raise ValueError("each job description must be an object")
+            if 'tech_stacks' not in jd:
+                # Only the posting was sent; its stacks are extracted below, all in one batch
+                extract.append(len(jds))
+                jds.append(jd['raw_text'])
+                continue
+            stacks = jd['tech_stacks']
+            if not isinstance(stacks, dict) or not all(
+                isinstance(bullets, list) and all(isinstance(b, str) for b in bullets)
+                for bullets in stacks.values()
+            ):
+                raise ValueError("tech_stacks must map each stack to a list of bullet strings")
+            jd = JobDescription(raw_text=jd.get('raw_text', ''), tech_stacks=stacks)
+            jd.validate_bullet_points()
+            jds.append(jd)
+        if extract:
+            for index, jd in zip(extract, JDService.to_job_descriptions([jds[i] for i in extract])):
+                jds[index] = jd
+        if not jds:
+            return jsonify({'error': 'At least one job description required'}), 400
+
+        mapping = request.form.get('mapping')
+        mapping = json.loads(mapping) if mapping else None
+        pairs = BatchService.iter_pairs(len(resumes), len(jds), mapping)
+        total = len(mapping) if mapping is not None else len(resumes) * len(jds)
+    except (ValueError, KeyError, TypeError) as e:
+        return jsonify({'error': f'Invalid batch request: {e}'}), 400
+
+    for resume in resumes:
+        if not FileUtils.validate_file_type(resume.filename, ['doc', 'docx']):
+            return jsonify({'error': 'Invalid file type. Only .doc/.docx allowed'}), 400
+
+    # The batch ID doubles as the workspace holding its uploads and outputs
+    batch_id, workspace = workspaces.create()
+    saved_files = []
+    try:
+        for resume in resumes:
+            saved_files.append(FileUtils.secure_save(
+                resume,
+                current_app.config['UPLOAD_FOLDER'],
+                ['doc', 'docx'],
+                workspace
+            ))
+    except Exception:
+        workspaces.remove(batch_id)
+        raise
+
+    anchor_method = request.form.get('anchor_method', 'placeholders')
+    tasks = (
+        (
+            (resume_index, jd_index),
+            DocumentService.inject_bullet_points,
+            (
+                saved_files[resume_index],
+                os.path.join(workspace, f"processed_{resume_index}_{jd_index}.docx"),
+                jds[jd_index].tech_stacks,
+                anchor_method
+            )
+        )
+        for resume_index, jd_index in pairs
+    )
+
+    # Resolved now: the stream body runs after the request context is gone
+    bundle_url = url_for('main.download_bundle', workspace_id=batch_id)
+
+    def stream():
+        yield _sse('start', {'batch_id': batch_id, 'total': total})
+        completed = failed = 0
+        try:
+            for (resume_index, jd_index), result, error in BatchService.run(
+                tasks, result_cache.submit, document_executor.max_workers
+            ):
+                if error is None:
+                    completed += 1
+                else:
+                    failed += 1
+                yield _sse('item', {
+                    'resume': resume_index,
+                    'jd': jd_index,
+                    'status': 'completed' if error is None else 'failed',
+                    'file': result,
+                    'error': error
+                })
+        except ExecutorBusy as e:
+            yield _sse('error', {'batch_id': batch_id, 'error': str(e)})
+        except Exception as e:
+            # The 200 is already sent; report the failure in-band so clients still see `done`
+            logger.error(f"Batch {batch_id} failed: {e}")
+            yield _sse('error', {'batch_id': batch_id, 'error': str(e)})
+        yield _sse('done', {
+            'batch_id': batch_id,
+            'completed': completed,
+            'failed': failed,
+            'bundle_url': bundle_url
+        })
+
+    return Response(stream(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+def _sse(event: str, data: dict) -> str:
+    """Format one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@api_bp.route('/analyze', methods=['POST'])
+def analyze_jds():
+    """API endpoint extracting skills and tech stacks from job description texts.
+
+    Accepts JSON {"raw_text": "..."} for one posting or {"jds": ["...", ...]}
+    for a bulk import; every posting is scanned against the shared skill index.
+    """
+    data = request.get_json(silent=True) or {}
+    raw_texts = None
+    if isinstance(data, dict):
+        raw_texts = data['jds'] if 'jds' in data else [data.get('raw_text')]
+    if not isinstance(raw_texts, list) or not all(isinstance(text, str) for text in raw_texts):
+        return jsonify({'error': 'Send raw_text or a jds list of job description texts'}), 400
+
+    with metrics.stage('analyze_jds'):
+        results = [JDService.analyze(raw_text) for raw_text in raw_texts]
+    if 'jds' in data:
+        return jsonify({'results': results}), 200
+    return jsonify(results[0]), 200
+
+@api_bp.route('/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    """API endpoint for polling a background processing job"""
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job), 200
+
 @api_bp.route('/send-emails', methods=['POST'])
 def send_emails():
     """API endpoint for sending processed resumes"""
@@ -88,6 +342,18 @@ def send_emails():
         if 'files[]' not in data or len(data['files[]']) != 3:
             return jsonify({'error': 'Exactly 3 files required'}), 400
 
+        # Queue emails for background delivery
+        if current_app.config['EMAIL_OUTBOX_ENABLED']:
+            message_ids = []
+            for i in range(3):
+                message_ids.append(EmailService.queue_email(
+                    email_config.recipients[i],
+                    email_config.subject,
+                    email_config.body,
+                    [data['files[]'][i]]
+                ))
+            return jsonify({'message': 'Emails queued', 'message_ids': message_ids}), 202
+
         # Send emails in parallel
         with concurrent.futures.ThreadPoolExecutor(max_workers=3) as executor:
             futures = []
@@ -113,4 +379,12 @@ def send_emails():
         return jsonify({'message': 'Emails sent successfully'}), 200
 
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
\ No newline at end of file
+        return jsonify({'error': str(e)}), 500
+
+@api_bp.route('/emails/<message_id>', methods=['GET'])
+def email_status(message_id):
+    """API endpoint for checking a queued email's delivery status"""
+    message = email_outbox.status(message_id)
+    if message is None:
+        return jsonify({'error': 'Email not found'}), 404
+    return jsonify(message), 200
\ No newline at end of file
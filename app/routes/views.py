@@ -1,8 +1,12 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash, current_app
+from flask import Blueprint, render_template, request, redirect, url_for, flash, current_app, abort, Response
 from werkzeug.utils import secure_filename
 from app.services.document_service import DocumentService
 from app.services.email_service import EmailService
+from app.services.result_cache import result_cache
+from app.services.workspace import workspaces
 from app.utils.file_utils import FileUtils
+from app.utils.metrics import metrics
+from app.utils.zip_stream import stream_zip
 import os
 import concurrent.futures
 
@@ -11,9 +15,13 @@ main_bp = Blueprint('main', __name__)
 @main_bp.route('/', methods=['GET', 'POST'])
 def index():
     if request.method == 'POST':
+        workspace_id = workspace = None
+        completed = False
         try:
-            # Step 1: Save uploaded resumes
+            # Step 1: Save uploaded resumes (or just read them in the in-memory pipeline)
+            in_memory = current_app.config['PIPELINE_MODE'] == 'memory'
             resume_files = []
+            uploads = []
             for i in range(1, 4):
                 file = request.files.get(f'resume{i}')
                 if not file:
@@ -24,11 +32,18 @@ def index():
                     flash('Only .doc or .docx files are allowed', 'error')
                     return redirect(request.url)
                 
-                file_path = FileUtils.secure_save(
-                    file,
-                    current_app.config['UPLOAD_FOLDER'],
-                    ['doc', 'docx']
-                )
+                if in_memory:
+                    uploads.append((file.filename, file.read()))
+                    continue
+                if workspace is None:
+                    workspace_id, workspace = workspaces.create()
+                with metrics.stage('save_uploads'):
+                    file_path = FileUtils.secure_save(
+                        file,
+                        current_app.config['UPLOAD_FOLDER'],
+                        ['doc', 'docx'],
+                        workspace
+                    )
                 resume_files.append(file_path)
 
             # Step 2: Process JDs (simplified example)
@@ -36,9 +51,9 @@ def index():
             for i in range(1, 4):
                 jd_data[f'jd{i}'] = {
                     'tech_stacks': {
-                        request.form.get(f'jd{i}_stack1'): {
-                            'bullets': request.form.get(f'jd{i}_stack1_bullets').split('\n')[:6]
-                        },
+                        # DocumentService takes {stack: [bullets]}
+                        request.form.get(f'jd{i}_stack1'):
+                            request.form.get(f'jd{i}_stack1_bullets').split('\n')[:6],
                         # Similar for stack2 and stack3
                     }
                 }
@@ -47,19 +62,35 @@ def index():
             anchor_method = request.form.get('anchor_method', 'placeholders')
             processed_files = []
             
-            with concurrent.futures.ThreadPoolExecutor(max_workers=3) as executor:
-                futures = []
-                for i in range(3):
-                    futures.append(executor.submit(
-                        DocumentService.inject_bullet_points,
-                        resume_files[i],
-                        os.path.join(current_app.config['UPLOAD_FOLDER'], f"processed_{i}.docx"),
-                        jd_data[f'jd{i+1}']['tech_stacks'],
-                        anchor_method
-                    ))
-                
-                for future in concurrent.futures.as_completed(futures):
-                    processed_files.append(future.result())
+            with metrics.stage('inject'):
+                if in_memory:
+                    futures = []
+                    for i, (filename, content) in enumerate(uploads):
+                        futures.append(result_cache.submit(
+                            DocumentService.inject_bullet_points_bytes,
+                            content,
+                            filename,
+                            jd_data[f'jd{i+1}']['tech_stacks'],
+                            anchor_method
+                        ))
+                    attachments = [(f"processed_{i}.docx", future.result()) for i, future in enumerate(futures)]
+                    if request.form.get('keep_files'):
+                        workspace_id, workspace = workspaces.create()
+                        processed_files = FileUtils.write_outputs(attachments, workspace)
+                else:
+                    futures = []
+                    for i in range(3):
+                        futures.append(result_cache.submit(
+                            DocumentService.inject_bullet_points,
+                            resume_files[i],
+                            os.path.join(workspace, f"processed_{i}.docx"),
+                            jd_data[f'jd{i+1}']['tech_stacks'],
+                            anchor_method
+                        ))
+
+                    # In submission order: output i goes to recipient i, whichever finished first
+                    processed_files = [future.result() for future in futures]
+                    attachments = processed_files
 
             # Step 4: Send emails
             email_config = {
@@ -79,31 +110,68 @@ def index():
                 }
             }
 
-            with concurrent.futures.ThreadPoolExecutor(max_workers=3) as executor:
-                futures = []
-                for i in range(3):
-                    if email_config['recipients'][i]:
-                        futures.append(executor.submit(
-                            EmailService.send_email,
-                            email_config['recipients'][i],
-                            email_config['subject'],
-                            email_config['body'],
-                            [processed_files[i]],
-                            email_config['smtp_config']
-                        ))
-                
-                concurrent.futures.wait(futures)
+            with metrics.stage('send_emails'):
+                if current_app.config['EMAIL_OUTBOX_ENABLED']:
+                    for i in range(3):
+                        if email_config['recipients'][i]:
+                            EmailService.queue_email(
+                                email_config['recipients'][i],
+                                email_config['subject'],
+                                email_config['body'],
+                                [attachments[i]]
+                            )
+                else:
+                    with concurrent.futures.ThreadPoolExecutor(max_workers=3) as executor:
+                        futures = []
+                        for i in range(3):
+                            if email_config['recipients'][i]:
+                                futures.append(executor.submit(
+                                    EmailService.send_email,
+                                    email_config['recipients'][i],
+                                    email_config['subject'],
+                                    email_config['body'],
+                                    [attachments[i]],
+                                    email_config['smtp_config']
+                                ))
+                    
+                        concurrent.futures.wait(futures)
 
-            return render_template('results.html', files=processed_files)
+            completed = True
+            if workspace is None:
+                # Memory mode without keep_files: nothing was written, so send the outputs now
+                return Response(stream_zip(attachments), mimetype='application/zip', headers={
+                    'Content-Disposition': 'attachment; filename=processed_resumes.zip',
+                    'X-Accel-Buffering': 'no'
+                })
+            # Downloads are addressed relative to UPLOAD_FOLDER, e.g. jobs/<id>/processed_0.docx
+            processed_files = [
+                os.path.relpath(path, current_app.config['UPLOAD_FOLDER']).replace(os.sep, '/')
+                for path in processed_files
+            ]
+            return render_template('results.html', files=processed_files, workspace_id=workspace_id)
 
         except Exception as e:
             flash(f'An error occurred: {str(e)}', 'error')
             return redirect(request.url)
+
+        finally:
+            # Rejected or failed requests leave nothing for the janitor to find
+            if workspace_id and not completed:
+                workspaces.remove(workspace_id)
     
     return render_template('index.html')
 
-@main_bp.route('/download/<filename>')
+@main_bp.route('/bundle/<workspace_id>')
+def download_bundle(workspace_id):
+    """Stream every output of a workspace as one ZIP, built while it is sent"""
+    outputs = workspaces.outputs(workspace_id)
+    if not outputs:
+        abort(404)
+    return Response(stream_zip(outputs), mimetype='application/zip', headers={
+        'Content-Disposition': f'attachment; filename=resumes_{workspace_id}.zip',
+        'X-Accel-Buffering': 'no'
+    })
+
+@main_bp.route('/download/<path:filename>')
 def download_file(filename):
-    return FileUtils.send_download(
-        os.path.join(current_app.config['UPLOAD_FOLDER'], filename)
-    )
\ No newline at end of file
+    return FileUtils.send_download(filename, current_app.config['UPLOAD_FOLDER'])
\ No newline at end of file
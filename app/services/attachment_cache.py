@@ -0,0 +1,78 @@
+import base64
+import hashlib
+import os
+import tempfile
+from typing import BinaryIO
+from app.utils.disk_cache import DiskCache
+
+# 57 raw bytes encode to one 76-character base64 line
+RAW_CHUNK_SIZE = 57 * 1024
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+class AttachmentCache(DiskCache):
+    """Base64-encoded attachment bodies, encoded once per file version.
+
+    Entries are keyed on the file's identity (device, inode, mtime and size),
+    which the outbox's hard links share with the original, and hold the
+    CRLF-terminated base64 lines ready to be written to an SMTP socket.
+    """
+
+    def init_app(self, app):
+        """Read cache settings from the Flask config"""
+        self.cache_dir = app.config.get('ATTACHMENT_CACHE_DIR') or \
+            os.path.join(app.instance_path, 'attachment_cache')
+        self.max_bytes = app.config.get('ATTACHMENT_CACHE_MAX_BYTES', 0)
+        app.extensions['attachment_cache'] = self
+
+    @staticmethod
+    def key_for(file_path: str) -> str:
+        """Build the cache key for the current version of file_path"""
+        stat = os.stat(file_path)
+        identity = f"{stat.st_dev}\0{stat.st_ino}\0{stat.st_mtime_ns}\0{stat.st_size}"
+        return hashlib.sha256(identity.encode('utf-8')).hexdigest()
+
+    def open_encoded(self, file_path: str) -> BinaryIO:
+        """Open the encoded body of file_path for reading, encoding it on first use"""
+        if self.enabled:
+            key = self.key_for(file_path)
+            for _ in range(2):
+                entry = self.lookup(key) or \
+                    self.put(key, lambda out: self.encode(file_path, out))
+                try:
+                    return open(entry, 'rb')
+                except FileNotFoundError:
+                    # Evicted by a concurrent store; try once more
+                    continue
+
+        spool = tempfile.TemporaryFile()
+        self.encode(file_path, spool)
+        spool.seek(0)
+        return spool
+
+    @staticmethod
+    def encode(file_path: str, out: BinaryIO):
+        """Stream file_path into out as base64 lines, without a trailing line break"""
+        with open(file_path, 'rb') as f:
+            AttachmentCache.encode_stream(f, out)
+
+    @staticmethod
+    def encode_stream(src: BinaryIO, out: BinaryIO):
+        """Stream a readable binary file into out as base64 lines"""
+        first = True
+        for chunk in iter(lambda: src.read(RAW_CHUNK_SIZE), b''):
+            lines = base64.encodebytes(chunk).rstrip(b'\n').replace(b'\n', b'\r\n')
+            if not first:
+                out.write(b'\r\n')
+            out.write(lines)
+            first = False
+
+    @staticmethod
+    def iter_chunks(encoded: BinaryIO):
+        """Yield an encoded body in fixed-size chunks"""
+        with encoded:
+            for chunk in iter(lambda: encoded.read(STREAM_CHUNK_SIZE), b''):
+                yield chunk
+
+
+attachment_cache = AttachmentCache()
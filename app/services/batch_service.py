@@ -0,0 +1,64 @@
+import concurrent.futures
+import itertools
+import logging
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+class BatchService:
+    @staticmethod
+    def iter_pairs(
+        resume_count: int,
+        jd_count: int,
+        mapping: Optional[List[List[int]]] = None
+    ) -> Iterator[Tuple[int, int]]:
+        """Yield (resume_index, jd_index) pairs: the explicit mapping or the full cross product"""
+        if mapping is None:
+            return itertools.product(range(resume_count), range(jd_count))
+
+        if not isinstance(mapping, list):
+            raise ValueError("Mapping must be a list of [resume_index, jd_index] pairs")
+        for pair in mapping:
+            # Exact int checks: floats and booleans would pass the range check but not indexing
+            if not isinstance(pair, list) or len(pair) != 2 or not all(type(i) is int for i in pair):
+                raise ValueError("Each mapping entry must be [resume_index, jd_index]")
+            resume_index, jd_index = pair
+            if not 0 <= resume_index < resume_count or not 0 <= jd_index < jd_count:
+                raise ValueError(f"Mapping entry {pair} is out of range")
+        return (tuple(pair) for pair in mapping)
+
+    @staticmethod
+    def run(
+        tasks: Iterable[Tuple[object, Callable, tuple]],
+        submit: Callable,
+        window: int
+    ) -> Iterator[Tuple[object, object, Optional[str]]]:
+        """Run (key, fn, args) tasks, yielding (key, result, error) as each finishes.
+
+        Tasks are pulled from the iterable lazily and at most `window` are in
+        flight, so memory stays flat however large the batch is.
+        """
+        tasks = iter(tasks)
+        in_flight = {}
+
+        def fill():
+            while len(in_flight) < window:
+                try:
+                    key, fn, args = next(tasks)
+                except StopIteration:
+                    return
+                in_flight[submit(fn, *args)] = key
+
+        fill()
+        while in_flight:
+            done, _ = concurrent.futures.wait(
+                in_flight, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                key = in_flight.pop(future)
+                try:
+                    result, error = future.result(), None
+                except Exception as e:
+                    logger.error(f"Batch item {key} failed: {e}")
+                    result, error = None, str(e)
+                yield key, result, error
+            fill()
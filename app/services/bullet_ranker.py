@@ -0,0 +1,254 @@
+import hashlib
+import json
+import logging
+import math
+import os
+import tempfile
+import threading
+from collections import Counter
+from typing import Dict, List, Optional
+from app.services.skill_index import tokenize
+
+logger = logging.getLogger(__name__)
+
+try:
+    import numpy as np
+except ImportError:  # Ranking is optional; bullets are then used in library order
+    np = None
+
+try:
+    from scipy import sparse
+except ImportError:  # Without SciPy the matrices are dense NumPy arrays
+    sparse = None
+
+DEFAULT_TOP_K = 6
+# JDs scored per matrix product, so the dense score block stays CHUNK x bullets
+RANK_CHUNK_SIZE = 256
+
+
+class BulletRanker:
+    """TF-IDF relevance ranking of a bullet library against job descriptions.
+
+    The library's vocabulary, IDF weights and L2-normalised bullet matrix are
+    computed once by fit() and can be saved to and loaded from an .npz file.
+    rank() vectorises JDs in chunks of RANK_CHUNK_SIZE and scores each chunk
+    against every bullet with one matrix product, then keeps the top-k
+    bullets of each requested stack in order of relevance, which is the
+    order DocumentService hands them out to projects.
+    """
+
+    def __init__(self):
+        self.vocabulary: Dict[str, int] = {}
+        self.idf = None
+        self.matrix = None
+        self.bullets: List[str] = []
+        # stack -> (first row, end row) of its bullets in the matrix
+        self.stacks: Dict[str, tuple] = {}
+        # SHA-256 of the library file the ranker was fitted from, if any
+        self.fingerprint: Optional[str] = None
+
+    @staticmethod
+    def available() -> bool:
+        """Whether NumPy is installed"""
+        return np is not None
+
+    def fit(self, library: Dict[str, List[str]]) -> 'BulletRanker':
+        """Build the vocabulary and bullet matrix from a {stack: [bullets]} library"""
+        self.bullets = []
+        self.stacks = {}
+        for stack, bullets in library.items():
+            self.stacks[stack] = (len(self.bullets), len(self.bullets) + len(bullets))
+            self.bullets.extend(bullets)
+
+        counts = [Counter(tokenize(bullet)) for bullet in self.bullets]
+        document_frequency = Counter(token for tokens in counts for token in tokens)
+        self.vocabulary = {token: column for column, token in enumerate(sorted(document_frequency))}
+        # Smoothed IDF, as in scikit-learn, so terms found in every bullet still count a little
+        total = len(self.bullets)
+        self.idf = np.array([
+            math.log((1 + total) / (1 + document_frequency[token])) + 1 for token in sorted(document_frequency)
+        ], dtype=np.float32)
+        self.matrix = self._vectorize(counts)
+        return self
+
+    def rank(
+        self,
+        jd_texts: List[str],
+        stacks: Optional[List[List[str]]] = None,
+        top_k: int = DEFAULT_TOP_K
+    ) -> List[Dict[str, List[str]]]:
+        """Return tech_stacks of the top_k most relevant bullets for each JD.
+
+        stacks names the library stacks to fill for each JD (default: all of
+        them); unknown names are skipped. Stacks with fewer than top_k bullets
+        are returned whole, most relevant first.
+        """
+        results = []
+        for first in range(0, len(jd_texts), RANK_CHUNK_SIZE):
+            chunk = jd_texts[first:first + RANK_CHUNK_SIZE]
+            queries = self._vectorize([Counter(tokenize(text)) for text in chunk])
+            scores = queries @ self.matrix.T
+            scores = scores.toarray() if sparse is not None and sparse.issparse(scores) else np.asarray(scores)
+            for offset in range(len(chunk)):
+                wanted = stacks[first + offset] if stacks is not None else self.stacks
+                results.append(self._top_bullets(scores[offset], wanted, top_k))
+        return results
+
+    def _top_bullets(self, scores, stacks, top_k: int) -> Dict[str, List[str]]:
+        """Pick the top_k bullets of each named stack from one JD's row of scores"""
+        tech_stacks = {}
+        for stack in stacks:
+            if stack not in self.stacks:
+                continue
+            start, end = self.stacks[stack]
+            stack_scores = scores[start:end]
+            k = min(top_k, end - start)
+            if k < end - start:
+                top = np.argpartition(-stack_scores, k - 1)[:k]
+            else:
+                top = np.arange(end - start)
+            # Stable sort keeps library order between equally relevant bullets
+            top = top[np.argsort(-stack_scores[top], kind='stable')]
+            tech_stacks[stack] = [self.bullets[start + i] for i in top]
+        return tech_stacks
+
+    def save(self, path: str):
+        """Persist the fitted ranker to an .npz file"""
+        matrix = self.matrix if sparse is not None else _DenseCSR(self.matrix)
+        meta = json.dumps({
+            'vocabulary': sorted(self.vocabulary, key=self.vocabulary.get),
+            'bullets': self.bullets,
+            'stacks': self.stacks,
+            'fingerprint': self.fingerprint,
+        })
+        folder = os.path.dirname(os.path.abspath(path))
+        os.makedirs(folder, exist_ok=True)
+        # A private temp file, so workers building the index at once never rename each other's
+        fd, tmp_path = tempfile.mkstemp(dir=folder, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.savez(
+                    f,
+                    idf=self.idf,
+                    data=matrix.data,
+                    indices=matrix.indices,
+                    indptr=matrix.indptr,
+                    meta=np.frombuffer(meta.encode('utf-8'), dtype=np.uint8)
+                )
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    @classmethod
+    def load(cls, path: str) -> 'BulletRanker':
+        """Load a ranker saved with save()"""
+        ranker = cls()
+        with np.load(path) as arrays:
+            meta = json.loads(arrays['meta'].tobytes().decode('utf-8'))
+            ranker.idf = arrays['idf']
+            shape = (len(meta['bullets']), len(ranker.idf))
+            data, indices, indptr = arrays['data'], arrays['indices'], arrays['indptr']
+        if sparse is not None:
+            ranker.matrix = sparse.csr_matrix((data, indices, indptr), shape=shape)
+        else:
+            ranker.matrix = np.zeros(shape, dtype=np.float32)
+            ranker.matrix[np.repeat(np.arange(shape[0]), np.diff(indptr)), indices] = data
+        ranker.vocabulary = {token: column for column, token in enumerate(meta['vocabulary'])}
+        ranker.bullets = meta['bullets']
+        ranker.stacks = {stack: tuple(span) for stack, span in meta['stacks'].items()}
+        ranker.fingerprint = meta.get('fingerprint')
+        return ranker
+
+    def _vectorize(self, counts: List[Counter]):
+        """L2-normalised TF-IDF rows for token counts, ignoring out-of-vocabulary tokens"""
+        rows, columns, values = [], [], []
+        for row, tokens in enumerate(counts):
+            for token, count in tokens.items():
+                column = self.vocabulary.get(token)
+                if column is not None:
+                    rows.append(row)
+                    columns.append(column)
+                    values.append(count * self.idf[column])
+        shape = (len(counts), len(self.vocabulary))
+        values = np.array(values, dtype=np.float32)
+
+        # Normalise per row so a dot product is the cosine similarity
+        rows = np.array(rows, dtype=np.intp)
+        norms = np.sqrt(np.bincount(rows, weights=values ** 2, minlength=shape[0])).astype(np.float32)
+        norms[norms == 0] = 1
+        values /= norms[rows]
+
+        if sparse is not None:
+            return sparse.csr_matrix((values, (rows, columns)), shape=shape)
+        matrix = np.zeros(shape, dtype=np.float32)
+        matrix[rows, columns] = values
+        return matrix
+
+
+class _DenseCSR:
+    """CSR arrays of a dense matrix, so indexes saved without SciPy have the same layout"""
+
+    def __init__(self, matrix):
+        rows, self.indices = np.nonzero(matrix)
+        self.data = matrix[rows, self.indices]
+        self.indptr = np.concatenate(([0], np.cumsum(np.bincount(rows, minlength=matrix.shape[0]))))
+
+
+class BulletLibrary:
+    """Process-wide BulletRanker for the BULLET_LIBRARY, cached in BULLET_INDEX"""
+
+    def __init__(self, app=None):
+        self.library_path = None
+        self.index_path = None
+        self._ranker: Optional[BulletRanker] = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Read the library and index locations from the Flask config"""
+        self.library_path = app.config.get('BULLET_LIBRARY')
+        self.index_path = app.config.get('BULLET_INDEX') or os.path.join(app.instance_path, 'bullet_index.npz')
+        self._ranker = None
+        app.extensions['bullet_library'] = self
+
+    @property
+    def enabled(self) -> bool:
+        """Whether a library is configured and NumPy is installed"""
+        return bool(self.library_path) and BulletRanker.available()
+
+    @property
+    def ranker(self) -> BulletRanker:
+        """The fitted ranker, loaded from the index unless the library has changed"""
+        if self._ranker is None:
+            with self._lock:
+                if self._ranker is None:
+                    self._ranker = self._load_or_fit()
+        return self._ranker
+
+    def _load_or_fit(self) -> BulletRanker:
+        with open(self.library_path, 'rb') as f:
+            content = f.read()
+        # Compare content rather than mtimes, so a replaced library with an older mtime still rebuilds
+        fingerprint = hashlib.sha256(content).hexdigest()
+        if os.path.exists(self.index_path):
+            try:
+                ranker = BulletRanker.load(self.index_path)
+                if ranker.fingerprint == fingerprint:
+                    return ranker
+                logger.info(f"Bullet library {self.library_path} changed; rebuilding the index")
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning(f"Rebuilding unreadable bullet index {self.index_path}: {e}")
+
+        ranker = BulletRanker().fit(json.loads(content.decode('utf-8')))
+        ranker.fingerprint = fingerprint
+        try:
+            ranker.save(self.index_path)
+        except OSError as e:
+            logger.warning(f"Could not save bullet index {self.index_path}: {e}")
+        logger.info(f"Indexed {len(ranker.bullets)} bullets in {len(ranker.stacks)} stacks")
+        return ranker
+
+
+bullet_library = BulletLibrary()
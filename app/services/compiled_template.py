@@ -0,0 +1,106 @@
+from copy import deepcopy
+from docx.text.paragraph import Paragraph
+from app.services.document_service import AnchorIndex, DocumentService
+import logging
+import threading
+from typing import Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+class CompiledTemplate:
+    """A resume parsed once and rendered against many job descriptions.
+
+    Compiling records where each project's bullets go and the formatting they
+    copy. Rendering restores the pristine body in memory, inserts the bullets
+    at the recorded anchors and saves, so the source file is never re-read.
+    """
+
+    def __init__(self, input_path: str, anchor_method: str = 'placeholders', engine: str = 'zip'):
+        if input_path.lower().endswith('.doc'):
+            input_path = DocumentService._convert_doc_to_docx(input_path)
+
+        self.anchor_method = anchor_method
+        self.document = DocumentService.open_document(input_path, engine)
+        self._body = self.document.element.body
+        self._pristine = [deepcopy(child) for child in self._body]
+        self._lock = threading.Lock()
+        self._dirty = False
+        # {project_num: [(anchor_path, style_info)]}
+        self.anchors: Dict[int, List[Tuple[Tuple[int, ...], tuple]]] = {}
+
+        index = AnchorIndex(self.document)
+        for project_num in range(1, 4):
+            if anchor_method == 'placeholders':
+                self.anchors[project_num] = self._compile_placeholders(index, project_num)
+            else:
+                self.anchors[project_num] = self._compile_heuristics(index, project_num)
+
+    def render(self, output_path: str, tech_stacks: Dict[str, List[str]]) -> str:
+        """Produce one tailored resume from the template"""
+        with self._lock:
+            if self._dirty:
+                self._restore_body()
+            self._dirty = True
+            resolved = {
+                project_num: [(self._resolve(path), style_info) for path, style_info in anchors]
+                for project_num, anchors in self.anchors.items()
+            }
+
+            for project_num, anchors in resolved.items():
+                bullets = DocumentService._collect_bullets_for_project(tech_stacks, project_num)
+                for anchor, style_info in anchors:
+                    self._insert(anchor, project_num, bullets, style_info)
+
+            self.document.save(output_path)
+        return output_path
+
+    def render_many(self, variants: List[Tuple[str, Dict[str, List[str]]]]) -> List[str]:
+        """Produce one tailored resume per (output_path, tech_stacks) pair"""
+        return [self.render(output_path, tech_stacks) for output_path, tech_stacks in variants]
+
+    def _compile_placeholders(self, index: AnchorIndex, project_num: int):
+        """Record every paragraph holding the project's placeholder"""
+        anchors = []
+        for paragraph in index.placeholders.get(project_num, []):
+            # Clearing the placeholder rewrites the paragraph as a single
+            # unformatted run, which is what the bullets then copy from
+            style_info = (paragraph.style, (None, None))
+            anchors.append((self._path_of(paragraph._p), style_info))
+        return anchors
+
+    def _compile_heuristics(self, index: AnchorIndex, project_num: int):
+        """Record the Responsibilities paragraph following the project header"""
+        if project_num not in index.heuristics:
+            return []
+        header, responsibilities = index.heuristics[project_num]
+        style_info = DocumentService._capture_paragraph_style(header)
+        return [(self._path_of(responsibilities._p), style_info)]
+
+    def _insert(self, anchor: Paragraph, project_num: int, bullets: List[str], style_info):
+        """Insert bullets before an anchor paragraph"""
+        if self.anchor_method == 'placeholders':
+            placeholder = f'{{{{PROJECT{project_num}_RESP}}}}'
+            anchor.text = anchor.text.replace(placeholder, '')
+        DocumentService._insert_before(anchor, bullets, style_info)
+
+    def _path_of(self, element) -> Tuple[int, ...]:
+        """Child-index path from the body to an element"""
+        path = []
+        while element is not self._body:
+            parent = element.getparent()
+            path.append(parent.index(element))
+            element = parent
+        return tuple(reversed(path))
+
+    def _resolve(self, path: Tuple[int, ...]) -> Paragraph:
+        """Find the paragraph at a child-index path in the current body"""
+        element = self._body
+        for index in path:
+            element = element[index]
+        return Paragraph(element, self.document)
+
+    def _restore_body(self):
+        """Replace the working body content with a copy of the compiled original"""
+        for child in list(self._body):
+            self._body.remove(child)
+        self._body.extend(deepcopy(child) for child in self._pristine)
@@ -0,0 +1,26 @@
+import hashlib
+import os
+from app.utils.disk_cache import DiskCache
+
+
+class ConversionCache(DiskCache):
+    """Disk cache of LibreOffice outputs keyed on input content and target format"""
+
+    def init_app(self, app):
+        """Read cache settings from the Flask config"""
+        self.cache_dir = app.config.get('CONVERSION_CACHE_DIR') or \
+            os.path.join(app.instance_path, 'conversion_cache')
+        self.max_bytes = app.config.get('CONVERSION_CACHE_MAX_BYTES', 0)
+        app.extensions['conversion_cache'] = self
+
+    def key_for(self, input_path: str, target_format: str) -> str:
+        """Build the cache key for converting input_path to target_format"""
+        return f"{self.hash_file(input_path)}.{target_format}"
+
+    @staticmethod
+    def key_for_bytes(data: bytes, target_format: str) -> str:
+        """Build the cache key for converting an in-memory document to target_format"""
+        return f"{hashlib.sha256(data).hexdigest()}.{target_format}"
+
+
+conversion_cache = ConversionCache()
@@ -0,0 +1,308 @@
+import atexit
+import itertools
+import logging
+import os
+import queue
+import shutil
+import socket
+import subprocess
+import threading
+import time
+from typing import List
+
+logger = logging.getLogger(__name__)
+
+try:
+    import uno
+    from com.sun.star.beans import PropertyValue
+except ImportError:  # LibreOffice's Python bindings are only present alongside an install
+    uno = None
+    PropertyValue = None
+
+# LibreOffice export filters for each supported target format
+EXPORT_FILTERS = {
+    'docx': 'MS Word 2007 XML',
+    'pdf': 'writer_pdf_Export',
+}
+
+
+class ConversionTimeout(Exception):
+    """Raised when a pooled conversion does not finish within the configured timeout"""
+
+
+def _free_port() -> int:
+    """Ask the OS for an unused localhost port"""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _props(**kwargs):
+    """Build a tuple of UNO PropertyValues from keyword arguments"""
+    values = []
+    for name, value in kwargs.items():
+        prop = PropertyValue()
+        prop.Name = name
+        prop.Value = value
+        values.append(prop)
+    return tuple(values)
+
+
+class SofficeInstance:
+    """A long-lived headless LibreOffice process driven over a UNO socket"""
+
+    def __init__(self, binary: str, profile_dir: str, startup_timeout: float):
+        self.binary = binary
+        self.profile_dir = profile_dir
+        self.startup_timeout = startup_timeout
+        self.port = None
+        self.process = None
+        self.desktop = None
+
+    def start(self):
+        """Launch soffice with a private profile and connect to its UNO socket"""
+        os.makedirs(self.profile_dir, exist_ok=True)
+        self.port = _free_port()
+        self.process = subprocess.Popen([
+            self.binary,
+            '--headless',
+            '--invisible',
+            '--nologo',
+            '--norestore',
+            '--nodefault',
+            '--nolockcheck',
+            f'-env:UserInstallation=file://{os.path.abspath(self.profile_dir)}',
+            f'--accept=socket,host=127.0.0.1,port={self.port};urp;StarOffice.ComponentContext',
+        ], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+        local_context = uno.getComponentContext()
+        resolver = local_context.ServiceManager.createInstanceWithContext(
+            'com.sun.star.bridge.UnoUrlResolver', local_context)
+        deadline = time.monotonic() + self.startup_timeout
+        while True:
+            try:
+                context = resolver.resolve(
+                    f'uno:socket,host=127.0.0.1,port={self.port};urp;StarOffice.ComponentContext')
+                break
+            except Exception:
+                if self.process.poll() is not None or time.monotonic() > deadline:
+                    self.kill()
+                    raise RuntimeError(f"LibreOffice instance on port {self.port} failed to start")
+                time.sleep(0.25)
+
+        self.desktop = context.ServiceManager.createInstanceWithContext(
+            'com.sun.star.frame.Desktop', context)
+        logger.info(f"Started LibreOffice instance on port {self.port} (pid {self.process.pid})")
+
+    def is_healthy(self) -> bool:
+        """Check the process is alive and answers a trivial UNO call"""
+        if self.process is None or self.process.poll() is not None or self.desktop is None:
+            return False
+        try:
+            self.desktop.getFrames()
+            return True
+        except Exception:
+            return False
+
+    def convert(self, input_path: str, output_path: str, target_format: str):
+        """Load input_path, export it to output_path and close the document"""
+        document = self.desktop.loadComponentFromURL(
+            uno.systemPathToFileUrl(os.path.abspath(input_path)),
+            '_blank', 0, _props(Hidden=True, ReadOnly=True))
+        if document is None:
+            raise RuntimeError(f"LibreOffice could not open {input_path}")
+        try:
+            document.storeToURL(
+                uno.systemPathToFileUrl(os.path.abspath(output_path)),
+                _props(FilterName=EXPORT_FILTERS[target_format], Overwrite=True))
+        finally:
+            document.close(True)
+
+    def kill(self):
+        """Terminate the soffice process, escalating to SIGKILL if it hangs"""
+        self.desktop = None
+        if self.process is None:
+            return
+        if self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+        self.process = None
+
+
+class ConversionPool:
+    """Pool of persistent LibreOffice instances used by ConversionService"""
+
+    def __init__(self, app=None):
+        self.size = 0
+        self.timeout = 60
+        self.startup_timeout = 30
+        self.binary = 'soffice'
+        self.profile_root = None
+        self._idle = queue.Queue()
+        self._instances: List[SofficeInstance] = []
+        self._spawned = 0
+        # Never reused, so a replacement never shares a live instance's profile
+        self._profile_ids = itertools.count()
+        self._lock = threading.Lock()
+        self._registered_exit = False
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Read pool settings from the Flask config"""
+        self.size = app.config.get('LIBREOFFICE_POOL_SIZE', 0)
+        self.timeout = app.config.get('CONVERSION_TIMEOUT', 60)
+        self.startup_timeout = app.config.get('LIBREOFFICE_STARTUP_TIMEOUT', 30)
+        self.binary = app.config.get('LIBREOFFICE_BINARY', 'soffice')
+        self.profile_root = os.path.join(app.instance_path, 'libreoffice_profiles')
+        app.extensions['conversion_pool'] = self
+        if self.size > 0 and not self.enabled:
+            missing = 'the uno module' if uno is None else f"the {self.binary} binary"
+            logger.warning(
+                f"LIBREOFFICE_POOL_SIZE is {self.size} but {missing} is unavailable; "
+                "conversions will start a new soffice process each time"
+            )
+
+    @property
+    def enabled(self) -> bool:
+        """Whether conversions can be routed through the pool"""
+        return (
+            self.size > 0
+            and self.profile_root is not None
+            and uno is not None
+            and shutil.which(self.binary) is not None
+        )
+
+    def convert(self, input_path: str, output_path: str, target_format: str) -> str:
+        """Convert a file on a pooled instance, respawning it on hang or failure"""
+        if target_format not in EXPORT_FILTERS:
+            raise ValueError(f"Unsupported target format: {target_format}")
+
+        instance = self._checkout()
+        errors = []
+
+        def run():
+            try:
+                instance.convert(input_path, output_path, target_format)
+            except Exception as e:
+                errors.append(e)
+
+        worker = threading.Thread(target=run, daemon=True)
+        worker.start()
+        worker.join(self.timeout)
+
+        if worker.is_alive():
+            logger.error(f"LibreOffice conversion of {input_path} timed out after {self.timeout}s")
+            self._respawn(instance)
+            raise ConversionTimeout(f"Conversion of {input_path} timed out")
+
+        if errors:
+            logger.error(f"Pooled LibreOffice conversion failed: {errors[0]}")
+            if not instance.is_healthy():
+                self._respawn(instance)
+            else:
+                self._idle.put(instance)
+            raise errors[0]
+
+        self._idle.put(instance)
+        return output_path
+
+    def shutdown(self):
+        """Stop every pooled instance"""
+        with self._lock:
+            for instance in self._instances:
+                instance.kill()
+                shutil.rmtree(instance.profile_dir, ignore_errors=True)
+            self._instances = []
+            self._spawned = 0
+            self._idle = queue.Queue()
+
+    def reset(self):
+        """Forget instances inherited from a parent process without stopping them.
+
+        A forked worker shares the parent's instances and lock; the parent
+        still owns those, so the worker starts from an empty pool.
+        """
+        self._idle = queue.Queue()
+        self._instances = []
+        self._spawned = 0
+        self._lock = threading.Lock()
+        self._registered_exit = False
+
+    def _checkout(self) -> SofficeInstance:
+        """Take an idle healthy instance, starting new ones up to the pool size"""
+        with self._lock:
+            spawn = self._idle.empty() and self._spawned < self.size
+            if spawn:
+                self._spawned += 1
+
+        if spawn:
+            try:
+                instance = self._spawn()
+            except Exception:
+                with self._lock:
+                    self._spawned -= 1
+                raise
+            with self._lock:
+                self._instances.append(instance)
+                if not self._registered_exit:
+                    atexit.register(self.shutdown)
+                    self._registered_exit = True
+            return instance
+
+        try:
+            instance = self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise ConversionTimeout("No LibreOffice instance became available")
+
+        if not instance.is_healthy():
+            logger.warning(f"LibreOffice instance on port {instance.port} failed health check")
+            try:
+                instance = self._restart(instance)
+            except Exception:
+                self._discard(instance)
+                raise
+        return instance
+
+    def _spawn(self) -> SofficeInstance:
+        """Create and start an instance with its own profile directory"""
+        with self._lock:
+            profile_id = next(self._profile_ids)
+        profile_dir = os.path.join(self.profile_root, f'{os.getpid()}_{profile_id}')
+        instance = SofficeInstance(self.binary, profile_dir, self.startup_timeout)
+        try:
+            instance.start()
+        except Exception:
+            shutil.rmtree(profile_dir, ignore_errors=True)
+            raise
+        return instance
+
+    def _restart(self, instance: SofficeInstance) -> SofficeInstance:
+        """Kill an instance and start it again on the same profile"""
+        instance.kill()
+        instance.start()
+        return instance
+
+    def _respawn(self, instance: SofficeInstance):
+        """Replace a hung or broken instance and return it to the idle queue"""
+        try:
+            self._idle.put(self._restart(instance))
+        except Exception as e:
+            logger.error(f"Failed to respawn LibreOffice instance: {e}")
+            self._discard(instance)
+
+    def _discard(self, instance: SofficeInstance):
+        """Forget an instance that could not be restarted so a new one can be spawned"""
+        instance.kill()
+        shutil.rmtree(instance.profile_dir, ignore_errors=True)
+        with self._lock:
+            if instance in self._instances:
+                self._instances.remove(instance)
+                self._spawned -= 1
+
+
+conversion_pool = ConversionPool()
@@ -2,10 +2,20 @@ import pythoncom
 import subprocess
 import os
 import logging
-from typing import Optional
+import tempfile
+from typing import List, Optional, Tuple
+from app.services.conversion_cache import conversion_cache
+from app.services.conversion_pool import conversion_pool
+from app.utils.metrics import metrics
 
 logger = logging.getLogger(__name__)
 
+# Source extension each target format is converted from
+SOURCE_FORMATS = {
+    'docx': 'doc',
+    'pdf': 'docx',
+}
+
 class ConversionService:
     @staticmethod
     def convert_to_docx(input_path: str, output_dir: Optional[str] = None) -> str:
@@ -13,30 +23,7 @@ class ConversionService:
         if not input_path.lower().endswith('.doc'):
             raise ValueError("Input file must be a .doc file")
         
-        output_dir = output_dir or os.path.dirname(input_path)
-        output_path = os.path.join(
-            output_dir,
-            f"{os.path.splitext(os.path.basename(input_path))[0]}.docx"
-        )
-        
-        try:
-            pythoncom.CoInitialize()
-            subprocess.run([
-                'soffice',
-                '--headless',
-                '--convert-to',
-                'docx',
-                '--outdir',
-                output_dir,
-                input_path
-            ], check=True)
-            return output_path
-        except subprocess.CalledProcessError as e:
-            logger.error(f"LibreOffice conversion failed: {e}")
-            raise
-        except Exception as e:
-            logger.error(f"Unexpected conversion error: {e}")
-            raise
+        return ConversionService._convert(input_path, 'docx', output_dir)
 
     @staticmethod
     def convert_to_pdf(input_path: str, output_dir: Optional[str] = None) -> str:
@@ -44,27 +31,186 @@ class ConversionService:
         if not input_path.lower().endswith('.docx'):
             raise ValueError("Input file must be a .docx file")
         
+        return ConversionService._convert(input_path, 'pdf', output_dir)
+
+    @staticmethod
+    def convert_batch(
+        input_paths: List[str],
+        target_format: str,
+        output_dir: Optional[str] = None
+    ) -> List[Tuple[str, Optional[str], Optional[str]]]:
+        """Convert many files, returning (input_path, output_path, error) for each.
+
+        Cache hits are served first; the remaining files go to the LibreOffice
+        pool, or otherwise to a single soffice run, so a batch pays for one
+        startup instead of one per file. Outputs are written to output_dir
+        (default: next to each input). A failed file reports its error without
+        affecting the others.
+        """
+        if target_format not in SOURCE_FORMATS:
+            raise ValueError(f"Unsupported target format: {target_format}")
+        
+        results = {}
+        pending = []
+        claimed = set()
+        for input_path in input_paths:
+            output_path = os.path.join(
+                output_dir or os.path.dirname(input_path),
+                f"{os.path.splitext(os.path.basename(input_path))[0]}.{target_format}"
+            )
+            if not input_path.lower().endswith(f".{SOURCE_FORMATS[target_format]}"):
+                results[input_path] = (None, f"Input file must be a .{SOURCE_FORMATS[target_format]} file")
+            elif output_path in claimed:
+                # soffice names outputs after the input, so a second file would overwrite the first
+                results[input_path] = (None, f"Another input already converts to {output_path}")
+            else:
+                try:
+                    # Hashing reads the input, so a missing or unreadable file fails here
+                    cache_key = conversion_cache.key_for(input_path, target_format) if conversion_cache.enabled else None
+                    if not cache_key:
+                        os.stat(input_path)
+                    hit = bool(cache_key) and conversion_cache.fetch(cache_key, output_path)
+                except OSError as e:
+                    results[input_path] = (None, str(e))
+                    continue
+                claimed.add(output_path)
+                if hit:
+                    results[input_path] = (output_path, None)
+                else:
+                    pending.append((input_path, output_path, cache_key))
+        
+        if pending:
+            with metrics.stage(f'convert_{target_format}_batch'):
+                errors = ConversionService._run_batch(pending, target_format)
+            for input_path, output_path, cache_key in pending:
+                error = errors.get(input_path)
+                if error is None and cache_key:
+                    conversion_cache.store(cache_key, output_path)
+                results[input_path] = (None, error) if error else (output_path, None)
+        
+        return [(input_path,) + results[input_path] for input_path in input_paths]
+
+    @staticmethod
+    def convert_bytes(data: bytes, source_format: str, target_format: str) -> bytes:
+        """Convert an in-memory document, touching disk only on a cache miss.
+
+        LibreOffice needs real files, so a miss converts inside a private
+        scratch directory that is removed straight afterwards.
+        """
+        cache_key = None
+        if conversion_cache.enabled:
+            cache_key = conversion_cache.key_for_bytes(data, target_format)
+            entry = conversion_cache.lookup(cache_key)
+            if entry is not None:
+                try:
+                    with open(entry, 'rb') as f:
+                        return f.read()
+                except FileNotFoundError:
+                    # Evicted by another worker between lookup and read
+                    pass
+        
+        with tempfile.TemporaryDirectory(prefix='convert-') as scratch:
+            input_path = os.path.join(scratch, f"input.{source_format}")
+            output_path = os.path.join(scratch, f"input.{target_format}")
+            with open(input_path, 'wb') as f:
+                f.write(data)
+            ConversionService._run_converter(input_path, output_path, scratch, target_format)
+            if cache_key:
+                conversion_cache.store(cache_key, output_path)
+            with open(output_path, 'rb') as f:
+                return f.read()
+
+    @staticmethod
+    def _convert(input_path: str, target_format: str, output_dir: Optional[str] = None) -> str:
+        """Convert via the cache, the LibreOffice pool, or a one-off soffice run"""
         output_dir = output_dir or os.path.dirname(input_path)
         output_path = os.path.join(
             output_dir,
-            f"{os.path.splitext(os.path.basename(input_path))[0]}.pdf"
+            f"{os.path.splitext(os.path.basename(input_path))[0]}.{target_format}"
         )
         
+        cache_key = None
+        if conversion_cache.enabled:
+            cache_key = conversion_cache.key_for(input_path, target_format)
+            if conversion_cache.fetch(cache_key, output_path):
+                return output_path
+        
+        ConversionService._run_converter(input_path, output_path, output_dir, target_format)
+        
+        if cache_key:
+            conversion_cache.store(cache_key, output_path)
+        return output_path
+
+    @staticmethod
+    def _run_converter(input_path: str, output_path: str, output_dir: str, target_format: str):
+        """Run LibreOffice on a single file"""
+        with metrics.stage(f'convert_{target_format}'):
+            ConversionService._run_soffice(input_path, output_path, output_dir, target_format)
+
+    @staticmethod
+    def _run_batch(pending: List[Tuple[str, str, Optional[str]]], target_format: str) -> dict:
+        """Convert (input_path, output_path, cache_key) items, returning errors by input path"""
+        errors = {}
+        if conversion_pool.enabled:
+            for input_path, output_path, _ in pending:
+                try:
+                    conversion_pool.convert(input_path, output_path, target_format)
+                except Exception as e:
+                    errors[input_path] = str(e)
+            return errors
+        
+        # soffice takes a single --outdir, so run once per distinct output folder
+        by_dir = {}
+        for input_path, output_path, _ in pending:
+            by_dir.setdefault(os.path.dirname(output_path), []).append((input_path, output_path))
+        for output_dir, items in by_dir.items():
+            for _, output_path in items:
+                # Drop stale outputs so a missing file reliably means that input failed
+                if os.path.exists(output_path):
+                    os.remove(output_path)
+            failure = None
+            try:
+                ConversionService._soffice(
+                    [input_path for input_path, _ in items],
+                    output_dir,
+                    target_format,
+                    conversion_pool.timeout * len(items)
+                )
+            except Exception as e:
+                failure = str(e)
+            for input_path, output_path in items:
+                if not os.path.exists(output_path):
+                    errors[input_path] = failure or f"LibreOffice produced no output for {input_path}"
+        return errors
+
+    @staticmethod
+    def _run_soffice(input_path: str, output_path: str, output_dir: str, target_format: str):
+        if conversion_pool.enabled:
+            conversion_pool.convert(input_path, output_path, target_format)
+            return
+        
+        ConversionService._soffice([input_path], output_dir, target_format, conversion_pool.timeout)
+
+    @staticmethod
+    def _soffice(input_paths: List[str], output_dir: str, target_format: str, timeout: float):
+        """Run one soffice process converting every input into output_dir"""
         try:
             pythoncom.CoInitialize()
             subprocess.run([
-                'soffice',
+                # LIBREOFFICE_BINARY, as used by the pool
+                conversion_pool.binary,
                 '--headless',
                 '--convert-to',
-                'pdf',
+                target_format,
                 '--outdir',
-                output_dir,
-                input_path
-            ], check=True)
-            return output_path
+                output_dir
+            ] + input_paths, check=True, timeout=timeout)
         except subprocess.CalledProcessError as e:
-            logger.error(f"LibreOffice PDF conversion failed: {e}")
+            logger.error(f"LibreOffice {target_format.upper()} conversion failed: {e}")
+            raise
+        except subprocess.TimeoutExpired as e:
+            logger.error(f"LibreOffice {target_format.upper()} conversion timed out: {e}")
             raise
         except Exception as e:
-            logger.error(f"Unexpected PDF conversion error: {e}")
+            logger.error(f"Unexpected {target_format.upper()} conversion error: {e}")
             raise
\ No newline at end of file
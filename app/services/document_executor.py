@@ -0,0 +1,189 @@
+import concurrent.futures
+import contextvars
+import logging
+import multiprocessing
+import multiprocessing.util
+import os
+import threading
+from types import SimpleNamespace
+from typing import Callable, Optional
+from app.utils.logging_utils import request_id
+from app.utils.metrics import metrics
+from app.utils.profiling import RequestProfiler, profile_label, request_profiler
+
+logger = logging.getLogger(__name__)
+
+
+class ExecutorBusy(Exception):
+    """Raised when the document executor's queue stays full for too long"""
+
+
+def _init_worker(config: dict, instance_path: str):
+    """Configure logging, the conversion cache and the pool inside a freshly started worker process"""
+    # Workers start from a clean interpreter, so they have no log handlers yet
+    if not logging.getLogger().handlers:
+        from app.utils.logging_utils import configure_logging
+        configure_logging()
+    # A worker that was forked would inherit the parent's samples; never ship them back
+    metrics.drain()
+    if instance_path is None:
+        return
+    from app.services.conversion_cache import conversion_cache
+    from app.services.conversion_pool import conversion_pool
+    conversion_pool.reset()
+    worker_app = SimpleNamespace(config=config, instance_path=instance_path, extensions={})
+    conversion_cache.init_app(worker_app)
+    conversion_pool.init_app(worker_app)
+    # atexit hooks never run in pool workers, but multiprocessing finalizers do
+    multiprocessing.util.Finalize(conversion_pool, conversion_pool.shutdown, exitpriority=10)
+
+
+def _run_in_worker(correlation_id: str, profile: Optional[tuple], fn: Callable, *args):
+    """Run fn in a worker process under the caller's request ID.
+
+    Returns (result, error, metrics samples) so stage timings recorded in
+    the worker reach the parent's /metrics even when fn fails. When the
+    calling request is being profiled, profile is (folder, label, max_files,
+    max_bytes) and fn runs under cProfile too.
+    """
+    request_id.set(correlation_id)
+    try:
+        if profile is None:
+            result, error = fn(*args), None
+        else:
+            folder, label, max_files, max_bytes = profile
+            with RequestProfiler.capture(folder, f"{label}-worker{os.getpid()}", max_files, max_bytes):
+                result, error = fn(*args), None
+    except Exception as e:
+        result, error = None, e
+    return result, error, metrics.drain()
+
+
+class DocumentExecutor:
+    """Long-lived, app-level pool for CPU-bound document work.
+
+    python-docx/lxml manipulation holds the GIL, so injection runs in worker
+    processes. Tasks receive file paths, never parsed documents. At most
+    DOCUMENT_WORKERS tasks run and DOCUMENT_QUEUE_SIZE more may wait; beyond
+    that, submit() blocks for DOCUMENT_QUEUE_TIMEOUT seconds and then raises
+    ExecutorBusy.
+    """
+
+    def __init__(self, app=None):
+        self.mode = 'process'
+        self.max_workers = os.cpu_count() or 1
+        self.max_pending = 32
+        self.queue_timeout = 30
+        self._worker_config = {}
+        self._instance_path = None
+        self._executor = None
+        self._slots = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Read executor settings from the Flask config"""
+        self.mode = app.config.get('DOCUMENT_EXECUTOR', 'process')
+        self.max_workers = app.config.get('DOCUMENT_WORKERS') or os.cpu_count() or 1
+        self.max_pending = app.config.get('DOCUMENT_QUEUE_SIZE', 32)
+        self.queue_timeout = app.config.get('DOCUMENT_QUEUE_TIMEOUT', 30)
+        self._worker_config = {
+            key: value for key, value in app.config.items()
+            if key.startswith(('CONVERSION_', 'LIBREOFFICE_'))
+        }
+        self._instance_path = app.instance_path
+        app.extensions['document_executor'] = self
+
+    def submit(self, fn: Callable, *args) -> concurrent.futures.Future:
+        """Queue fn(*args), waiting for a free slot if the queue is full"""
+        executor, slots = self._get_executor()
+        if not slots.acquire(timeout=self.queue_timeout):
+            raise ExecutorBusy("Document processing queue is full")
+        try:
+            label = profile_label.get()
+            if self.mode == 'thread':
+                # Threads share this process's registry; just carry the request ID across
+                if label is not None:
+                    fn = self._profiled(fn, label)
+                future = executor.submit(contextvars.copy_context().run, fn, *args)
+            else:
+                profile = None
+                if label is not None:
+                    profile = (request_profiler.folder, label, request_profiler.max_files, request_profiler.max_bytes)
+                future = self._unwrap(executor.submit(_run_in_worker, request_id.get(), profile, fn, *args))
+        except Exception:
+            slots.release()
+            raise
+        future.add_done_callback(lambda _: slots.release())
+        return future
+
+    def run(self, fn: Callable, *args):
+        """Run fn(*args) on the pool and wait for its result"""
+        return self.submit(fn, *args).result()
+
+    @staticmethod
+    def _profiled(fn: Callable, label: str) -> Callable:
+        """Wrap fn so it runs under cProfile in its pool thread"""
+        def run(*args):
+            with RequestProfiler.capture(
+                request_profiler.folder,
+                f"{label}-{threading.current_thread().name}",
+                request_profiler.max_files,
+                request_profiler.max_bytes
+            ):
+                return fn(*args)
+        return run
+
+    @staticmethod
+    def _unwrap(inner: concurrent.futures.Future) -> concurrent.futures.Future:
+        """Turn a _run_in_worker future into one resolving to fn's own result"""
+        outer = concurrent.futures.Future()
+
+        def done(future):
+            try:
+                result, error, samples = future.result()
+            except Exception as e:
+                outer.set_exception(e)
+                return
+            metrics.merge(samples)
+            if error is not None:
+                outer.set_exception(error)
+            else:
+                outer.set_result(result)
+
+        inner.add_done_callback(done)
+        return outer
+
+    def shutdown(self, wait: bool = True):
+        """Stop the worker pool"""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=wait)
+                self._executor = None
+
+    def _get_executor(self):
+        # Created lazily so each forked gunicorn worker owns its own pool
+        with self._lock:
+            if self._executor is None:
+                if self.mode == 'thread':
+                    self._executor = concurrent.futures.ThreadPoolExecutor(
+                        max_workers=self.max_workers,
+                        thread_name_prefix='document'
+                    )
+                else:
+                    # By now the outbox and janitor threads are running, and a plain fork
+                    # could copy one of their locks mid-hold into the child
+                    start_method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+                    self._executor = concurrent.futures.ProcessPoolExecutor(
+                        max_workers=self.max_workers,
+                        mp_context=multiprocessing.get_context(start_method),
+                        initializer=_init_worker,
+                        initargs=(self._worker_config, self._instance_path)
+                    )
+                self._slots = threading.BoundedSemaphore(self.max_workers + self.max_pending)
+                logger.info(f"Started {self.mode} document executor with {self.max_workers} workers")
+            return self._executor, self._slots
+
+
+document_executor = DocumentExecutor()
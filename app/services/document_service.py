@@ -1,50 +1,160 @@
+from copy import deepcopy
 from docx import Document
+from docx.oxml import OxmlElement
+from docx.oxml.ns import qn
 from docx.shared import Pt
-import pythoncom
-import subprocess
+from docx.text.paragraph import Paragraph
+from app.services.conversion_service import ConversionService
+from app.services.zip_document import ZipDocument
+from app.utils.metrics import metrics
+import io
 import logging
-import os
-from typing import List, Dict
+import re
+from typing import BinaryIO, List, Dict, Tuple, Union
 
 logger = logging.getLogger(__name__)
 
+# No leading zeros: {{PROJECT01_RESP}} is not the literal {{PROJECT1_RESP}} anchor
+PLACEHOLDER_PATTERN = re.compile(r'\{\{PROJECT([1-9]\d*)_RESP\}\}')
+HEURISTIC_WINDOW = 5  # paragraphs after a project header searched for "Responsibilities"
+ENGINES = ('zip', 'python-docx')  # 'zip' rewrites only word/document.xml
+
+class AnchorIndex:
+    """Insertion anchors for every project, found in one pass over the document.
+
+    Paragraphs are visited in document order, including those nested in
+    tables, and each paragraph's text is read exactly once.
+    """
+
+    def __init__(self, doc, project_nums=range(1, 4)):
+        self.placeholders: Dict[int, List[Paragraph]] = {n: [] for n in project_nums}
+        self.heuristics: Dict[int, Tuple[Paragraph, Paragraph]] = {}
+
+        paragraphs = []
+        is_responsibilities = []
+        headers: Dict[int, List[int]] = {n: [] for n in project_nums}
+
+        for p in AnchorIndex.iter_paragraph_elements(doc.element.body):
+            paragraph = Paragraph(p, doc)
+            text = paragraph.text
+            position = len(paragraphs)
+            paragraphs.append(paragraph)
+            is_responsibilities.append('Responsibilities' in text)
+
+            for match in set(PLACEHOLDER_PATTERN.findall(text)):
+                if int(match) in self.placeholders:
+                    self.placeholders[int(match)].append(paragraph)
+            for project_num in project_nums:
+                if f'Project {project_num}' in text:
+                    headers[project_num].append(position)
+
+        # next_responsibilities[i] is the first "Responsibilities" paragraph at or after i
+        next_responsibilities = [None] * (len(paragraphs) + 1)
+        for position in range(len(paragraphs) - 1, -1, -1):
+            next_responsibilities[position] = (
+                position if is_responsibilities[position] else next_responsibilities[position + 1]
+            )
+
+        for project_num, positions in headers.items():
+            for position in positions:
+                target = next_responsibilities[position]
+                if target is not None and target < position + HEURISTIC_WINDOW:
+                    self.heuristics[project_num] = (paragraphs[position], paragraphs[target])
+                    break
+
+    @staticmethod
+    def iter_paragraph_elements(container):
+        """Yield block-level <w:p> elements in document order, descending into tables"""
+        stack = [iter(container)]
+        while stack:
+            for child in stack[-1]:
+                if child.tag == qn('w:p'):
+                    yield child
+                elif child.tag in (qn('w:tbl'), qn('w:tr'), qn('w:tc'), qn('w:sdt'), qn('w:sdtContent')):
+                    stack.append(iter(child))
+                    break
+            else:
+                stack.pop()
+
 class DocumentService:
     @staticmethod
     def inject_bullet_points(
         input_path: str,
         output_path: str,
         tech_stacks: Dict[str, List[str]],
-        anchor_method: str = 'placeholders'
+        anchor_method: str = 'placeholders',
+        engine: str = 'zip'
     ) -> str:
         """Main method to process resume with bullet points"""
         if input_path.lower().endswith('.doc'):
             input_path = DocumentService._convert_doc_to_docx(input_path)
         
-        doc = Document(input_path)
+        with metrics.stage('document_open'):
+            doc = DocumentService.open_document(input_path, engine)
+        with metrics.stage('document_insert'):
+            DocumentService._inject(doc, tech_stacks, anchor_method)
+        with metrics.stage('document_save'):
+            doc.save(output_path)
+        return output_path
+
+    @staticmethod
+    def inject_bullet_points_bytes(
+        data: bytes,
+        filename: str,
+        tech_stacks: Dict[str, List[str]],
+        anchor_method: str = 'placeholders',
+        engine: str = 'zip'
+    ) -> bytes:
+        """In-memory variant of inject_bullet_points: resume bytes in, tailored .docx bytes out"""
+        if filename.lower().endswith('.doc'):
+            data = ConversionService.convert_bytes(data, 'doc', 'docx')
         
+        with metrics.stage('document_open'):
+            doc = DocumentService.open_document(io.BytesIO(data), engine)
+        with metrics.stage('document_insert'):
+            DocumentService._inject(doc, tech_stacks, anchor_method)
+        with metrics.stage('document_save'):
+            output = io.BytesIO()
+            doc.save(output)
+        return output.getvalue()
+
+    @staticmethod
+    def inject_bullet_points_many(
+        input_path: str,
+        variants: List[Tuple[str, Dict[str, List[str]]]],
+        anchor_method: str = 'placeholders',
+        engine: str = 'zip'
+    ) -> List[str]:
+        """Tailor one resume for many job descriptions, parsing it only once"""
+        from app.services.compiled_template import CompiledTemplate
+        return CompiledTemplate(input_path, anchor_method, engine).render_many(variants)
+
+    @staticmethod
+    def open_document(input_path: Union[str, BinaryIO], engine: str = 'zip'):
+        """Open a .docx with the given engine; both expose .element, .part and .save()"""
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown document engine: {engine}")
+        if engine == 'zip':
+            try:
+                return ZipDocument(input_path)
+            except ValueError as e:
+                # e.g. no styles part, which python-docx would create on save
+                logger.warning(f"Falling back to python-docx for {input_path}: {e}")
+        return Document(input_path)
+
+    @staticmethod
+    def _inject(doc, tech_stacks: Dict[str, List[str]], anchor_method: str):
+        """Insert every project's bullets into an open document"""
+        index = AnchorIndex(doc)
         for project_num in range(1, 4):
             bullets = DocumentService._collect_bullets_for_project(tech_stacks, project_num)
-            DocumentService._insert_bullets(doc, project_num, bullets, anchor_method)
-        
-        doc.save(output_path)
-        return output_path
+            DocumentService._insert_bullets(index, project_num, bullets, anchor_method)
 
     @staticmethod
     def _convert_doc_to_docx(input_path: str) -> str:
         """Convert .doc to .docx using LibreOffice"""
-        output_path = os.path.splitext(input_path)[0] + '.docx'
         try:
-            pythoncom.CoInitialize()
-            subprocess.run([
-                'soffice',
-                '--headless',
-                '--convert-to',
-                'docx',
-                '--outdir',
-                os.path.dirname(input_path),
-                input_path
-            ], check=True)
-            return output_path
+            return ConversionService.convert_to_docx(input_path)
         except Exception as e:
             logger.error(f"DOC to DOCX conversion failed: {e}")
             raise
@@ -63,46 +173,93 @@ class DocumentService:
 
     @staticmethod
     def _insert_bullets(
-        doc,
+        index: AnchorIndex,
         project_num: int,
         bullets: List[str],
         anchor_method: str
     ):
         """Insert bullets using specified anchor method"""
         if anchor_method == 'placeholders':
-            DocumentService._insert_via_placeholders(doc, project_num, bullets)
+            DocumentService._insert_via_placeholders(index, project_num, bullets)
         else:
-            DocumentService._insert_via_heuristics(doc, project_num, bullets)
+            DocumentService._insert_via_heuristics(index, project_num, bullets)
 
     @staticmethod
-    def _insert_via_placeholders(doc, project_num: int, bullets: List[str]):
+    def _insert_via_placeholders(index: AnchorIndex, project_num: int, bullets: List[str]):
         """Insert using {{PROJECTX_RESP}} placeholders"""
         placeholder = f'{{{{PROJECT{project_num}_RESP}}}}'
-        for paragraph in doc.paragraphs:
-            if placeholder in paragraph.text:
-                paragraph.text = paragraph.text.replace(placeholder, '')
-                for bullet in bullets:
-                    new_para = paragraph.insert_paragraph_before(bullet)
-                    DocumentService._copy_paragraph_style(paragraph, new_para)
-
-    @staticmethod
-    def _insert_via_heuristics(doc, project_num: int, bullets: List[str]):
-        """Insert by finding project sections"""
-        project_header = f'Project {project_num}'
-        for i, para in enumerate(doc.paragraphs):
-            if project_header in para.text:
-                for j in range(i, min(i+5, len(doc.paragraphs))):
-                    if 'Responsibilities' in doc.paragraphs[j].text:
-                        for bullet in reversed(bullets):
-                            new_para = doc.paragraphs[j].insert_paragraph_before(bullet)
-                            DocumentService._copy_paragraph_style(para, new_para)
-                        return
+        for paragraph in index.placeholders.get(project_num, []):
+            paragraph.text = paragraph.text.replace(placeholder, '')
+            style_info = DocumentService._capture_paragraph_style(paragraph)
+            DocumentService._insert_before(paragraph, bullets, style_info)
+
+    @staticmethod
+    def _insert_via_heuristics(index: AnchorIndex, project_num: int, bullets: List[str]):
+        """Insert before the Responsibilities line following the project header"""
+        if project_num not in index.heuristics:
+            return
+        header, responsibilities = index.heuristics[project_num]
+        style_info = DocumentService._capture_paragraph_style(header)
+        DocumentService._insert_before(responsibilities, bullets, style_info)
+
+    @staticmethod
+    def _insert_before(anchor: Paragraph, bullets: List[str], style_info):
+        """Insert formatted bullet paragraphs before an anchor paragraph in one splice"""
+        if not bullets:
+            return
+        paragraphs = DocumentService._build_bullet_paragraphs(anchor, bullets, style_info)
+        parent = anchor._p.getparent()
+        position = parent.index(anchor._p)
+        parent[position:position] = paragraphs
+
+    @staticmethod
+    def _build_bullet_paragraphs(anchor: Paragraph, bullets: List[str], style_info) -> list:
+        """Build <w:p> elements for bullets by cloning one formatted template.
+
+        The template is formatted once through python-docx, the same way
+        _apply_paragraph_style formats a paragraph from insert_paragraph_before,
+        so the clones serialise exactly like bullets inserted one at a time.
+        """
+        template = Paragraph(OxmlElement('w:p'), anchor._parent)
+        template.add_run('-')
+        DocumentService._apply_paragraph_style(style_info, template)
+        # insert_paragraph_before('') adds no run, so empty bullets get no run either
+        empty = deepcopy(template._p)
+        empty.remove(empty.r_lst[0])
+
+        paragraphs = []
+        for bullet in bullets:
+            if not bullet:
+                paragraphs.append(deepcopy(empty))
+                continue
+            p = deepcopy(template._p)
+            # Same text handling as Paragraph.add_run (tabs and line breaks become elements)
+            p.r_lst[0].text = bullet
+            paragraphs.append(p)
+        return paragraphs
 
     @staticmethod
     def _copy_paragraph_style(source_para, target_para):
         """Copy formatting from source to target paragraph"""
-        target_para.style = source_para.style
+        DocumentService._apply_paragraph_style(
+            DocumentService._capture_paragraph_style(source_para),
+            target_para
+        )
+
+    @staticmethod
+    def _capture_paragraph_style(source_para):
+        """Snapshot the formatting that bullets copy from a source paragraph"""
+        font = None
+        if source_para.runs:
+            font = (source_para.runs[0].font.size, source_para.runs[0].font.name)
+        return source_para.style, font
+
+    @staticmethod
+    def _apply_paragraph_style(style_info, target_para):
+        """Apply a snapshot from _capture_paragraph_style to a bullet paragraph"""
+        style, font = style_info
+        target_para.style = style
         target_para.paragraph_format.left_indent = Pt(18)
-        if source_para.runs and target_para.runs:
-            target_para.runs[0].font.size = source_para.runs[0].font.size
-            target_para.runs[0].font.name = source_para.runs[0].font.name
\ No newline at end of file
+        if font is not None and target_para.runs:
+            target_para.runs[0].font.size = font[0]
+            target_para.runs[0].font.name = font[1]
\ No newline at end of file
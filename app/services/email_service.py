@@ -1,9 +1,22 @@
-import smtplib
+from contextlib import ExitStack
+from email.generator import BytesGenerator
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from email.mime.application import MIMEApplication
+from app.services.attachment_cache import AttachmentCache, attachment_cache
+from app.services.outbox import email_outbox
+from app.services.smtp_pool import smtp_pool
+from app.utils.metrics import metrics
+import io
 import logging
-from typing import List
+import os
+import re
+import smtplib
+import uuid
+from typing import List, Tuple, Union
+
+# A file path, or a (filename, content) pair from the in-memory pipeline
+Attachment = Union[str, Tuple[str, bytes]]
 
 logger = logging.getLogger(__name__)
 
@@ -13,41 +26,137 @@ class EmailService:
         recipient: str,
         subject: str,
         body: str,
-        attachments: List[str],
+        attachments: List[Attachment],
         smtp_config: dict
     ):
         """Send email with attachments"""
-        msg = MIMEMultipart()
-        msg['From'] = smtp_config['sender_email']
-        msg['To'] = recipient
-        msg['Subject'] = subject
-        msg.attach(MIMEText(body, 'plain'))
-        
-        for file_path in attachments:
-            with open(file_path, 'rb') as f:
-                part = MIMEApplication(f.read(), Name=file_path.split('/')[-1])
-                part['Content-Disposition'] = f'attachment; filename="{file_path.split("/")[-1]}"'
-                msg.attach(part)
+        with metrics.stage('email_build'):
+            segments = EmailService._build_message(
+                smtp_config['sender_email'], recipient, subject, body, attachments
+            )
         
         try:
-            with smtplib.SMTP(smtp_config['host'], smtp_config['port']) as server:
-                server.starttls()
-                server.login(smtp_config['username'], smtp_config['password'])
-                server.send_message(msg)
+            with metrics.stage('email_send'):
+                smtp_pool.send(smtp_config, lambda server: EmailService._transmit(
+                    server, smtp_config['sender_email'], recipient, segments
+                ))
             logger.info(f"Email successfully sent to {recipient}")
         except Exception as e:
             logger.error(f"Failed to send email to {recipient}: {e}")
             raise
 
+    @staticmethod
+    def _build_message(
+        sender: str,
+        recipient: str,
+        subject: str,
+        body: str,
+        attachments: List[Attachment]
+    ) -> List[Union[bytes, str]]:
+        """Render the message as wire-format byte segments interleaved with attachment paths.
+
+        Headers, boundaries and the text part are generated by the email
+        package with a marker in place of each attachment body; the encoded
+        bodies of files come from the attachment cache and are spliced in at
+        send time, while in-memory attachments are encoded here.
+        """
+        msg = MIMEMultipart()
+        msg['From'] = sender
+        msg['To'] = recipient
+        msg['Subject'] = subject
+        msg.attach(MIMEText(body, 'plain'))
+        
+        markers = {}
+        for attachment in attachments:
+            marker = f"@@attachment-{uuid.uuid4().hex}@@"
+            if isinstance(attachment, str):
+                filename = os.path.basename(attachment)
+                markers[marker] = attachment
+            else:
+                filename, content = attachment
+                encoded = io.BytesIO()
+                AttachmentCache.encode_stream(io.BytesIO(content), encoded)
+                markers[marker] = encoded.getvalue()
+            part = MIMEApplication(b'', Name=filename)
+            part.set_payload(marker)
+            part['Content-Disposition'] = f'attachment; filename="{filename}"'
+            msg.attach(part)
+        
+        buffer = io.BytesIO()
+        BytesGenerator(buffer).flatten(msg, linesep='\r\n')
+        wire = buffer.getvalue()
+        if not wire.endswith(b'\r\n'):
+            wire += b'\r\n'
+        
+        segments = []
+        for piece in re.split(rb'(@@attachment-[0-9a-f]{32}@@)', wire):
+            marker = piece.decode('ascii') if piece.startswith(b'@@attachment-') else None
+            if marker in markers:
+                segments.append(markers[marker])
+            elif piece:
+                # SMTP transparency: a line starting with '.' gets an extra '.'
+                segments.append(re.sub(rb'(?m)^\.', b'..', piece))
+        return segments
+
+    @staticmethod
+    def _transmit(server, sender: str, recipient: str, segments: List[Union[bytes, str]]):
+        """Run an SMTP transaction, streaming attachment bodies in chunks"""
+        with ExitStack() as stack:
+            # Open every attachment before MAIL, so a missing file fails while the session is still clean
+            bodies = [
+                segment if isinstance(segment, bytes) else stack.enter_context(attachment_cache.open_encoded(segment))
+                for segment in segments
+            ]
+            server.ehlo_or_helo_if_needed()
+            code, response = server.mail(sender)
+            if code != 250:
+                server.rset()
+                raise smtplib.SMTPSenderRefused(code, response, sender)
+            code, response = server.rcpt(recipient)
+            if code not in (250, 251):
+                server.rset()
+                raise smtplib.SMTPRecipientsRefused({recipient: (code, response)})
+            
+            server.putcmd('data')
+            code, response = server.getreply()
+            if code != 354:
+                raise smtplib.SMTPDataError(code, response)
+            try:
+                for body in bodies:
+                    if isinstance(body, bytes):
+                        server.send(body)
+                    else:
+                        for chunk in attachment_cache.iter_chunks(body):
+                            server.send(chunk)
+                server.send(b'.\r\n')
+            except Exception:
+                # QUIT would be read as part of the message body; drop the connection instead
+                server.close()
+                raise
+        code, response = server.getreply()
+        if code != 250:
+            raise smtplib.SMTPDataError(code, response)
+
+    @staticmethod
+    def queue_email(
+        recipient: str,
+        subject: str,
+        body: str,
+        attachments: List[Attachment]
+    ) -> str:
+        """Hand an email to the outbox for background delivery and return its ID"""
+        with metrics.stage('email_queue'):
+            return email_outbox.enqueue(recipient, subject, body, attachments)
+
     @staticmethod
     def send_bulk_emails(
         recipients: List[str],
         subject: str,
         body: str,
-        attachments_list: List[List[str]],
+        attachments_list: List[List[Attachment]],
         smtp_config: dict
     ):
-        """Send emails to multiple recipients with different attachments"""
+        """Send emails to multiple recipients with different attachments over pooled sessions"""
         if len(recipients) != len(attachments_list):
             raise ValueError("Recipients and attachments lists must be same length")
         
@@ -0,0 +1,124 @@
+import logging
+import re
+from collections import Counter
+from typing import Dict, List, Optional
+from app.models import JobDescription
+from app.services.bullet_ranker import bullet_library
+from app.services.skill_index import SkillIndex, skill_catalog
+
+logger = logging.getLogger(__name__)
+
+# JobDescription.validate_bullet_points requires exactly this many per stack
+BULLETS_PER_STACK = 6
+MAX_STACKS = 3
+
+BULLET_MARKER = re.compile(r'^\s*(?:[-*•·▪◦●]|\d+[.)])\s+')
+SENTENCE_BREAK = re.compile(r'(?<=[.!?;])\s+(?=[A-Z(])')
+MIN_BULLET_WORDS = 4
+MAX_BULLET_CHARS = 300
+
+
+class JDService:
+    @staticmethod
+    def split_sentences(raw_text: str) -> List[str]:
+        """Split a posting into lines and sentences, bullet markers stripped"""
+        sentences = []
+        for line in raw_text.splitlines():
+            line = BULLET_MARKER.sub('', line).strip()
+            for sentence in SENTENCE_BREAK.split(line):
+                sentence = ' '.join(sentence.split()).rstrip(';')
+                if sentence:
+                    sentences.append(sentence)
+        return sentences
+
+    @staticmethod
+    def is_bullet(sentence: str) -> bool:
+        """Whether a sentence is long enough, but not too long, to reuse as a resume bullet"""
+        return len(sentence.split()) >= MIN_BULLET_WORDS and len(sentence) <= MAX_BULLET_CHARS
+
+    @staticmethod
+    def analyze(raw_text: str, max_stacks: int = MAX_STACKS, index: Optional[SkillIndex] = None) -> dict:
+        """Extract skills and tech stacks from a job description's raw text.
+
+        Every skill mention is counted; the most mentioned skills with enough
+        distinct sentences become tech stacks of BULLETS_PER_STACK bullets.
+        A sentence is used by one stack at most. Skills with some, but too
+        few, unused sentences are returned as incomplete stacks.
+        """
+        index = index or skill_catalog.index
+        counts = Counter()
+        first_seen = {}
+        sentences = []
+        for position, sentence in enumerate(JDService.split_sentences(raw_text)):
+            skills = []
+            for _, _, skill in index.scan(sentence):
+                counts[skill] += 1
+                first_seen.setdefault(skill, position)
+                if skill not in skills:
+                    skills.append(skill)
+            if skills and JDService.is_bullet(sentence):
+                sentences.append((sentence, skills))
+
+        ranked = sorted(counts, key=lambda skill: (-counts[skill], first_seen[skill]))
+        tech_stacks: Dict[str, List[str]] = {}
+        incomplete: Dict[str, List[str]] = {}
+        used = set()
+        for skill in ranked:
+            if len(tech_stacks) == max_stacks:
+                break
+            bullets = [
+                bullet for bullet, skills in sentences
+                if skill in skills and bullet not in used
+            ][:BULLETS_PER_STACK]
+            if len(bullets) == BULLETS_PER_STACK:
+                tech_stacks[skill] = bullets
+                used.update(bullets)
+            elif bullets:
+                incomplete[skill] = bullets
+
+        return {
+            'skills': {skill: counts[skill] for skill in ranked},
+            'tech_stacks': tech_stacks,
+            'incomplete': incomplete,
+        }
+
+    @staticmethod
+    def to_job_description(raw_text: str, max_stacks: int = MAX_STACKS) -> JobDescription:
+        """Build a validated JobDescription whose tech stacks come from raw_text"""
+        return JDService.to_job_descriptions([raw_text], max_stacks)[0]
+
+    @staticmethod
+    def to_job_descriptions(raw_texts: List[str], max_stacks: int = MAX_STACKS) -> List[JobDescription]:
+        """Build validated JobDescriptions for many postings.
+
+        With a bullet library configured, each posting's most mentioned skills
+        that the library covers are filled with its most relevant library
+        bullets, all postings being ranked in one batch. Otherwise, or when
+        the library covers none of them, the posting's own sentences are used.
+        """
+        for raw_text in raw_texts:
+            if not isinstance(raw_text, str):
+                raise ValueError("Each job description must be a text")
+        analyses = [JDService.analyze(raw_text, max_stacks) for raw_text in raw_texts]
+        ranked = [{} for _ in raw_texts]
+        if bullet_library.enabled:
+            ranker = bullet_library.ranker
+            wanted = [
+                [skill for skill in analysis['skills'] if skill in ranker.stacks][:max_stacks]
+                for analysis in analyses
+            ]
+            ranked = ranker.rank(raw_texts, wanted, BULLETS_PER_STACK)
+
+        jds = []
+        for raw_text, analysis, library_stacks in zip(raw_texts, analyses, ranked):
+            tech_stacks = {
+                stack: bullets for stack, bullets in library_stacks.items() if len(bullets) == BULLETS_PER_STACK
+            } or analysis['tech_stacks']
+            if not tech_stacks:
+                raise ValueError(
+                    f"No skill is mentioned in {BULLETS_PER_STACK} distinct sentences of the job description"
+                )
+            jd = JobDescription(raw_text=raw_text, tech_stacks=tech_stacks)
+            jd.validate_bullet_points()
+            jds.append(jd)
+        return jds
@@ -0,0 +1,192 @@
+import concurrent.futures
+import contextvars
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+import uuid
+from typing import Callable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+JOB_ID_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+# Seconds between sweeps of the jobs folder for expired records
+PURGE_INTERVAL = 60
+
+
+class JobManager:
+    """Runs resume processing in the background and tracks per-file progress.
+
+    Job records are JSON files in a shared folder, so any gunicorn worker can
+    answer a status poll for a job started by another worker. A record's
+    mtime is its last update: finished jobs expire JOB_TTL after it, and jobs
+    that stop making progress (their worker died) JOB_MAX_AGE after it.
+    """
+
+    def __init__(self, app=None):
+        self.jobs_folder = None
+        self.ttl = 3600
+        self.max_age = 24 * 3600
+        self.max_workers = 4
+        self._executor = None
+        self._purged = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Read job settings from the Flask config"""
+        self.jobs_folder = app.config.get('JOBS_FOLDER') or os.path.join(app.instance_path, 'jobs')
+        self.ttl = app.config.get('JOB_TTL', 3600)
+        self.max_age = app.config.get('JOB_MAX_AGE', 24 * 3600)
+        self.max_workers = app.config.get('JOB_WORKERS', 4)
+        os.makedirs(self.jobs_folder, exist_ok=True)
+        app.extensions['job_manager'] = self
+
+    def submit(self, tasks: List[Tuple[str, Callable, tuple]], workspace_id: Optional[str] = None) -> str:
+        """Queue (name, fn, args) tasks as one job and return its ID immediately.
+
+        workspace_id names the workspace the tasks read and write, which the
+        janitor leaves alone until the job finishes.
+        """
+        self.purge_expired()
+        job_id = uuid.uuid4().hex
+        job = {
+            'id': job_id,
+            'status': 'queued',
+            'workspace': workspace_id,
+            'created_at': time.time(),
+            'finished_at': None,
+            'files': [
+                {'name': name, 'status': 'pending', 'result': None, 'error': None}
+                for name, _, _ in tasks
+            ],
+        }
+        with self._lock:
+            self._write(job)
+
+        executor = self._get_executor()
+        for index, (_, fn, args) in enumerate(tasks):
+            # Carry the request ID into the job thread, and from there into document workers
+            executor.submit(contextvars.copy_context().run, self._run_task, job_id, index, fn, args)
+        return job_id
+
+    def get(self, job_id: str) -> Optional[dict]:
+        """Return the job record, or None if it does not exist or has expired"""
+        if not JOB_ID_PATTERN.match(job_id):
+            return None
+        self.purge_expired()
+        try:
+            with open(self._job_path(job_id)) as f:
+                job = json.load(f)
+                age = time.time() - os.fstat(f.fileno()).st_mtime
+        except FileNotFoundError:
+            return None
+        # The sweep is throttled, so check this record's own expiry too
+        return None if self._expired(job, age) else job
+
+    def active_workspaces(self) -> Set[str]:
+        """IDs of the workspaces used by jobs that have not finished"""
+        active = set()
+        now = time.time()
+        for entry in os.scandir(self.jobs_folder):
+            if not entry.name.endswith('.json') or entry.name.startswith('.tmp-'):
+                continue
+            try:
+                with open(entry.path) as f:
+                    job = json.load(f)
+                age = now - entry.stat().st_mtime
+            except (FileNotFoundError, ValueError):
+                continue
+            if job.get('workspace') and not job['finished_at'] and not self._expired(job, age):
+                active.add(job['workspace'])
+        return active
+
+    def purge_expired(self, force: bool = False):
+        """Delete expired job records, at most once per PURGE_INTERVAL unless forced"""
+        with self._lock:
+            if not force and self._purged is not None and time.monotonic() - self._purged < PURGE_INTERVAL:
+                return
+            self._purged = time.monotonic()
+
+        now = time.time()
+        for entry in os.scandir(self.jobs_folder):
+            if not entry.name.endswith('.json') or entry.name.startswith('.tmp-'):
+                continue
+            try:
+                age = now - entry.stat().st_mtime
+                # Only records old enough to expire either way are opened
+                if age <= min(self.ttl, self.max_age):
+                    continue
+                with open(entry.path) as f:
+                    job = json.load(f)
+                if self._expired(job, age):
+                    os.remove(entry.path)
+                    if job['finished_at']:
+                        logger.info(f"Expired job {job['id']}")
+                    else:
+                        logger.warning(f"Expired job {job['id']}, which made no progress for {age:.0f}s")
+            except (FileNotFoundError, ValueError):
+                continue
+
+    def _expired(self, job: dict, age: float) -> bool:
+        """Whether a record last updated age seconds ago has expired"""
+        return age > (self.ttl if job['finished_at'] else self.max_age)
+
+    def shutdown(self, wait: bool = True):
+        """Stop the background executor"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+    def _get_executor(self):
+        # Created lazily so each forked gunicorn worker gets its own threads
+        with self._lock:
+            if self._executor is None:
+                self._executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix='job'
+                )
+            return self._executor
+
+    def _run_task(self, job_id: str, index: int, fn: Callable, args: tuple):
+        """Run one file of a job and record its outcome"""
+        self._update(job_id, index, 'processing')
+        try:
+            result = fn(*args)
+        except Exception as e:
+            logger.error(f"Job {job_id} file {index} failed: {e}")
+            self._update(job_id, index, 'failed', error=str(e))
+        else:
+            self._update(job_id, index, 'completed', result=result)
+
+    def _update(self, job_id: str, index: int, status: str, result=None, error=None):
+        """Record a file's progress and derive the overall job status"""
+        with self._lock:
+            with open(self._job_path(job_id)) as f:
+                job = json.load(f)
+            job['files'][index].update(status=status, result=result, error=error)
+
+            statuses = [file['status'] for file in job['files']]
+            if all(s in ('completed', 'failed') for s in statuses):
+                job['status'] = 'failed' if 'failed' in statuses else 'completed'
+                job['finished_at'] = time.time()
+            else:
+                job['status'] = 'running'
+            self._write(job)
+
+    def _write(self, job: dict):
+        """Atomically replace a job record on disk"""
+        fd, tmp_path = tempfile.mkstemp(dir=self.jobs_folder, prefix='.tmp-')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(job, f)
+        os.replace(tmp_path, self._job_path(job['id']))
+
+    def _job_path(self, job_id: str) -> str:
+        return os.path.join(self.jobs_folder, f"{job_id}.json")
+
+
+job_manager = JobManager()
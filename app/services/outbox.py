@@ -0,0 +1,354 @@
+import base64
+import concurrent.futures
+import json
+import logging
+import os
+import shutil
+import smtplib
+import tempfile
+import threading
+import time
+import uuid
+from typing import List, Optional, Tuple, Union
+from app.services.smtp_pool import CONNECTION_ERRORS
+
+logger = logging.getLogger(__name__)
+
+# Each state is a sub-folder; moving a record between them is an atomic rename
+QUEUED = 'queued'
+SENDING = 'sending'
+SENT = 'sent'
+DEAD = 'dead'
+STATES = (QUEUED, SENDING, SENT, DEAD)
+# Copies of file attachments, one sub-folder per message
+ATTACHMENTS = 'attachments'
+# Seconds between sweeps of the sent and dead folders for records past OUTBOX_RETENTION
+PRUNE_INTERVAL = 60
+
+
+class EmailOutbox:
+    """Durable on-disk queue of outbound emails, drained by a background worker.
+
+    Messages are JSON records moved between state folders with os.rename, so
+    several gunicorn workers can share one outbox without sending a message
+    twice; a queued record's mtime is the time it is next due. Sends that
+    fail with a 4xx reply or a lost connection are retried with exponential
+    backoff and moved to the dead-letter folder after OUTBOX_MAX_ATTEMPTS;
+    any other failure is dead-lettered at once. Sent and dead records are
+    deleted OUTBOX_RETENTION seconds after they were filed. SMTP credentials
+    are never written to disk; the worker uses the app's SMTP settings.
+    """
+
+    def __init__(self, app=None):
+        self.folder = None
+        self.smtp_config = {}
+        self.concurrency = 2
+        self.max_attempts = 5
+        self.backoff_base = 30
+        self.backoff_max = 3600
+        self.poll_interval = 2
+        self.lease_timeout = 300
+        self.retention = 7 * 24 * 3600
+        self._pruned = None
+        self._thread = None
+        self._executor = None
+        # Deliveries handed to the executor and not yet finished
+        self._in_flight = set()
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Read outbox settings from the Flask config"""
+        self.folder = app.config.get('OUTBOX_FOLDER') or os.path.join(app.instance_path, 'outbox')
+        self.concurrency = app.config.get('OUTBOX_CONCURRENCY', 2)
+        self.max_attempts = app.config.get('OUTBOX_MAX_ATTEMPTS', 5)
+        self.backoff_base = app.config.get('OUTBOX_BACKOFF_BASE', 30)
+        self.backoff_max = app.config.get('OUTBOX_BACKOFF_MAX', 3600)
+        self.poll_interval = app.config.get('OUTBOX_POLL_INTERVAL', 2)
+        self.lease_timeout = app.config.get('OUTBOX_LEASE_TIMEOUT', 300)
+        self.retention = app.config.get('OUTBOX_RETENTION', 7 * 24 * 3600)
+        self.smtp_config = {
+            'host': app.config['SMTP_HOST'],
+            'port': app.config['SMTP_PORT'],
+            'username': app.config['SMTP_USERNAME'],
+            'password': app.config['SMTP_PASSWORD'],
+            'sender_email': app.config['SENDER_EMAIL']
+        }
+        for state in STATES:
+            os.makedirs(os.path.join(self.folder, state), exist_ok=True)
+        if app.config.get('EMAIL_OUTBOX_ENABLED', True):
+            # Start the worker inside each serving process rather than before a fork
+            app.before_request(self.ensure_started)
+        app.extensions['email_outbox'] = self
+
+    def enqueue(
+        self,
+        recipient: str,
+        subject: str,
+        body: str,
+        attachments: List[Union[str, Tuple[str, bytes]]]
+    ) -> str:
+        """Persist a message for delivery and return its ID.
+
+        File attachments are linked (or copied) into the outbox, so retries
+        still find them after their workspace is cleaned up; in-memory
+        (filename, content) attachments are embedded in the record.
+        """
+        now = time.time()
+        message_id = uuid.uuid4().hex
+        try:
+            stored = [self._dump_attachment(message_id, index, a) for index, a in enumerate(attachments)]
+        except Exception:
+            shutil.rmtree(self._attachment_folder(message_id), ignore_errors=True)
+            raise
+        message = {
+            'id': message_id,
+            'recipient': recipient,
+            'subject': subject,
+            'body': body,
+            'attachments': stored,
+            'status': QUEUED,
+            'attempts': 0,
+            'last_error': None,
+            'created_at': now,
+            'updated_at': now,
+            'next_attempt_at': now,
+        }
+        self._write(QUEUED, message)
+        logger.info(f"Queued email {message['id']} to {recipient}")
+        self.ensure_started()
+        return message['id']
+
+    def status(self, message_id: str) -> Optional[dict]:
+        """Return a message record from whichever state folder holds it"""
+        if not message_id.isalnum():
+            return None
+        for state in STATES:
+            try:
+                with open(self._path(state, message_id)) as f:
+                    message = json.load(f)
+            except FileNotFoundError:
+                continue
+            message['status'] = state
+            # Report in-memory attachments by name rather than echoing their content
+            message['attachments'] = [
+                a if isinstance(a, str) else a['filename'] for a in message['attachments']
+            ]
+            return message
+        return None
+
+    def ensure_started(self):
+        """Start the background worker in this process if it is not running"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='outbox-worker', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop the background worker and wait for in-flight sends"""
+        self._stop.set()
+        # Join outside the lock, which the worker and delivery callbacks also take
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join()
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def process_due(self, wait: bool = False) -> int:
+        """Claim due messages, up to OUTBOX_CONCURRENCY in flight, and hand them to the senders.
+
+        A queued record's mtime is its due time, so records still backing off
+        are skipped from their directory entry without being opened. Returns
+        the number claimed; with wait, blocks until those sends finish.
+        """
+        self._requeue_stale()
+        self.prune()
+        now = time.time()
+        futures = []
+        with self._lock:
+            capacity = self.concurrency - len(self._in_flight)
+        entries = [
+            entry for entry in os.scandir(os.path.join(self.folder, QUEUED))
+            if entry.name.endswith('.json') and not entry.name.startswith('.tmp-')
+        ]
+        for entry in sorted(entries, key=lambda e: e.name):
+            if len(futures) >= capacity:
+                break
+            message_id = entry.name[:-len('.json')]
+            try:
+                if entry.stat().st_mtime > now or not self._claim(message_id):
+                    continue
+                with open(self._path(SENDING, message_id)) as f:
+                    message = json.load(f)
+            except (FileNotFoundError, ValueError) as e:
+                logger.error(f"Skipping unreadable email record {message_id}: {e}")
+                continue
+            future = self._get_executor().submit(self._deliver, message)
+            with self._lock:
+                self._in_flight.add(future)
+            future.add_done_callback(self._finished)
+            futures.append(future)
+        if wait:
+            concurrent.futures.wait(futures)
+        return len(futures)
+
+    def _finished(self, future: concurrent.futures.Future):
+        with self._lock:
+            self._in_flight.discard(future)
+
+    def prune(self, force: bool = False):
+        """Delete sent and dead records past the retention, at most once per PRUNE_INTERVAL unless forced"""
+        if not self.retention:
+            return
+        with self._lock:
+            if not force and self._pruned is not None and time.monotonic() - self._pruned < PRUNE_INTERVAL:
+                return
+            self._pruned = time.monotonic()
+
+        now = time.time()
+        for state in (SENT, DEAD):
+            for entry in os.scandir(os.path.join(self.folder, state)):
+                try:
+                    if not entry.name.endswith('.json') or now - entry.stat().st_mtime <= self.retention:
+                        continue
+                    os.remove(entry.path)
+                except FileNotFoundError:
+                    continue
+                # Dead letters keep their attachment copies until now
+                shutil.rmtree(self._attachment_folder(entry.name[:-len('.json')]), ignore_errors=True)
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=self.concurrency,
+                    thread_name_prefix='outbox'
+                )
+            return self._executor
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.process_due()
+            except Exception as e:
+                logger.error(f"Outbox worker error: {e}")
+            self._stop.wait(self.poll_interval)
+
+    def _claim(self, message_id: str) -> bool:
+        """Atomically move a queued message to 'sending'; False if another worker won"""
+        try:
+            os.rename(self._path(QUEUED, message_id), self._path(SENDING, message_id))
+        except FileNotFoundError:
+            return False
+        # rename keeps the old mtime; refresh it so the lease starts now
+        os.utime(self._path(SENDING, message_id))
+        return True
+
+    def _deliver(self, message: dict):
+        """Send one claimed message and file it as sent, retried or dead"""
+        from app.services.email_service import EmailService
+
+        message['attempts'] += 1
+        try:
+            EmailService.send_email(
+                message['recipient'],
+                message['subject'],
+                message['body'],
+                [self._load_attachment(a) for a in message['attachments']],
+                self.smtp_config
+            )
+        except Exception as e:
+            message['last_error'] = str(e)
+            if not self._is_transient(e):
+                logger.error(f"Email {message['id']} moved to dead letters after a permanent failure: {e}")
+                self._transition(message, DEAD)
+            elif message['attempts'] >= self.max_attempts:
+                logger.error(f"Email {message['id']} moved to dead letters after {message['attempts']} attempts")
+                self._transition(message, DEAD)
+            else:
+                delay = min(self.backoff_base * 2 ** (message['attempts'] - 1), self.backoff_max)
+                message['next_attempt_at'] = time.time() + delay
+                logger.warning(f"Email {message['id']} failed, retrying in {delay}s: {e}")
+                self._transition(message, QUEUED)
+        else:
+            message['last_error'] = None
+            self._transition(message, SENT)
+            shutil.rmtree(self._attachment_folder(message['id']), ignore_errors=True)
+
+    @staticmethod
+    def _is_transient(error: Exception) -> bool:
+        """Whether a failed send is worth retrying: a 4xx reply or a lost connection"""
+        if isinstance(error, smtplib.SMTPRecipientsRefused):
+            return any(400 <= code < 500 for code, _ in error.recipients.values())
+        if isinstance(error, smtplib.SMTPResponseException):
+            return 400 <= error.smtp_code < 500
+        if isinstance(error, (FileNotFoundError, IsADirectoryError, PermissionError)):
+            # A missing or unreadable attachment will not come back
+            return False
+        return isinstance(error, CONNECTION_ERRORS + (OSError,))
+
+    def _dump_attachment(self, message_id: str, index: int, attachment):
+        if isinstance(attachment, str):
+            # One folder per attachment keeps the file name, which becomes the email's filename
+            folder = os.path.join(self._attachment_folder(message_id), str(index))
+            os.makedirs(folder)
+            path = os.path.join(folder, os.path.basename(attachment))
+            try:
+                os.link(attachment, path)
+            except OSError:
+                shutil.copyfile(attachment, path)
+            return {'filename': os.path.basename(attachment), 'path': path}
+        filename, content = attachment
+        return {'filename': filename, 'content': base64.b64encode(content).decode('ascii')}
+
+    @staticmethod
+    def _load_attachment(attachment):
+        if isinstance(attachment, str):
+            return attachment
+        if 'path' in attachment:
+            return attachment['path']
+        return attachment['filename'], base64.b64decode(attachment['content'])
+
+    def _transition(self, message: dict, state: str):
+        message['status'] = state
+        message['updated_at'] = time.time()
+        self._write(state, message)
+        os.remove(self._path(SENDING, message['id']))
+
+    def _requeue_stale(self):
+        """Return messages stuck in 'sending' (e.g. after a worker crash) to the queue"""
+        sending = os.path.join(self.folder, SENDING)
+        for filename in os.listdir(sending):
+            path = os.path.join(sending, filename)
+            try:
+                if filename.endswith('.json') and time.time() - os.path.getmtime(path) > self.lease_timeout:
+                    os.rename(path, os.path.join(self.folder, QUEUED, filename))
+                    logger.warning(f"Requeued stale email {filename[:-len('.json')]}")
+            except FileNotFoundError:
+                continue
+
+    def _write(self, state: str, message: dict):
+        """Atomically write a message record into a state folder"""
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.join(self.folder, state), prefix='.tmp-')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(message, f)
+        if state == QUEUED:
+            # The sweep reads the due time from the mtime instead of parsing the record
+            os.utime(tmp_path, (message['next_attempt_at'], message['next_attempt_at']))
+        os.replace(tmp_path, self._path(state, message['id']))
+
+    def _attachment_folder(self, message_id: str) -> str:
+        return os.path.join(self.folder, ATTACHMENTS, message_id)
+
+    def _path(self, state: str, message_id: str) -> str:
+        return os.path.join(self.folder, state, f"{message_id}.json")
+
+
+email_outbox = EmailOutbox()
@@ -0,0 +1,115 @@
+import concurrent.futures
+import hashlib
+import json
+import logging
+import os
+from typing import Callable, Dict, List
+from app.services.document_executor import document_executor
+from app.services.document_service import DocumentService
+from app.utils.disk_cache import DiskCache
+
+logger = logging.getLogger(__name__)
+
+# Bump when a change to the injection logic should invalidate stored results
+RESULT_VERSION = 1
+
+
+class ResultCache(DiskCache):
+    """Finished tailoring outputs keyed on resume content, bullets and anchor method.
+
+    submit() stands in for document_executor.submit for the two injection
+    entry points: a hit is served from disk without reaching the document
+    pool, and a miss is stored before its future completes.
+    """
+
+    def init_app(self, app):
+        """Read cache settings from the Flask config"""
+        self.cache_dir = app.config.get('RESULT_CACHE_DIR') or \
+            os.path.join(app.instance_path, 'result_cache')
+        self.max_bytes = app.config.get('RESULT_CACHE_MAX_BYTES', 0)
+        self.ttl = app.config.get('RESULT_CACHE_TTL', 0)
+        app.extensions['result_cache'] = self
+
+    @staticmethod
+    def key_for(
+        resume_hash: str,
+        tech_stacks: Dict[str, List[str]],
+        anchor_method: str,
+        output_format: str = 'docx'
+    ) -> str:
+        """Build the cache key for tailoring a resume with the given bullets"""
+        # Bullets are collected in tech stack order, so the key keeps that order
+        canonical = json.dumps(list(tech_stacks.items()), separators=(',', ':'), ensure_ascii=False)
+        identity = f"{RESULT_VERSION}\0{resume_hash}\0{canonical}\0{anchor_method}"
+        return f"{hashlib.sha256(identity.encode('utf-8')).hexdigest()}.{output_format}"
+
+    def submit(self, fn: Callable, *args) -> concurrent.futures.Future:
+        """Run an inject_bullet_points(_bytes) call through the cache and the document pool"""
+        if not self.enabled:
+            return document_executor.submit(fn, *args)
+        if fn is DocumentService.inject_bullet_points:
+            return self._submit_file(*args)
+        if fn is DocumentService.inject_bullet_points_bytes:
+            return self._submit_bytes(*args)
+        raise ValueError(f"{fn.__qualname__} is not a cacheable tailoring function")
+
+    def run(self, fn: Callable, *args):
+        """Like submit(), but wait for the result"""
+        return self.submit(fn, *args).result()
+
+    def _submit_file(self, input_path: str, output_path: str, tech_stacks, anchor_method='placeholders', *rest):
+        output_format = os.path.splitext(output_path)[1][1:].lower()
+        key = self.key_for(self.hash_file(input_path), tech_stacks, anchor_method, output_format)
+        if self.fetch(key, output_path):
+            return self._completed(output_path)
+        return self._then(
+            document_executor.submit(
+                DocumentService.inject_bullet_points, input_path, output_path, tech_stacks, anchor_method, *rest),
+            lambda result: self.store(key, result)
+        )
+
+    def _submit_bytes(self, data: bytes, filename: str, tech_stacks, anchor_method='placeholders', *rest):
+        key = self.key_for(hashlib.sha256(data).hexdigest(), tech_stacks, anchor_method)
+        entry = self.lookup(key)
+        if entry is not None:
+            try:
+                with open(entry, 'rb') as f:
+                    return self._completed(f.read())
+            except FileNotFoundError:
+                # Evicted by another worker between lookup and read
+                pass
+        return self._then(
+            document_executor.submit(
+                DocumentService.inject_bullet_points_bytes, data, filename, tech_stacks, anchor_method, *rest),
+            lambda result: self.put(key, lambda out: out.write(result))
+        )
+
+    @staticmethod
+    def _completed(result) -> concurrent.futures.Future:
+        future = concurrent.futures.Future()
+        future.set_result(result)
+        return future
+
+    @staticmethod
+    def _then(inner: concurrent.futures.Future, store: Callable) -> concurrent.futures.Future:
+        """Future for inner's result that completes only after store(result) has run"""
+        outer = concurrent.futures.Future()
+
+        def done(future):
+            try:
+                result = future.result()
+            except Exception as e:
+                outer.set_exception(e)
+                return
+            try:
+                store(result)
+            except Exception as e:
+                # A failed store only costs a future cache hit
+                logger.warning(f"Could not cache tailoring result: {e}")
+            outer.set_result(result)
+
+        inner.add_done_callback(done)
+        return outer
+
+
+result_cache = ResultCache()
@@ -0,0 +1,132 @@
+import json
+import logging
+import os
+import re
+import threading
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CATALOG = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'skills.json')
+
+# Words plus the symbols skill names use (c++, c#, node.js, .net); a trailing full stop is not part of a token
+TOKEN_PATTERN = re.compile(r'\.?[\w+#]+(?:[.\-][\w+#]+)*')
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase tokens of text, as matched against the index"""
+    return [token.lower() for token in TOKEN_PATTERN.findall(text)]
+
+
+class SkillIndex:
+    """Aho-Corasick automaton over the tokens of every skill name and synonym.
+
+    A catalog maps each canonical skill to the phrases that mean it. Phrases
+    are matched on whole tokens, so "java" never fires inside "javascript",
+    and a text is scanned in one pass however many phrases the catalog has.
+    """
+
+    def __init__(self, catalog: Dict[str, List[str]]):
+        # Node 0 is the root; each node has token transitions, a failure link
+        # and the (phrase length, skill) pairs that end there
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[Tuple[int, str]]] = [[]]
+        self.size = 0
+        for skill, phrases in catalog.items():
+            for phrase in phrases:
+                tokens = tokenize(phrase)
+                if tokens:
+                    self._add(tokens, skill)
+                    self.size += 1
+        self._link()
+
+    @classmethod
+    def from_file(cls, path: str) -> 'SkillIndex':
+        """Build an index from a JSON {skill: [phrases]} catalog"""
+        with open(path, encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def scan(self, text: str) -> List[Tuple[int, int, str]]:
+        """Return (start, end, skill) character spans of every skill mentioned in text.
+
+        Overlapping mentions resolve to the leftmost, then longest, phrase, so
+        "react native" is one mention of React Native rather than also React.
+        """
+        spans = []
+        starts = []
+        state = 0
+        for index, match in enumerate(TOKEN_PATTERN.finditer(text)):
+            token = match.group().lower()
+            starts.append(match.start())
+            while state and token not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(token, 0)
+            for length, skill in self._output[state]:
+                spans.append((starts[index - length + 1], match.end(), skill))
+
+        mentions = []
+        covered = -1
+        for start, end, skill in sorted(spans, key=lambda span: (span[0], -span[1])):
+            if start >= covered:
+                mentions.append((start, end, skill))
+                covered = end
+        return mentions
+
+    def _add(self, tokens: List[str], skill: str):
+        state = 0
+        for token in tokens:
+            next_state = self._goto[state].get(token)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+                self._goto[state][token] = next_state
+            state = next_state
+        if (len(tokens), skill) not in self._output[state]:
+            self._output[state].append((len(tokens), skill))
+
+    def _link(self):
+        """Compute failure links breadth first, merging each node's inherited outputs"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, child in self._goto[state].items():
+                queue.append(child)
+                fallback = self._fail[state]
+                while fallback and token not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(token, 0)
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+
+
+class SkillCatalog:
+    """Process-wide SkillIndex, built from SKILL_CATALOG on first use"""
+
+    def __init__(self, app=None):
+        self.path = DEFAULT_CATALOG
+        self._index: Optional[SkillIndex] = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Read the catalog location from the Flask config"""
+        self.path = app.config.get('SKILL_CATALOG') or DEFAULT_CATALOG
+        self._index = None
+        app.extensions['skill_catalog'] = self
+
+    @property
+    def index(self) -> SkillIndex:
+        """The shared index, compiled once per process"""
+        if self._index is None:
+            with self._lock:
+                if self._index is None:
+                    self._index = SkillIndex.from_file(self.path)
+                    logger.info(f"Compiled skill index with {self._index.size} phrases from {self.path}")
+        return self._index
+
+
+skill_catalog = SkillCatalog()
@@ -0,0 +1,160 @@
+import logging
+import smtplib
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Errors that mean the session itself is unusable and worth one reconnect
+CONNECTION_ERRORS = (smtplib.SMTPServerDisconnected, ConnectionError, TimeoutError)
+
+
+class _Session:
+    """An authenticated SMTP connection and when it was last used"""
+
+    def __init__(self, server: smtplib.SMTP):
+        self.server = server
+        self.last_used = time.monotonic()
+
+
+class _TransactionWatch:
+    """Wraps an SMTP session and notes once a mail transaction has been started on it"""
+
+    # Commands from which the server may go on to accept the message
+    STARTS_TRANSACTION = ('mail', 'sendmail', 'send_message')
+
+    def __init__(self, server: smtplib.SMTP):
+        self._server = server
+        self.started = False
+
+    def __getattr__(self, name):
+        if name in self.STARTS_TRANSACTION:
+            self.started = True
+        return getattr(self._server, name)
+
+
+class SMTPConnectionPool:
+    """Keeps authenticated SMTP sessions alive and reuses them across messages.
+
+    Sessions are keyed by (host, port, username). An idle session is checked
+    with NOOP before reuse and replaced if the server has dropped it.
+    """
+
+    def __init__(self, app=None):
+        self.max_idle = 4
+        self.idle_timeout = 60
+        self.timeout = 30
+        self.use_tls = True
+        self._idle: Dict[Tuple, List[_Session]] = {}
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Read pool settings from the Flask config"""
+        self.max_idle = app.config.get('SMTP_POOL_SIZE', 4)
+        self.idle_timeout = app.config.get('SMTP_IDLE_TIMEOUT', 60)
+        self.timeout = app.config.get('SMTP_TIMEOUT', 30)
+        self.use_tls = app.config.get('SMTP_USE_TLS', True)
+        app.extensions['smtp_pool'] = self
+
+    @contextmanager
+    def connection(self, smtp_config: dict):
+        """Borrow a live session; it returns to the pool unless the caller fails"""
+        key = self._key(smtp_config)
+        session = self._checkout(key, smtp_config)
+        try:
+            yield session.server
+        except Exception:
+            self._close(session)
+            raise
+        session.last_used = time.monotonic()
+        self._checkin(key, session)
+
+    def send_message(self, smtp_config: dict, msg):
+        """Send one email.message.Message over a pooled session"""
+        return self.send(smtp_config, lambda server: server.send_message(msg))
+
+    def send(self, smtp_config: dict, transmit: Callable[[smtplib.SMTP], object]):
+        """Run transmit(server) on a pooled session, reconnecting once if it had died.
+
+        The retry only happens when the session fails before MAIL FROM; once a
+        transaction has started the server may already have accepted the
+        message, so a second run could deliver it twice.
+        """
+        watch = None
+        try:
+            with self.connection(smtp_config) as server:
+                watch = _TransactionWatch(server)
+                return transmit(watch)
+        except CONNECTION_ERRORS as e:
+            if watch is not None and watch.started:
+                raise
+            logger.warning(f"SMTP session to {smtp_config['host']} dropped ({e}), reconnecting")
+            with self.connection(smtp_config) as server:
+                return transmit(server)
+
+    def close_all(self):
+        """Quit every idle session"""
+        with self._lock:
+            sessions = [s for pooled in self._idle.values() for s in pooled]
+            self._idle = {}
+        for session in sessions:
+            self._close(session)
+
+    @staticmethod
+    def _key(smtp_config: dict) -> Tuple:
+        return (smtp_config['host'], smtp_config['port'], smtp_config.get('username'))
+
+    def _checkout(self, key: Tuple, smtp_config: dict) -> _Session:
+        """Take the freshest healthy idle session or open a new one"""
+        while True:
+            with self._lock:
+                pooled = self._idle.get(key)
+                session = pooled.pop() if pooled else None
+            if session is None:
+                return self._connect(smtp_config)
+            if time.monotonic() - session.last_used <= self.idle_timeout and self._is_alive(session):
+                return session
+            self._close(session)
+
+    def _checkin(self, key: Tuple, session: _Session):
+        with self._lock:
+            pooled = self._idle.setdefault(key, [])
+            if len(pooled) < self.max_idle:
+                pooled.append(session)
+                return
+        self._close(session)
+
+    def _connect(self, smtp_config: dict) -> _Session:
+        """Open, secure and authenticate a new SMTP session"""
+        server = smtplib.SMTP(smtp_config['host'], smtp_config['port'], timeout=self.timeout)
+        try:
+            if smtp_config.get('use_tls', self.use_tls):
+                server.starttls()
+            if smtp_config.get('username'):
+                server.login(smtp_config['username'], smtp_config['password'])
+        except Exception:
+            server.close()
+            raise
+        logger.info(f"Opened SMTP session to {smtp_config['host']}:{smtp_config['port']}")
+        return _Session(server)
+
+    @staticmethod
+    def _is_alive(session: _Session) -> bool:
+        try:
+            return session.server.noop()[0] == 250
+        except (smtplib.SMTPException, OSError):
+            return False
+
+    @staticmethod
+    def _close(session: _Session):
+        try:
+            session.server.quit()
+        except (smtplib.SMTPException, OSError):
+            session.server.close()
+
+
+smtp_pool = SMTPConnectionPool()
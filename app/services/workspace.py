@@ -0,0 +1,202 @@
+import logging
+import os
+import re
+import shutil
+import threading
+import time
+import uuid
+from typing import List, Optional, Tuple
+from app.services.job_service import job_manager
+from app.utils.metrics import metrics
+from app.utils.upload_utils import BLOB_FOLDER
+
+logger = logging.getLogger(__name__)
+
+# Per-job directories live in this sub-folder of UPLOAD_FOLDER
+WORKSPACE_FOLDER = 'jobs'
+WORKSPACE_ID_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+# Tailored resumes are written as processed_*; everything else in a workspace is an input
+OUTPUT_PREFIX = 'processed_'
+
+# Workspaces touched this recently are never evicted for quota, so in-flight requests keep their files
+ACTIVE_GRACE = 300
+
+
+class WorkspaceManager:
+    """Per-job working directories under UPLOAD_FOLDER, cleaned up by a janitor thread.
+
+    Each request or batch writes its uploads and outputs into its own
+    jobs/<id> folder, so concurrent requests never share file names. The
+    janitor removes workspaces older than WORKSPACE_TTL, then the oldest ones
+    until UPLOAD_FOLDER fits WORKSPACE_MAX_BYTES, drops stored upload blobs no
+    workspace links to any more, and publishes the folder's size as a gauge.
+    Workspaces of background jobs that have not finished are never removed.
+    """
+
+    def __init__(self, app=None):
+        self.upload_folder = None
+        self.root = None
+        self.ttl = 24 * 3600
+        self.max_bytes = 0
+        self.interval = 300
+        self._thread = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Read workspace settings from the Flask config"""
+        self.upload_folder = app.config['UPLOAD_FOLDER']
+        self.root = os.path.join(self.upload_folder, WORKSPACE_FOLDER)
+        self.ttl = app.config.get('WORKSPACE_TTL', 24 * 3600)
+        self.max_bytes = app.config.get('WORKSPACE_MAX_BYTES', 0)
+        self.interval = app.config.get('WORKSPACE_JANITOR_INTERVAL', 300)
+        os.makedirs(self.root, exist_ok=True)
+        if self.interval > 0:
+            # Start the janitor inside each serving process rather than before a fork
+            app.before_request(self.ensure_started)
+        app.extensions['workspaces'] = self
+
+    def create(self) -> Tuple[str, str]:
+        """Create a new workspace and return its ID and directory"""
+        workspace_id = uuid.uuid4().hex
+        path = os.path.join(self.root, workspace_id)
+        os.makedirs(path)
+        return workspace_id, path
+
+    def path(self, workspace_id: str) -> Optional[str]:
+        """Return an existing workspace's directory, or None"""
+        if not WORKSPACE_ID_PATTERN.match(workspace_id):
+            return None
+        path = os.path.join(self.root, workspace_id)
+        return path if os.path.isdir(path) else None
+
+    def outputs(self, workspace_id: str) -> List[Tuple[str, str]]:
+        """(filename, path) of every output in a workspace, sorted by name"""
+        path = self.path(workspace_id)
+        if path is None:
+            return []
+        return sorted(
+            (entry.name, entry.path) for entry in os.scandir(path)
+            if entry.is_file() and entry.name.startswith(OUTPUT_PREFIX)
+        )
+
+    def remove(self, workspace_id: str):
+        """Delete a workspace and everything in it"""
+        if WORKSPACE_ID_PATTERN.match(workspace_id):
+            shutil.rmtree(os.path.join(self.root, workspace_id), ignore_errors=True)
+
+    def sweep(self) -> int:
+        """Enforce the TTL and quota and return the upload folder's size in bytes"""
+        now = time.time()
+        # Background jobs may not have read their inputs yet, however old the workspace is
+        busy = job_manager.active_workspaces() if job_manager.jobs_folder else set()
+        workspaces = []
+        for workspace_id, modified in self._workspaces():
+            if workspace_id in busy:
+                continue
+            if self.ttl and now - modified > self.ttl:
+                logger.info(f"Expired workspace {workspace_id}")
+                self.remove(workspace_id)
+            else:
+                workspaces.append((modified, workspace_id))
+        self._expire_loose_files(now)
+        self._prune_blobs(now)
+
+        total = self.folder_size()
+        if self.max_bytes and total > self.max_bytes:
+            for modified, workspace_id in sorted(workspaces):
+                if now - modified < ACTIVE_GRACE:
+                    break
+                logger.warning(f"Evicting workspace {workspace_id} to stay within the upload quota")
+                self.remove(workspace_id)
+                self._prune_blobs(now)
+                total = self.folder_size()
+                if total <= self.max_bytes:
+                    break
+
+        metrics.gauge_set('resume_upload_folder_bytes', total)
+        return total
+
+    def folder_size(self) -> int:
+        """Bytes used under UPLOAD_FOLDER, counting hardlinked uploads once"""
+        seen = set()
+        total = 0
+        for root, _, files in os.walk(self.upload_folder):
+            for name in files:
+                try:
+                    stat = os.stat(os.path.join(root, name))
+                except FileNotFoundError:
+                    continue
+                if (stat.st_dev, stat.st_ino) not in seen:
+                    seen.add((stat.st_dev, stat.st_ino))
+                    total += stat.st_size
+        return total
+
+    def ensure_started(self):
+        """Start the janitor thread in this process if it is not running"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='workspace-janitor', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop the janitor thread"""
+        self._stop.set()
+        with self._lock:
+            if self._thread is not None:
+                self._thread.join()
+                self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.sweep()
+            except Exception as e:
+                logger.error(f"Workspace janitor failed: {e}")
+            self._stop.wait(self.interval)
+
+    def _workspaces(self) -> List[Tuple[str, float]]:
+        """(id, last modified) for every workspace directory"""
+        workspaces = []
+        for entry in os.scandir(self.root):
+            if entry.is_dir() and WORKSPACE_ID_PATTERN.match(entry.name):
+                try:
+                    workspaces.append((entry.name, entry.stat().st_mtime))
+                except FileNotFoundError:
+                    continue
+        return workspaces
+
+    def _expire_loose_files(self, now: float):
+        """Remove files saved straight into UPLOAD_FOLDER once they outlive the TTL"""
+        if not self.ttl:
+            return
+        for entry in os.scandir(self.upload_folder):
+            try:
+                if entry.is_file() and now - entry.stat().st_mtime > self.ttl:
+                    os.remove(entry.path)
+            except FileNotFoundError:
+                continue
+
+    def _prune_blobs(self, now: float):
+        """Remove stored uploads that no workspace links to any more"""
+        directory = os.path.join(self.upload_folder, BLOB_FOLDER)
+        if not os.path.isdir(directory):
+            return
+        for entry in os.scandir(directory):
+            try:
+                stat = entry.stat()
+                # Blobs stored or reused moments ago may be about to be linked by a request
+                if now - stat.st_mtime < ACTIVE_GRACE:
+                    continue
+                # Stale spools were left behind by an interrupted upload
+                if entry.name.startswith('.tmp-') or stat.st_nlink <= 1:
+                    os.remove(entry.path)
+            except FileNotFoundError:
+                continue
+
+
+workspaces = WorkspaceManager()
@@ -0,0 +1,117 @@
+from contextlib import nullcontext
+from copy import copy
+from docx.opc.constants import RELATIONSHIP_TYPE as RT
+from docx.opc.oxml import serialize_part_xml
+from docx.oxml import oxml_parser
+from docx.styles.styles import Styles
+from lxml import etree
+import logging
+import posixpath
+import struct
+import zipfile
+from typing import BinaryIO, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+RELS_NAMESPACE = 'http://schemas.openxmlformats.org/package/2006/relationships'
+DATA_DESCRIPTOR_FLAG = 0x08
+COPY_CHUNK_SIZE = 1024 * 1024
+
+class ZipDocument:
+    """A .docx edited at the zip level instead of through a full python-docx package.
+
+    Only the main document part is parsed, with python-docx's element classes,
+    so Paragraph and the DocumentService helpers work on it unchanged; the
+    styles part is parsed to resolve paragraph styles. Saving rewrites the
+    document part and copies every other member's compressed bytes as-is.
+    """
+
+    def __init__(self, path: Union[str, BinaryIO]):
+        # A path, or a seekable buffer for the in-memory pipeline
+        self.path = path
+        with zipfile.ZipFile(path) as package:
+            self.part_name = self._related_part_name(package, '', RT.OFFICE_DOCUMENT)
+            if self.part_name is None:
+                raise ValueError(f"{path} has no main document part")
+            styles_name = self._related_part_name(package, self.part_name, RT.STYLES)
+            if styles_name is None:
+                raise ValueError(f"{path} has no styles part")
+
+            with package.open(self.part_name) as f:
+                self.element = etree.parse(f, oxml_parser).getroot()
+            with package.open(styles_name) as f:
+                self.styles = Styles(etree.parse(f, oxml_parser).getroot())
+
+    @property
+    def part(self):
+        """Paragraphs look styles up through their parent's part; this object is that part"""
+        return self
+
+    def get_style(self, style_id, style_type):
+        return self.styles.get_by_id(style_id, style_type)
+
+    def get_style_id(self, style_or_name, style_type):
+        return self.styles.get_style_id(style_or_name, style_type)
+
+    def save(self, output_path: Union[str, BinaryIO]):
+        """Write the package with the edited document part"""
+        with zipfile.ZipFile(self.path) as source, self._open_raw() as raw, \
+                zipfile.ZipFile(output_path, 'w') as target:
+            for info in source.infolist():
+                if info.filename == self.part_name:
+                    member = zipfile.ZipInfo(info.filename, info.date_time)
+                    member.external_attr = info.external_attr
+                    target.writestr(member, serialize_part_xml(self.element), zipfile.ZIP_DEFLATED)
+                else:
+                    ZipDocument._copy_member(raw, info, target)
+
+    def _open_raw(self) -> BinaryIO:
+        if isinstance(self.path, str):
+            return open(self.path, 'rb')
+        # Buffers are shared with the caller, so leave them open
+        return nullcontext(self.path)
+
+    @staticmethod
+    def _related_part_name(package: zipfile.ZipFile, source_name: str, reltype: str) -> Optional[str]:
+        """Resolve the first internal relationship of reltype from a part ('' for the package)"""
+        directory, filename = posixpath.split(source_name)
+        rels_name = posixpath.join(directory, '_rels', f'{filename}.rels')
+        try:
+            with package.open(rels_name) as f:
+                rels = etree.parse(f).getroot()
+        except KeyError:
+            return None
+
+        for rel in rels.iter(f'{{{RELS_NAMESPACE}}}Relationship'):
+            if rel.get('Type') == reltype and rel.get('TargetMode') != 'External':
+                target = rel.get('Target')
+                if target.startswith('/'):
+                    return target[1:]
+                return posixpath.normpath(posixpath.join(directory, target))
+        return None
+
+    @staticmethod
+    def _copy_member(raw: BinaryIO, info: zipfile.ZipInfo, target: zipfile.ZipFile):
+        """Append a member's stored (still compressed) bytes to target without recompressing"""
+        raw.seek(info.header_offset)
+        header = raw.read(zipfile.sizeFileHeader)
+        name_length, extra_length = struct.unpack('<2H', header[-4:])
+        raw.seek(info.header_offset + zipfile.sizeFileHeader + name_length + extra_length)
+
+        member = copy(info)
+        # CRC and sizes are known up front, so they go in the local header
+        member.flag_bits &= ~DATA_DESCRIPTOR_FLAG
+        member.header_offset = target.fp.tell()
+        target.fp.write(member.FileHeader())
+
+        remaining = info.compress_size
+        while remaining:
+            chunk = raw.read(min(COPY_CHUNK_SIZE, remaining))
+            if not chunk:
+                raise zipfile.BadZipFile(f"Truncated member {info.filename}")
+            target.fp.write(chunk)
+            remaining -= len(chunk)
+
+        target.filelist.append(member)
+        target.NameToInfo[member.filename] = member
+        target.start_dir = target.fp.tell()
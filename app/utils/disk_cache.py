@@ -0,0 +1,194 @@
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from typing import BinaryIO, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1024 * 1024
+# Seconds a process trusts its running size total before rescanning the folder,
+# which picks up other workers' writes and expires entries past their TTL
+RESCAN_INTERVAL = 60
+# An eviction pass frees space down to this share of max_bytes, so the next writes need none
+LOW_WATER = 0.9
+
+
+class DiskCache:
+    """Content-addressed file cache with LRU eviction under a byte budget.
+
+    Entries are written to a temporary file and renamed into place, so several
+    gunicorn workers can share one cache directory. An entry's atime is set
+    explicitly on every hit and drives LRU eviction; its mtime records when it
+    was stored, and entries older than ttl seconds (when set) are expired.
+
+    Writes keep a running total of the cache size, so the folder is only
+    walked when that total goes over budget or is RESCAN_INTERVAL old.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, max_bytes: int = 0, ttl: int = 0):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._size: Optional[int] = None
+        self._scanned = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        """Whether the cache has a directory and a non-zero budget"""
+        return bool(self.cache_dir) and self.max_bytes > 0
+
+    @staticmethod
+    def hash_file(path: str) -> str:
+        """Return the SHA-256 hex digest of a file's contents"""
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def fetch(self, key: str, dest_path: str) -> bool:
+        """Materialise a cached entry at dest_path, returning False on a miss"""
+        entry = self.lookup(key)
+        if entry is None:
+            return False
+        try:
+            self._materialise(entry, dest_path)
+        except FileNotFoundError:
+            # Evicted by another worker between lookup and copy
+            return False
+        return True
+
+    def lookup(self, key: str) -> Optional[str]:
+        """Return a cached entry's path, marking it recently used, or None on a miss"""
+        entry = self._entry_path(key)
+        now = time.time()
+        try:
+            stat = os.stat(entry)
+            if self._expired(stat, now):
+                os.remove(entry)
+                raise FileNotFoundError(entry)
+            # Bump only the access time; mtime keeps the store time for the TTL
+            os.utime(entry, (now, stat.st_mtime))
+        except FileNotFoundError:
+            self._count('misses')
+            return None
+        self._count('hits')
+        logger.debug(f"Cache hit for {key}")
+        return entry
+
+    def store(self, key: str, src_path: str) -> str:
+        """Atomically add src_path to the cache under key"""
+        def copy(tmp):
+            with open(src_path, 'rb') as src:
+                shutil.copyfileobj(src, tmp, CHUNK_SIZE)
+        return self.put(key, copy)
+
+    def put(self, key: str, write: Callable[[BinaryIO], None]) -> str:
+        """Atomically add an entry whose content is produced by write(fileobj)"""
+        entry = self._entry_path(key)
+        os.makedirs(os.path.dirname(entry), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as tmp:
+                write(tmp)
+            added = os.path.getsize(tmp_path)
+            try:
+                added -= os.path.getsize(entry)
+            except FileNotFoundError:
+                pass
+            os.replace(tmp_path, entry)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self._account(added)
+        return entry
+
+    def stats(self) -> dict:
+        """Return hit/miss/eviction counters for this process"""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], key)
+
+    @staticmethod
+    def _materialise(entry: str, dest_path: str):
+        """Copy the entry to dest_path.
+
+        A hard link would share the entry's inode, so anything later writing
+        to dest_path in place would corrupt the cache for every other hit.
+        """
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(dest_path) or '.', prefix='.tmp-')
+        os.close(fd)
+        try:
+            shutil.copyfile(entry, tmp_path)
+            os.replace(tmp_path, dest_path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def _expired(self, stat: os.stat_result, now: float) -> bool:
+        return bool(self.ttl) and now - stat.st_mtime > self.ttl
+
+    def _count(self, counter: str, amount: int = 1):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + amount)
+
+    def _account(self, added: int):
+        """Add a write to the running size, scanning and evicting when it is over budget or stale"""
+        with self._lock:
+            stale = self._size is None or time.monotonic() - self._scanned > RESCAN_INTERVAL
+            if not stale:
+                self._size += added
+            over_budget = stale or self._size > self.max_bytes
+        if over_budget:
+            self._evict()
+
+    def _evict(self):
+        """Drop expired entries, then least recently used ones until the cache is back under its low-water mark"""
+        entries = []
+        total = 0
+        now = time.time()
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if name.startswith('.tmp-'):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                    if self._expired(stat, now):
+                        os.remove(path)
+                        self._count('evictions')
+                        continue
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_atime, stat.st_size, path))
+                total += stat.st_size
+
+        if total > self.max_bytes:
+            for _, size, path in sorted(entries):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+                self._count('evictions')
+                if total <= self.max_bytes * LOW_WATER:
+                    break
+
+        with self._lock:
+            self._size = total
+            self._scanned = time.monotonic()
@@ -1,38 +1,149 @@
 import os
+import shutil
 import uuid
 import logging
-from werkzeug.utils import secure_filename
-from typing import Optional, List
+import mimetypes
+from urllib.parse import quote
+from flask import abort, current_app, request
+from werkzeug.security import safe_join
+from werkzeug.utils import secure_filename, send_file
+from typing import Optional, List, Tuple
+from app.utils.upload_utils import BLOB_FOLDER, HashingSpool, blob_folder
 
 logger = logging.getLogger(__name__)
 
+CHUNK_SIZE = 64 * 1024
+
 class FileUtils:
     @staticmethod
-    def secure_save(file, upload_folder: str, allowed_extensions: Optional[List[str]] = None) -> str:
-        """Securely save uploaded file with unique filename"""
-        if not os.path.exists(upload_folder):
-            os.makedirs(upload_folder, exist_ok=True)
+    def secure_save(
+        file,
+        upload_folder: str,
+        allowed_extensions: Optional[List[str]] = None,
+        dest_folder: Optional[str] = None
+    ) -> str:
+        """Securely save uploaded file with unique filename.
+
+        The content is stored once under its SHA-256 in the blob folder of
+        upload_folder and the returned path, in dest_folder (default
+        upload_folder), is a hardlink to it, so repeat uploads cost no extra disk.
+        """
+        dest_folder = dest_folder or upload_folder
+        if not os.path.exists(dest_folder):
+            os.makedirs(dest_folder, exist_ok=True)
 
-        if allowed_extensions:
-            ext = os.path.splitext(file.filename)[1].lower()
-            if ext not in allowed_extensions:
-                raise ValueError(f"Invalid file extension. Allowed: {allowed_extensions}")
+        if allowed_extensions and not FileUtils.validate_file_type(file.filename, allowed_extensions):
+            raise ValueError(f"Invalid file extension. Allowed: {allowed_extensions}")
 
         # Generate unique filename while preserving extension
         filename = secure_filename(file.filename)
         unique_id = uuid.uuid4().hex[:8]
         name, ext = os.path.splitext(filename)
         new_filename = f"{name}_{unique_id}{ext}"
-        save_path = os.path.join(upload_folder, new_filename)
+        save_path = os.path.join(dest_folder, new_filename)
 
         try:
-            file.save(save_path)
+            blob_path = FileUtils._store_blob(file, upload_folder, ext.lower())
+            try:
+                os.link(blob_path, save_path)
+            except OSError:
+                shutil.copyfile(blob_path, save_path)
             logger.info(f"File saved successfully: {save_path}")
             return save_path
         except Exception as e:
             logger.error(f"Failed to save file: {e}")
             raise
 
+    @staticmethod
+    def _store_blob(file, upload_folder: str, ext: str) -> str:
+        """Store an upload's content as <sha256><ext> in the blob folder"""
+        directory = blob_folder(upload_folder)
+        spool = file.stream
+        if not isinstance(spool, HashingSpool) or spool.directory is None or \
+                os.path.abspath(spool.directory) != os.path.abspath(directory):
+            # Not streamed by UploadRequest; copy it through a spool in chunks
+            spool = HashingSpool(directory)
+            try:
+                file.stream.seek(0)
+                shutil.copyfileobj(file.stream, spool, CHUNK_SIZE)
+            except Exception:
+                spool.close()
+                raise
+
+        blob_path = os.path.join(directory, f"{spool.hexdigest()}{ext}")
+        if not spool.commit(blob_path):
+            logger.info(f"Reused stored upload {os.path.basename(blob_path)}")
+        return blob_path
+
+    @staticmethod
+    def write_outputs(outputs: List[Tuple[str, bytes]], folder: str) -> List[str]:
+        """Write in-memory (filename, content) outputs to folder and return their paths"""
+        os.makedirs(folder, exist_ok=True)
+        paths = []
+        for filename, content in outputs:
+            path = os.path.join(folder, secure_filename(filename))
+            with open(path, 'wb') as f:
+                f.write(content)
+            paths.append(path)
+        return paths
+
+    @staticmethod
+    def send_download(filename: str, folder: str):
+        """Serve a file below folder as an attachment with a strong ETag.
+
+        The ETag and the answers to Range and If-None-Match come from the
+        file's metadata, so the content is never read here. The
+        body goes out through the server's file wrapper (sendfile under
+        gunicorn), or is left to the proxy via X-Accel-Redirect/X-Sendfile when
+        DOWNLOAD_OFFLOAD is set and BEHIND_PROXY is on.
+        """
+        path = safe_join(folder, filename)
+        if path is None:
+            abort(404)
+        path = os.path.realpath(path)
+        relative = os.path.relpath(path, os.path.realpath(folder))
+        # Stored upload blobs are only reachable through a workspace's own link;
+        # check the resolved path so ./ and .. segments cannot reach them
+        if relative.split(os.sep)[0] in (BLOB_FOLDER, os.pardir) or not os.path.isfile(path):
+            abort(404)
+        stat = os.stat(path)
+        etag = FileUtils._metadata_etag(stat)
+
+        offload = current_app.config.get('DOWNLOAD_OFFLOAD') if current_app.config.get('BEHIND_PROXY') else None
+        if not offload:
+            return send_file(
+                path,
+                request.environ,
+                as_attachment=True,
+                etag=etag,
+                max_age=0,
+                response_class=current_app.response_class
+            )
+
+        response = current_app.response_class(
+            mimetype=mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        )
+        if offload == 'x-accel':
+            prefix = current_app.config.get('DOWNLOAD_OFFLOAD_PREFIX', '/protected-uploads/')
+            response.headers['X-Accel-Redirect'] = prefix.rstrip('/') + '/' + quote(relative.replace(os.sep, '/'))
+        else:
+            response.headers['X-Sendfile'] = path
+        response.headers.set('Content-Disposition', 'attachment', filename=os.path.basename(path))
+        response.set_etag(etag)
+        response.last_modified = stat.st_mtime
+        response.cache_control.no_cache = True
+        # The proxy serves ranges itself; answer only the 304 here
+        response = response.make_conditional(request)
+        if response.status_code == 304:
+            response.headers.pop('X-Accel-Redirect', None)
+            response.headers.pop('X-Sendfile', None)
+        return response
+
+    @staticmethod
+    def _metadata_etag(stat: os.stat_result) -> str:
+        """ETag from a file's inode, size and mtime, so the content is never read"""
+        return f"{stat.st_ino:x}-{stat.st_size:x}-{stat.st_mtime_ns:x}"
+
     @staticmethod
     def cleanup_files(file_paths: List[str]):
         """Clean up temporary files"""
@@ -47,8 +158,9 @@ class FileUtils:
     @staticmethod
     def validate_file_type(filename: str, allowed_extensions: List[str]) -> bool:
         """Check if file has allowed extension"""
+        allowed = {e.lower().lstrip('.') for e in allowed_extensions}
         return '.' in filename and \
-               filename.rsplit('.', 1)[1].lower() in allowed_extensions
+               filename.rsplit('.', 1)[1].lower() in allowed
 
     @staticmethod
     def get_file_extension(filename: str) -> str:
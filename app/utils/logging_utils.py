@@ -1,9 +1,36 @@
 import logging
 import os
+import uuid
+from contextvars import ContextVar
 from logging.handlers import RotatingFileHandler
 from datetime import datetime
 from typing import Optional
 
+# Correlation ID of the request being handled ('-' outside a request)
+request_id: ContextVar[str] = ContextVar('request_id', default='-')
+
+class RequestIdFilter(logging.Filter):
+    """Stamp every log record with the current request's correlation ID"""
+
+    def filter(self, record):
+        record.request_id = request_id.get()
+        return True
+
+def init_request_ids(app):
+    """Give each request a correlation ID, taken from X-Request-ID when the client sends one"""
+    from flask import request
+
+    def assign():
+        incoming = request.headers.get('X-Request-ID', '')
+        request_id.set(incoming[:64] if incoming.isprintable() and incoming else uuid.uuid4().hex)
+
+    def echo(response):
+        response.headers['X-Request-ID'] = request_id.get()
+        return response
+
+    app.before_request(assign)
+    app.after_request(echo)
+
 def configure_logging(log_dir: Optional[str] = None, log_level: int = logging.INFO):
     """Configure structured logging for the application"""
     if log_dir and not os.path.exists(log_dir):
@@ -16,8 +43,9 @@ def configure_logging(log_dir: Optional[str] = None, log_level: int = logging.IN
     # Console handler
     console_handler = logging.StreamHandler()
     console_handler.setLevel(log_level)
+    console_handler.addFilter(RequestIdFilter())
     console_formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+        '%(asctime)s - %(name)s - %(levelname)s - [%(request_id)s] %(message)s')
     console_handler.setFormatter(console_formatter)
     logger.addHandler(console_handler)
 
@@ -30,8 +58,9 @@ def configure_logging(log_dir: Optional[str] = None, log_level: int = logging.IN
             backupCount=5
         )
         file_handler.setLevel(log_level)
+        file_handler.addFilter(RequestIdFilter())
         file_formatter = logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(module)s:%(lineno)d - %(message)s')
+            '%(asctime)s - %(name)s - %(levelname)s - [%(request_id)s] %(module)s:%(lineno)d - %(message)s')
         file_handler.setFormatter(file_formatter)
         logger.addHandler(file_handler)
 
@@ -0,0 +1,171 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Tuple
+from flask import g, request
+
+# Upper bounds (seconds) of the latency histogram buckets
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+HELP = {
+    'resume_stage_duration_seconds': 'Time spent in each pipeline stage',
+    'resume_stage_in_progress': 'Pipeline stages currently running',
+    'resume_stage_errors_total': 'Pipeline stages that raised an error',
+    'resume_http_request_duration_seconds': 'HTTP request latency by endpoint',
+    'resume_http_requests_in_progress': 'HTTP requests currently being served',
+    'resume_http_requests_total': 'HTTP requests by endpoint, method and status',
+    'resume_upload_folder_bytes': 'Disk used by uploads and job workspaces at the last janitor sweep',
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Metrics:
+    """Process-local counters, gauges and histograms exported in Prometheus text format.
+
+    Each gunicorn worker keeps its own registry. Document worker processes
+    record into theirs and ship the samples back with each task result
+    (see drain() and merge()), so stage timings from the pool are not lost.
+    """
+
+    def __init__(self, app=None):
+        self.buckets = DEFAULT_BUCKETS
+        self._counters: Dict[str, Dict[Labels, float]] = {}
+        self._gauges: Dict[str, Dict[Labels, float]] = {}
+        self._histograms: Dict[str, Dict[Labels, list]] = {}
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Time every request and serve the registry at /metrics"""
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.teardown_request(self._teardown_request)
+        app.add_url_rule('/metrics', 'metrics', self.export)
+        app.extensions['metrics'] = self
+
+    def inc(self, name: str, amount: float = 1, **labels):
+        key = self._labels(labels)
+        with self._lock:
+            samples = self._counters.setdefault(name, {})
+            samples[key] = samples.get(key, 0) + amount
+
+    def gauge_add(self, name: str, amount: float, **labels):
+        key = self._labels(labels)
+        with self._lock:
+            samples = self._gauges.setdefault(name, {})
+            samples[key] = samples.get(key, 0) + amount
+
+    def gauge_set(self, name: str, value: float, **labels):
+        key = self._labels(labels)
+        with self._lock:
+            self._gauges.setdefault(name, {})[key] = value
+
+    def observe(self, name: str, value: float, **labels):
+        key = self._labels(labels)
+        with self._lock:
+            samples = self._histograms.setdefault(name, {})
+            histogram = samples.setdefault(key, [0] * (len(self.buckets) + 1) + [0.0])
+            histogram[bisect.bisect_left(self.buckets, value)] += 1
+            histogram[-1] += value
+
+    @contextmanager
+    def stage(self, stage: str):
+        """Time a pipeline stage, tracking it as in progress and counting errors"""
+        self.gauge_add('resume_stage_in_progress', 1, stage=stage)
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.inc('resume_stage_errors_total', stage=stage)
+            raise
+        finally:
+            self.observe('resume_stage_duration_seconds', time.perf_counter() - start, stage=stage)
+            self.gauge_add('resume_stage_in_progress', -1, stage=stage)
+
+    def drain(self) -> dict:
+        """Take and reset the counters and histograms recorded so far"""
+        with self._lock:
+            samples = {'counters': self._counters, 'histograms': self._histograms}
+            self._counters, self._histograms = {}, {}
+        return samples
+
+    def merge(self, samples: dict):
+        """Add samples drained from another process"""
+        with self._lock:
+            for name, series in samples['counters'].items():
+                target = self._counters.setdefault(name, {})
+                for key, value in series.items():
+                    target[key] = target.get(key, 0) + value
+            for name, series in samples['histograms'].items():
+                target = self._histograms.setdefault(name, {})
+                for key, values in series.items():
+                    current = target.setdefault(key, [0] * len(values))
+                    target[key] = [a + b for a, b in zip(current, values)]
+
+    def render(self) -> str:
+        """Format the registry as Prometheus text exposition"""
+        lines = []
+        with self._lock:
+            for kind, metrics in (('counter', self._counters), ('gauge', self._gauges)):
+                for name, series in sorted(metrics.items()):
+                    self._header(lines, name, kind)
+                    for key, value in sorted(series.items()):
+                        lines.append(f"{name}{self._format(key)} {value:g}")
+
+            for name, series in sorted(self._histograms.items()):
+                self._header(lines, name, 'histogram')
+                for key, histogram in sorted(series.items()):
+                    cumulative = 0
+                    for bound, count in zip(self.buckets + (float('inf'),), histogram):
+                        cumulative += count
+                        le = '+Inf' if bound == float('inf') else f"{bound:g}"
+                        lines.append(f"{name}_bucket{self._format(key + (('le', le),))} {cumulative}")
+                    lines.append(f"{name}_sum{self._format(key)} {histogram[-1]:g}")
+                    lines.append(f"{name}_count{self._format(key)} {cumulative}")
+        return '\n'.join(lines) + '\n'
+
+    def export(self):
+        """View function for GET /metrics"""
+        return self.render(), 200, {'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
+
+    def _before_request(self):
+        g.metrics_start = time.perf_counter()
+        self.gauge_add('resume_http_requests_in_progress', 1)
+
+    @staticmethod
+    def _after_request(response):
+        g.response_status = response.status_code
+        return response
+
+    def _teardown_request(self, error=None):
+        start = g.pop('metrics_start', None)
+        if start is None:
+            return
+        self.gauge_add('resume_http_requests_in_progress', -1)
+        endpoint = request.endpoint or 'unknown'
+        status = getattr(g, 'response_status', 500 if error else 200)
+        self.observe('resume_http_request_duration_seconds', time.perf_counter() - start, endpoint=endpoint)
+        self.inc('resume_http_requests_total', endpoint=endpoint, method=request.method, status=str(status))
+
+    @staticmethod
+    def _labels(labels: dict) -> Labels:
+        return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+    @staticmethod
+    def _format(key: Labels) -> str:
+        if not key:
+            return ''
+        escaped = (value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in key)
+        return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(key, escaped)) + '}'
+
+    @staticmethod
+    def _header(lines, name: str, kind: str):
+        if name in HELP:
+            lines.append(f"# HELP {name} {HELP[name]}")
+        lines.append(f"# TYPE {name} {kind}")
+
+
+metrics = Metrics()
@@ -0,0 +1,162 @@
+import cProfile
+import hmac
+import logging
+import os
+import re
+import threading
+import time
+import tracemalloc
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import List, Optional
+from flask import g, request
+from app.utils.logging_utils import request_id
+
+logger = logging.getLogger(__name__)
+
+# Capture prefix of the request being profiled, or None; read by the document executor
+profile_label: ContextVar[Optional[str]] = ContextVar('profile_label', default=None)
+
+TOP_ALLOCATORS = 25
+PROFILE_FILE_PATTERN = re.compile(r'^[\w.-]+\.(pstats|alloc\.txt)$')
+
+
+class RequestProfiler:
+    """Opt-in cProfile/tracemalloc capture of individual requests.
+
+    With PROFILING_ENABLED set, a request carrying an X-Profile header or a
+    ?profile=1 query flag (plus PROFILE_TOKEN when one is configured) runs
+    under cProfile and tracemalloc. The pstats file and the top allocation
+    sites are written to PROFILE_FOLDER, oldest captures being removed to stay
+    within PROFILE_MAX_FILES and PROFILE_MAX_BYTES. Document work submitted
+    during the request is profiled in its worker process too.
+    """
+
+    def __init__(self, app=None):
+        self.enabled = False
+        self.folder = None
+        self.token = None
+        self.max_files = 50
+        self.max_bytes = 0
+        self._tracing = 0
+        self._owns_tracemalloc = False
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Read profiling settings from the Flask config"""
+        self.enabled = app.config.get('PROFILING_ENABLED', False)
+        self.folder = app.config.get('PROFILE_FOLDER') or os.path.join(app.instance_path, 'profiles')
+        self.token = app.config.get('PROFILE_TOKEN')
+        self.max_files = app.config.get('PROFILE_MAX_FILES', 50)
+        self.max_bytes = app.config.get('PROFILE_MAX_BYTES', 0)
+        if self.enabled and not self.token:
+            logger.warning("PROFILING_ENABLED is set without PROFILE_TOKEN; profile requests will be ignored")
+        if self.enabled:
+            app.before_request(self._before_request)
+            app.teardown_request(self._teardown_request)
+        app.extensions['request_profiler'] = self
+
+    def authorized(self, supplied: Optional[str]) -> bool:
+        """Whether supplied matches PROFILE_TOKEN (never true when no token is set)"""
+        if not self.token:
+            return False
+        return supplied is not None and hmac.compare_digest(supplied, self.token)
+
+    def list_profiles(self) -> List[dict]:
+        """Describe the stored captures, newest first"""
+        profiles = []
+        for entry in RequestProfiler._entries(self.folder):
+            profiles.append({'name': entry.name, 'size': entry.stat().st_size, 'created': entry.stat().st_mtime})
+        return sorted(profiles, key=lambda p: p['created'], reverse=True)
+
+    @staticmethod
+    @contextmanager
+    def capture(folder: str, label: str, max_files: int = 50, max_bytes: int = 0):
+        """Run the body under cProfile and write <label>-<unique id>.pstats into folder.
+
+        The id keeps several captures with one label (e.g. the tasks of one
+        request in the same worker) apart; the folder is pruned afterwards.
+        """
+        profile = cProfile.Profile()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            os.makedirs(folder, exist_ok=True)
+            profile.dump_stats(os.path.join(folder, f"{label}-{uuid.uuid4().hex[:8]}.pstats"))
+            RequestProfiler.prune_folder(folder, max_files, max_bytes)
+
+    def prune(self):
+        """Remove the oldest captures until the folder fits its count and size caps"""
+        RequestProfiler.prune_folder(self.folder, self.max_files, self.max_bytes)
+
+    @staticmethod
+    def prune_folder(folder: str, max_files: int, max_bytes: int = 0):
+        """Remove the oldest captures in folder until it fits max_files and max_bytes (0: no size cap)"""
+        entries = sorted(RequestProfiler._entries(folder), key=lambda e: e.stat().st_mtime)
+        total = sum(e.stat().st_size for e in entries)
+        while entries and (len(entries) > max_files or (max_bytes and total > max_bytes)):
+            oldest = entries.pop(0)
+            total -= oldest.stat().st_size
+            try:
+                os.remove(oldest.path)
+            except FileNotFoundError:
+                pass
+
+    def _requested(self) -> bool:
+        flag = request.headers.get('X-Profile') or request.args.get('profile')
+        if not flag or flag.lower() in ('0', 'false'):
+            return False
+        token = request.headers.get('X-Profile-Token') or request.args.get('profile_token')
+        return self.authorized(token)
+
+    def _before_request(self):
+        if not self._requested():
+            return
+        # The request ID may come from a client header, so keep it filename-safe
+        label = re.sub(r'[^\w.-]', '_', f"{time.strftime('%Y%m%d-%H%M%S')}-{request_id.get()}")
+        with self._lock:
+            if self._tracing == 0:
+                # Leave tracemalloc alone if something else already started it
+                self._owns_tracemalloc = not tracemalloc.is_tracing()
+                if self._owns_tracemalloc:
+                    tracemalloc.start()
+            self._tracing += 1
+        g.profile = cProfile.Profile()
+        g.profile_token = profile_label.set(label)
+        g.profile.enable()
+        logger.info(f"Profiling {request.method} {request.path} as {label}")
+
+    def _teardown_request(self, error=None):
+        profile = g.pop('profile', None)
+        if profile is None:
+            return
+        profile.disable()
+        label = profile_label.get()
+        profile_label.reset(g.pop('profile_token'))
+        snapshot = tracemalloc.take_snapshot()
+        with self._lock:
+            self._tracing -= 1
+            if self._tracing == 0 and self._owns_tracemalloc:
+                tracemalloc.stop()
+
+        os.makedirs(self.folder, exist_ok=True)
+        profile.dump_stats(os.path.join(self.folder, f"{label}.pstats"))
+        with open(os.path.join(self.folder, f"{label}.alloc.txt"), 'w') as f:
+            f.write(f"Top {TOP_ALLOCATORS} allocation sites for {request.method} {request.path}\n")
+            for stat in snapshot.statistics('lineno')[:TOP_ALLOCATORS]:
+                f.write(f"{stat}\n")
+        self.prune()
+
+    @staticmethod
+    def _entries(folder: Optional[str]):
+        if not folder or not os.path.isdir(folder):
+            return []
+        return [e for e in os.scandir(folder) if e.is_file() and PROFILE_FILE_PATTERN.match(e.name)]
+
+
+request_profiler = RequestProfiler()
@@ -0,0 +1,96 @@
+import hashlib
+import io
+import os
+import tempfile
+from typing import Optional
+from flask import Request, current_app
+from werkzeug.exceptions import RequestEntityTooLarge, UnsupportedMediaType
+
+# Content-addressed uploads live in this sub-folder of UPLOAD_FOLDER
+BLOB_FOLDER = 'blobs'
+
+
+class HashingSpool:
+    """Temporary upload file that hashes and size-checks data as it is written.
+
+    The file is created inside the blob folder, so committing it to its
+    content-addressed name is a rename rather than a copy. Closing an
+    uncommitted spool removes it. Without a directory the data stays in memory
+    and the spool cannot be committed.
+    """
+
+    def __init__(self, directory: Optional[str], max_bytes: int = 0):
+        if directory is None:
+            # In-memory pipeline: hash and size-check, but keep the bytes in RAM
+            self.name = None
+            self._file = io.BytesIO()
+        else:
+            os.makedirs(directory, exist_ok=True)
+            fd, self.name = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+            self._file = os.fdopen(fd, 'w+b')
+        self._digest = hashlib.sha256()
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.committed = False
+
+    def write(self, data: bytes) -> int:
+        self.size += len(data)
+        if self.max_bytes and self.size > self.max_bytes:
+            # The parser drops a part that fails mid-write, so nothing else would remove it
+            self.close()
+            raise RequestEntityTooLarge(f"Uploaded file exceeds {self.max_bytes} bytes")
+        self._digest.update(data)
+        return self._file.write(data)
+
+    def hexdigest(self) -> str:
+        return self._digest.hexdigest()
+
+    def commit(self, blob_path: str) -> bool:
+        """Move the spool to blob_path; False if identical content was already stored"""
+        self._file.close()
+        self.committed = True
+        if os.path.exists(blob_path):
+            os.remove(self.name)
+            # Keep reused blobs fresh for anything expiring them by age
+            os.utime(blob_path)
+            return False
+        os.replace(self.name, blob_path)
+        return True
+
+    def close(self):
+        self._file.close()
+        if not self.committed and self.name and os.path.exists(self.name):
+            os.remove(self.name)
+
+    def __getattr__(self, name):
+        return getattr(self._file, name)
+
+
+def blob_folder(upload_folder: str) -> str:
+    """Return the content-addressed store inside an upload folder"""
+    return os.path.join(upload_folder, BLOB_FOLDER)
+
+
+class UploadRequest(Request):
+    """Request that streams file parts straight into the upload blob folder.
+
+    The extension is checked as soon as a part's headers arrive and the size
+    limit while its body is being written, so a rejected upload never lands
+    on disk in full.
+    """
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        config = current_app.config
+        allowed = config.get('UPLOAD_EXTENSIONS')
+        if filename and allowed:
+            from app.utils.file_utils import FileUtils
+            if not FileUtils.validate_file_type(filename, allowed):
+                raise UnsupportedMediaType(f"Invalid file extension. Allowed: {allowed}")
+
+        max_bytes = config.get('MAX_UPLOAD_FILE_SIZE', 0)
+        if max_bytes and content_length and content_length > max_bytes:
+            raise RequestEntityTooLarge(f"Uploaded file exceeds {max_bytes} bytes")
+        if config.get('PIPELINE_MODE') == 'memory':
+            return HashingSpool(None, max_bytes)
+        return HashingSpool(blob_folder(config['UPLOAD_FOLDER']), max_bytes)
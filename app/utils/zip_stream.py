@@ -0,0 +1,62 @@
+import os
+import time
+import zipfile
+from typing import Iterable, Iterator, Tuple, Union
+
+CHUNK_SIZE = 64 * 1024
+
+# Formats that are already compressed archives or streams; deflating them again wastes CPU
+STORED_EXTENSIONS = {'.docx', '.pdf', '.zip', '.png', '.jpg', '.jpeg'}
+
+
+class _Sink:
+    """Write-only file object collecting what zipfile writes until it is drained"""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> Iterator[bytes]:
+        """Yield everything written since the last drain, if anything"""
+        if self._chunks:
+            data = b''.join(self._chunks)
+            self._chunks = []
+            yield data
+
+
+def stream_zip(members: Iterable[Tuple[str, Union[str, bytes]]]) -> Iterator[bytes]:
+    """Yield a ZIP archive of (arcname, path or bytes) members chunk by chunk.
+
+    The archive is never held whole in memory or written to disk: each
+    member is copied in CHUNK_SIZE pieces and the bytes zipfile produces are
+    handed on as soon as they exist. Sizes and CRCs go in data descriptors
+    after each member, which is how zipfile writes to an unseekable stream.
+    """
+    sink = _Sink()
+    with zipfile.ZipFile(sink, 'w', allowZip64=True) as archive:
+        for arcname, source in members:
+            compression = zipfile.ZIP_STORED \
+                if os.path.splitext(arcname)[1].lower() in STORED_EXTENSIONS else zipfile.ZIP_DEFLATED
+            if isinstance(source, bytes):
+                info = zipfile.ZipInfo(arcname, time.localtime()[:6])
+                info.compress_type = compression
+                with archive.open(info, 'w') as dest:
+                    for start in range(0, len(source), CHUNK_SIZE):
+                        dest.write(source[start:start + CHUNK_SIZE])
+                        yield from sink.drain()
+            else:
+                info = zipfile.ZipInfo.from_file(source, arcname)
+                info.compress_type = compression
+                # from_file records the size, so zipfile switches to ZIP64 for huge members itself
+                with open(source, 'rb') as src, archive.open(info, 'w') as dest:
+                    for chunk in iter(lambda: src.read(CHUNK_SIZE), b''):
+                        dest.write(chunk)
+                        yield from sink.drain()
+            yield from sink.drain()
+    yield from sink.drain()
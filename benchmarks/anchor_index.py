@@ -0,0 +1,51 @@
+"""
+Benchmark: AnchorIndex scan time against resume length.
+
+Run with ``python -m benchmarks.anchor_index``. The time per paragraph should
+stay flat as the document grows; the script exits non-zero when it grows by
+more than --max-growth between the smallest and largest document.
+"""
+
+import argparse
+import sys
+import time
+from app.services.document_service import AnchorIndex
+from benchmarks.resumes import build_resume
+
+# One 2x2 table per this many paragraphs, so the scan also descends into cells
+PARAGRAPHS_PER_TABLE = 50
+
+
+def time_scan(doc, repeat: int) -> float:
+    """Best-of-repeat wall time for building an AnchorIndex"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        AnchorIndex(doc)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 2000, 4000, 8000])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--max-growth', type=float, default=2.0,
+                        help='allowed growth of time per paragraph from smallest to largest size')
+    args = parser.parse_args(argv)
+
+    per_paragraph = []
+    print(f"{'paragraphs':>10}  {'scan (ms)':>10}  {'us/paragraph':>12}")
+    for size in args.sizes:
+        doc = build_resume(paragraphs=size, tables=size // PARAGRAPHS_PER_TABLE)
+        elapsed = time_scan(doc, args.repeat)
+        per_paragraph.append(elapsed / size)
+        print(f"{size:>10}  {elapsed * 1000:>10.2f}  {elapsed / size * 1e6:>12.2f}")
+
+    growth = per_paragraph[-1] / per_paragraph[0]
+    print(f"growth in time per paragraph: {growth:.2f}x")
+    return 0 if growth <= args.max_growth else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
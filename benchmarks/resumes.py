@@ -0,0 +1,55 @@
+"""
+Synthetic resumes of controlled size for the benchmarks.
+
+Every resume has three projects laid out the way real ones are: a project
+header, a "Responsibilities" line and a {{PROJECTn_RESP}} placeholder, padded
+with filler paragraphs, tables and embedded images.
+"""
+
+import io
+import random
+import struct
+import zlib
+from docx import Document
+from docx.shared import Inches
+
+
+def build_png(width: int, height: int, seed: int = 0) -> bytes:
+    """Build an RGB PNG of noise, which deflate cannot shrink"""
+    rng = random.Random(seed)
+    rows = b''.join(b'\x00' + rng.randbytes(width * 3) for _ in range(height))
+
+    def chunk(kind, data):
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+
+    return (b'\x89PNG\r\n\x1a\n' +
+            chunk(b'IHDR', struct.pack('>2I5B', width, height, 8, 2, 0, 0, 0)) +
+            chunk(b'IDAT', zlib.compress(rows, 1)) +
+            chunk(b'IEND', b''))
+
+
+def build_resume(paragraphs: int = 100, tables: int = 0, images: int = 0, image_size: int = 256):
+    """Build a resume with the given number of filler paragraphs, tables and images"""
+    doc = Document()
+    for i in range(images):
+        doc.add_picture(io.BytesIO(build_png(image_size, image_size, seed=i)), width=Inches(1))
+
+    per_project = max(paragraphs // 3, 1)
+    for project_num in range(1, 4):
+        doc.add_paragraph(f"Project {project_num}: Example platform").runs[0].font.name = "Arial"
+        doc.add_paragraph("Responsibilities")
+        doc.add_paragraph(f"{{{{PROJECT{project_num}_RESP}}}}", style="List Bullet")
+        for i in range(per_project):
+            doc.add_paragraph(f"Line {i} describing work on distributed systems and data pipelines")
+        # Spread the tables over the projects, earlier projects taking any remainder
+        for _ in range(tables // 3 + (1 if project_num <= tables % 3 else 0)):
+            table = doc.add_table(rows=2, cols=2)
+            for cell in table._cells:
+                cell.text = "Python, Flask, AWS"
+    return doc
+
+
+def save_resume(path: str, **size) -> str:
+    """Build a resume (see build_resume) and save it to path"""
+    build_resume(**size).save(path)
+    return path
@@ -0,0 +1,182 @@
+"""
+Micro-benchmarks for the document and email hot paths.
+
+Run with ``python -m benchmarks.suite``. Results can be saved as a JSON
+baseline with --save and checked against one with --compare; the script exits
+non-zero when any benchmark's median is more than --threshold slower than the
+baseline.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, Iterator, List, Tuple
+from docx import Document
+from app.services.bullet_ranker import BulletRanker
+from app.services.document_service import AnchorIndex, DocumentService
+from app.services.email_service import EmailService
+from app.services.jd_service import JDService
+from app.services.skill_index import skill_catalog
+from benchmarks.resumes import build_png, save_resume
+
+# name -> resume size passed to benchmarks.resumes.build_resume
+RESUMES = {
+    'small': {'paragraphs': 60},
+    'large': {'paragraphs': 2000, 'tables': 30},
+    'images': {'paragraphs': 60, 'images': 8, 'image_size': 512},
+}
+TECH_STACKS = {stack: [f"{stack} bullet {i}" for i in range(1, 7)] for stack in ('Python', 'Flask', 'AWS')}
+
+# (name, setup, run): setup() is untimed and returns the arguments for run()
+Benchmark = Tuple[str, Callable[[], tuple], Callable]
+
+
+def benchmarks(workdir: str) -> Iterator[Benchmark]:
+    """Yield every benchmark, writing its input resumes into workdir"""
+    paths = {name: save_resume(os.path.join(workdir, f"{name}.docx"), **size) for name, size in RESUMES.items()}
+    output = os.path.join(workdir, "output.docx")
+
+    for resume, path in paths.items():
+        for anchor_method in ('placeholders', 'heuristics'):
+            for engine in ('zip', 'python-docx'):
+                yield (
+                    f"inject[{resume}-{anchor_method}-{engine}]",
+                    lambda: (),
+                    lambda path=path, anchor_method=anchor_method, engine=engine:
+                        DocumentService.inject_bullet_points(path, output, TECH_STACKS, anchor_method, engine)
+                )
+
+    bullets = DocumentService._collect_bullets_for_project(TECH_STACKS, 1)
+    for resume in ('small', 'large'):
+        yield (
+            f"insert_via_placeholders[{resume}]",
+            lambda resume=resume: (AnchorIndex(Document(paths[resume])), 1, bullets),
+            DocumentService._insert_via_placeholders
+        )
+        yield (
+            f"insert_via_heuristics[{resume}]",
+            lambda resume=resume: (AnchorIndex(Document(paths[resume])), 1, bullets),
+            DocumentService._insert_via_heuristics
+        )
+
+    def style_pair():
+        doc = Document(paths['small'])
+        return doc.paragraphs[0], doc.add_paragraph("bullet")
+    yield ("copy_paragraph_style", style_pair, DocumentService._copy_paragraph_style)
+
+    many_bullets = [f"Bullet {i} with some text" for i in range(500)]
+    def bulk_anchor():
+        doc = Document(paths['small'])
+        anchor = doc.paragraphs[-1]
+        return anchor, many_bullets, DocumentService._capture_paragraph_style(doc.paragraphs[0])
+    yield ("insert_before[500-bullets]", bulk_anchor, DocumentService._insert_before)
+
+    attachment = os.path.join(workdir, "attachment.png")
+    with open(attachment, 'wb') as f:
+        f.write(build_png(512, 512))
+    for name, attachments in (('text', []), ('file', [attachment]), ('memory', [("resume.docx", b"x" * 512 * 1024)])):
+        yield (
+            f"build_message[{name}]",
+            lambda attachments=attachments: ('from@example.com', 'to@example.com', 'Subject', 'Body', attachments),
+            EmailService._build_message
+        )
+
+    posting = '\n'.join(
+        f"- {verb} {skill} services for the hiring platform with a focus on reliability."
+        for verb in ('Build', 'Own', 'Operate', 'Profile', 'Document', 'Review')
+        for skill in ('Python', 'Flask', 'AWS Lambda', 'PostgreSQL', 'Docker', 'React Native', 'CI/CD')
+    )
+    # Compile the shared index outside the timed runs
+    skill_catalog.index
+    yield ("analyze_jd", lambda: (posting,), JDService.analyze)
+
+    if BulletRanker.available():
+        # 1,000-bullet library ranked against 1,000 JDs in one call
+        stacks = ('Python', 'Flask', 'AWS', 'Docker', 'PostgreSQL')
+        library = {
+            stack: [f"{verb} {stack} {noun} for {team}" for verb in ('Built', 'Tuned', 'Migrated', 'Scaled', 'Secured')
+                    for noun in ('services', 'pipelines', 'dashboards', 'workers', 'APIs')
+                    for team in ('payments', 'search', 'hiring', 'growth', 'billing', 'ads', 'risk', 'data')]
+            for stack in stacks
+        }
+        ranker = BulletRanker().fit(library)
+        jds = [posting] * 1000
+        yield ("rank_bullets[1000-jds]", lambda: (jds, [list(stacks[:3])] * len(jds)), ranker.rank)
+
+
+def measure(setup: Callable[[], tuple], run: Callable, repeat: int) -> Dict[str, float]:
+    """Time run(*setup()) repeat times after one warm-up call"""
+    run(*setup())
+    timings = []
+    for _ in range(repeat):
+        args = setup()
+        start = time.perf_counter()
+        run(*args)
+        timings.append(time.perf_counter() - start)
+    return {'median': statistics.median(timings), 'best': min(timings)}
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], threshold: float) -> List[Tuple[str, float]]:
+    """Return (name, slowdown ratio) for every benchmark more than threshold slower than baseline"""
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        ratio = result['median'] / baseline[name]['median']
+        if ratio > 1 + threshold:
+            regressions.append((name, ratio))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--filter', default='', help='only run benchmarks whose name contains this')
+    parser.add_argument('--save', metavar='PATH', help='write results to a JSON baseline')
+    parser.add_argument('--compare', metavar='PATH', help='compare results against a JSON baseline')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='allowed slowdown of the median against the baseline (0.25 = 25%%)')
+    args = parser.parse_args(argv)
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)['results']
+
+    results = {}
+    with tempfile.TemporaryDirectory(prefix='benchmarks-') as workdir:
+        print(f"{'benchmark':<48}  {'median (ms)':>11}  {'best (ms)':>10}  {'vs baseline':>11}")
+        for name, setup, run in benchmarks(workdir):
+            if args.filter not in name:
+                continue
+            results[name] = measure(setup, run, args.repeat)
+            change = ''
+            if name in baseline:
+                change = f"{results[name]['median'] / baseline[name]['median']:.2f}x"
+            print(f"{name:<48}  {results[name]['median'] * 1000:>11.2f}  "
+                  f"{results[name]['best'] * 1000:>10.2f}  {change:>11}")
+
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, 'w') as f:
+            json.dump({
+                'python': platform.python_version(),
+                'machine': platform.machine(),
+                'repeat': args.repeat,
+                'results': results,
+            }, f, indent=2, sort_keys=True)
+        print(f"saved baseline to {args.save}")
+
+    regressions = compare(results, baseline, args.threshold)
+    for name, ratio in regressions:
+        print(f"REGRESSION {name}: {ratio:.2f}x slower than baseline")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
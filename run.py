@@ -20,7 +20,7 @@ def configure_application():
     configure_logging(log_dir=log_dir)
     
     # Apply proxy fix if behind reverse proxy
-    if os.getenv('BEHIND_PROXY', 'false').lower() == 'true':
+    if app.config['BEHIND_PROXY']:
         app.wsgi_app = ProxyFix(
             app.wsgi_app,
             x_for=1,
@@ -0,0 +1,27 @@
+import pytest
+from app import create_app
+from app.config import Config
+
+@pytest.fixture
+def app(tmp_path):
+    """An app whose folders live under tmp_path.
+
+    create_app configures module-level singletons, so LibreOffice and the
+    caches stay off here to leave them as the other tests expect.
+    """
+    class TestConfig(Config):
+        TESTING = True
+        WTF_CSRF_ENABLED = False
+        UPLOAD_FOLDER = str(tmp_path / 'uploads')
+        DOCUMENT_EXECUTOR = 'thread'
+        EMAIL_OUTBOX_ENABLED = False
+        LIBREOFFICE_POOL_SIZE = 0
+        RESULT_CACHE_DIR = str(tmp_path / 'results')
+        RESULT_CACHE_MAX_BYTES = 0
+        CONVERSION_CACHE_DIR = str(tmp_path / 'conversions')
+        CONVERSION_CACHE_MAX_BYTES = 0
+        ATTACHMENT_CACHE_DIR = str(tmp_path / 'attachments')
+        ATTACHMENT_CACHE_MAX_BYTES = 0
+        OUTBOX_FOLDER = str(tmp_path / 'outbox')
+        JOBS_FOLDER = str(tmp_path / 'job_state')
+    return create_app(TestConfig)
@@ -0,0 +1,89 @@
+import pytest
+import concurrent.futures
+import io
+import json
+import os
+from unittest.mock import patch
+from docx import Document
+from app.services.batch_service import BatchService
+from app.services.result_cache import result_cache
+
+class TestBatchService:
+    def test_cross_product_by_default(self):
+        pairs = list(BatchService.iter_pairs(2, 3))
+        assert pairs == [(0, 0), (0, 1), (0, 2), (1, 0), (1, 1), (1, 2)]
+
+    def test_explicit_mapping(self):
+        assert list(BatchService.iter_pairs(2, 2, [[1, 0], [0, 1]])) == [(1, 0), (0, 1)]
+
+    def test_rejects_out_of_range_mapping(self):
+        with pytest.raises(ValueError):
+            BatchService.iter_pairs(1, 1, [[0, 1]])
+
+    @pytest.mark.parametrize("mapping", [[[0.5, 0]], [[0, True]], [["0", 0]], [{"a": 0, "b": 0}], {"0": 0}])
+    def test_rejects_non_integer_mapping(self, mapping):
+        with pytest.raises(ValueError):
+            BatchService.iter_pairs(1, 1, mapping)
+
+    def test_run_reports_every_item_with_bounded_window(self):
+        submitted = []
+
+        def tasks():
+            for i in range(10):
+                submitted.append(i)
+                yield i, (lambda x: 1 / x), (i,)
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+            results = {}
+            for key, result, error in BatchService.run(tasks(), executor.submit, window=2):
+                # Never more than `window` tasks pulled ahead of the consumer
+                assert len(submitted) - len(results) <= 2
+                results[key] = (result, error)
+
+        assert len(results) == 10
+        assert results[0] == (None, 'division by zero')
+        assert results[4] == (0.25, None)
+
+
+class TestBatchEndpoint:
+    JDS = json.dumps([{"tech_stacks": {"Python": [f"bullet {n}" for n in range(1, 7)]}}])
+
+    def _post(self, app, mapping):
+        buffer = io.BytesIO()
+        Document().save(buffer)
+        buffer.seek(0)
+        return app.test_client().post('/api/batch', data={
+            'resumes[]': (buffer, 'resume.docx'),
+            'jds': self.JDS,
+            'mapping': json.dumps(mapping),
+        }, content_type='multipart/form-data')
+
+    def test_rejects_fractional_index_before_creating_a_workspace(self, app):
+        response = self._post(app, [[0.5, 0]])
+
+        assert response.status_code == 400
+        assert 'Invalid batch request' in response.get_json()['error']
+        assert os.listdir(os.path.join(app.config['UPLOAD_FOLDER'], 'jobs')) == []
+
+    @pytest.mark.parametrize('jds', [
+        {"tech_stacks": {"Python": ["bullet"] * 6}},
+        ["Python"],
+        [{"tech_stacks": ["Python"]}],
+        [{"tech_stacks": {"Python": "bullet"}}],
+        [{"tech_stacks": {"Python": [1, 2, 3, 4, 5, 6]}}],
+    ])
+    def test_rejects_malformed_jds(self, app, jds):
+        self.JDS = json.dumps(jds)
+        response = self._post(app, None)
+
+        assert response.status_code == 400
+        assert 'Invalid batch request' in response.get_json()['error']
+
+    def test_stream_reports_unexpected_errors_and_finishes(self, app):
+        with patch.object(result_cache, 'submit', side_effect=RuntimeError("pool broken")):
+            response = self._post(app, [[0, 0]])
+            body = response.get_data(as_text=True)
+
+        events = [line[len('event: '):] for line in body.splitlines() if line.startswith('event: ')]
+        assert events == ['start', 'error', 'done']
+        assert 'pool broken' in body
@@ -0,0 +1,20 @@
+import pytest
+from app.services.document_service import AnchorIndex
+from benchmarks.resumes import build_resume
+from benchmarks.suite import compare
+
+class TestBenchmarks:
+    def test_synthetic_resume_has_both_anchor_styles(self):
+        doc = build_resume(paragraphs=30, tables=4, images=1, image_size=8)
+        index = AnchorIndex(doc)
+
+        assert all(len(index.placeholders[n]) == 1 for n in range(1, 4))
+        assert set(index.heuristics) == {1, 2, 3}
+        assert len(doc.tables) == 4
+        assert len(doc.inline_shapes) == 1
+
+    def test_compare_flags_only_regressions_past_threshold(self):
+        baseline = {'a': {'median': 1.0}, 'b': {'median': 1.0}, 'c': {'median': 1.0}}
+        results = {'a': {'median': 1.1}, 'b': {'median': 1.5}, 'c': {'median': 0.5}, 'new': {'median': 9.0}}
+
+        assert compare(results, baseline, threshold=0.25) == [('b', 1.5)]
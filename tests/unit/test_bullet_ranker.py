@@ -0,0 +1,115 @@
+import pytest
+import json
+import os
+
+pytest.importorskip('numpy')
+
+from app.services.bullet_ranker import BulletRanker, bullet_library
+from app.services.jd_service import JDService
+
+POSTING = """
+We need a Python engineer to profile Python workers that process documents.
+You will also look after our AWS accounts and Python tooling.
+"""
+
+LIBRARY = {
+    'Python': [
+        'Wrote Django admin tooling for the finance team',
+        'Built Flask REST APIs serving resume uploads',
+        'Tuned pandas ETL jobs for nightly reporting',
+        'Automated Flask deployments with blue-green releases',
+        'Maintained legacy Python 2 scripts',
+        'Profiled Python workers and cut document processing time in half',
+        'Migrated cron scripts to Celery beat',
+        'Added type hints across the Python codebase',
+    ],
+    'AWS': [
+        'Moved batch jobs onto AWS Lambda and S3 triggers',
+        'Cut EC2 spend with reserved instances',
+        'Ran RDS PostgreSQL with automated failover',
+        'Built CloudWatch dashboards and alerts for every service',
+        'Wrote Terraform modules for VPC networking',
+        'Set up IAM least-privilege policies and audits',
+    ],
+    'Go': ['Wrote gRPC services in Go'],
+}
+
+class TestBulletRanker:
+    @pytest.fixture
+    def ranker(self):
+        return BulletRanker().fit(LIBRARY)
+
+    def test_ranks_most_relevant_bullets_first(self, ranker):
+        [stacks] = ranker.rank(['Flask REST APIs for uploads, deployed with Flask'], [['Python']], top_k=2)
+        assert stacks == {'Python': [
+            'Built Flask REST APIs serving resume uploads',
+            'Automated Flask deployments with blue-green releases',
+        ]}
+
+    def test_scores_many_jds_in_one_batch(self, ranker):
+        results = ranker.rank(
+            ['Celery beat schedules', 'IAM policies and audits', 'nothing relevant'],
+            [['Python'], ['AWS', 'Unknown'], ['Go', 'AWS']],
+            top_k=1
+        )
+        assert results == [
+            {'Python': ['Migrated cron scripts to Celery beat']},
+            {'AWS': ['Set up IAM least-privilege policies and audits']},
+            # Ties keep library order; short stacks come back whole
+            {'Go': ['Wrote gRPC services in Go'], 'AWS': ['Moved batch jobs onto AWS Lambda and S3 triggers']},
+        ]
+
+    def test_chunked_scoring_matches_one_batch(self, ranker, monkeypatch):
+        jds = ['Celery beat schedules', 'IAM policies and audits', 'nothing relevant', POSTING, 'Terraform VPC']
+        expected = ranker.rank(jds, top_k=2)
+
+        monkeypatch.setattr('app.services.bullet_ranker.RANK_CHUNK_SIZE', 2)
+
+        assert ranker.rank(jds, top_k=2) == expected
+
+    def test_save_and_load(self, ranker, tmp_path):
+        path = os.path.join(tmp_path, 'index.npz')
+        ranker.save(path)
+        loaded = BulletRanker.load(path)
+
+        jd = ['Profile Python workers; Terraform on AWS']
+        assert loaded.rank(jd) == ranker.rank(jd)
+        assert loaded.stacks == ranker.stacks
+
+class TestBulletLibrary:
+    @pytest.fixture
+    def library(self, tmp_path):
+        path = os.path.join(tmp_path, 'bullets.json')
+        with open(path, 'w') as f:
+            json.dump(LIBRARY, f)
+        bullet_library.library_path = path
+        bullet_library.index_path = os.path.join(tmp_path, 'bullet_index.npz')
+        bullet_library._ranker = None
+        yield bullet_library
+        bullet_library.library_path = None
+        bullet_library._ranker = None
+
+    def test_job_descriptions_use_ranked_library_bullets(self, library, monkeypatch):
+        [jd] = JDService.to_job_descriptions([POSTING])
+
+        assert list(jd.tech_stacks) == ['Python', 'AWS']
+        assert jd.tech_stacks['Python'][0] == 'Profiled Python workers and cut document processing time in half'
+        assert set(jd.tech_stacks['AWS']) == set(LIBRARY['AWS'])
+        assert os.path.exists(library.index_path)
+
+        # A fresh process loads the persisted index instead of refitting
+        library._ranker = None
+        monkeypatch.setattr(BulletRanker, 'fit', lambda self, library: pytest.fail("refitted"))
+        assert library.ranker.stacks == {'Python': (0, 8), 'AWS': (8, 14), 'Go': (14, 15)}
+
+    def test_replaced_library_rebuilds_despite_older_mtime(self, library):
+        assert library.ranker.stacks['Go'] == (14, 15)
+
+        with open(library.library_path, 'w') as f:
+            json.dump({'Go': LIBRARY['Go'] * 2}, f)
+        # e.g. restored from a backup: older than the index it replaces
+        os.utime(library.library_path, (0, 0))
+        library._ranker = None
+
+        assert library.ranker.stacks == {'Go': (0, 2)}
+        assert [name for name in os.listdir(os.path.dirname(library.index_path)) if name.startswith('.tmp-')] == []
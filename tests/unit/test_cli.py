@@ -0,0 +1,117 @@
+import pytest
+import csv
+import json
+import os
+import shutil
+from unittest.mock import patch
+from docx import Document
+from app.cli import Checkpoint, format_summary, read_manifest, run_batch
+from app.services.conversion_service import ConversionService
+
+TECH_STACKS = {
+    "Python": [f"python{i}" for i in range(1, 7)],
+    "AWS": [f"aws{i}" for i in range(1, 7)],
+}
+
+class TestReadManifest:
+    def test_csv_and_jsonl_rows_match(self, tmp_path):
+        with open(os.path.join(tmp_path, "manifest.csv"), "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["resume", "output", "tech_stacks", "email"])
+            writer.writerow(["in/a.docx", "out/a.docx", json.dumps(TECH_STACKS), "a@example.com"])
+        with open(os.path.join(tmp_path, "manifest.jsonl"), "w") as f:
+            f.write(json.dumps({"resume": "in/a.docx", "output": "out/a.docx",
+                                "tech_stacks": TECH_STACKS, "email": "a@example.com"}) + "\n\n")
+
+        rows = read_manifest(os.path.join(tmp_path, "manifest.csv"))
+        assert rows == read_manifest(os.path.join(tmp_path, "manifest.jsonl"))
+        assert rows == [{
+            "resume": os.path.join(tmp_path, "in", "a.docx"),
+            "output": os.path.join(tmp_path, "out", "a.docx"),
+            "tech_stacks": TECH_STACKS,
+            "email": "a@example.com",
+        }]
+
+    def test_rejects_duplicate_outputs(self, tmp_path):
+        path = os.path.join(tmp_path, "manifest.jsonl")
+        with open(path, "w") as f:
+            for _ in range(2):
+                f.write(json.dumps({"resume": "a.docx", "output": "out.docx", "tech_stacks": TECH_STACKS}) + "\n")
+        with pytest.raises(ValueError, match="listed twice"):
+            read_manifest(path)
+
+class TestRunBatch:
+    @pytest.fixture
+    def manifest(self, tmp_path):
+        doc = Document()
+        for n in range(1, 4):
+            doc.add_paragraph(f"{{{{PROJECT{n}_RESP}}}}")
+        doc.save(os.path.join(tmp_path, "resume.docx"))
+        rows = [{"resume": "resume.docx", "output": f"out/{i}.docx", "tech_stacks": TECH_STACKS} for i in range(3)]
+        rows.append({"resume": "missing.docx", "output": "out/missing.docx", "tech_stacks": TECH_STACKS})
+        path = os.path.join(tmp_path, "manifest.jsonl")
+        with open(path, "w") as f:
+            f.write("".join(json.dumps(row) + "\n" for row in rows))
+        return read_manifest(path)
+
+    def test_resumes_from_checkpoint(self, manifest, tmp_path):
+        checkpoint_path = os.path.join(tmp_path, "checkpoint.jsonl")
+        checkpoint = Checkpoint(checkpoint_path)
+        stats = run_batch(manifest, checkpoint, workers=2)
+        checkpoint.close()
+
+        assert (stats["done"], stats["failed"], stats["skipped"]) == (3, 1, 0)
+        assert "python1" in [p.text for p in Document(manifest[0]["output"]).paragraphs]
+        assert "resumes/s" in format_summary(stats)
+
+        # A second run only retries the row that failed
+        with open(checkpoint_path, "a") as f:
+            f.write('{"output": "cut short')
+        checkpoint = Checkpoint(checkpoint_path)
+        stats = run_batch(manifest, checkpoint, workers=2)
+        checkpoint.close()
+        assert (stats["done"], stats["failed"], stats["skipped"]) == (0, 1, 3)
+
+    def test_converts_each_doc_resume_once(self, manifest, tmp_path):
+        os.rename(os.path.join(tmp_path, "resume.docx"), os.path.join(tmp_path, "resume.doc"))
+        rows = [dict(row, resume=os.path.join(tmp_path, "resume.doc")) for row in manifest[:3]]
+        calls = []
+
+        def convert_batch(paths, target_format, output_dir):
+            calls.append(paths)
+            outputs = [os.path.join(output_dir, "resume.docx") for _ in paths]
+            shutil.copy(paths[0], outputs[0])
+            return [(path, output, None) for path, output in zip(paths, outputs)]
+
+        checkpoint = Checkpoint(os.path.join(tmp_path, "checkpoint.jsonl"))
+        with patch.object(ConversionService, "convert_batch", side_effect=convert_batch):
+            stats = run_batch(rows, checkpoint, workers=2)
+        checkpoint.close()
+
+        assert calls == [[os.path.join(tmp_path, "resume.doc")]]
+        assert (stats["done"], stats["failed"]) == (3, 0)
+        assert not os.path.exists(os.path.join(tmp_path, "resume.docx"))
+
+    def test_missing_doc_resume_fails_its_row(self, manifest, tmp_path):
+        shutil.copy(os.path.join(tmp_path, "resume.docx"), os.path.join(tmp_path, "resume.doc"))
+        rows = [dict(row, resume=os.path.join(tmp_path, "resume.doc")) for row in manifest[:2]]
+        rows.append(dict(manifest[3], resume=os.path.join(tmp_path, "missing.doc")))
+
+        def soffice(command, check, timeout):
+            # Stand-in for LibreOffice: the .doc fixture is already a .docx
+            output_dir = command[command.index('--outdir') + 1]
+            for path in command[command.index('--outdir') + 2:]:
+                shutil.copy(path, os.path.join(output_dir, "resume.docx"))
+
+        checkpoint_path = os.path.join(tmp_path, "checkpoint.jsonl")
+        checkpoint = Checkpoint(checkpoint_path)
+        with patch('app.services.conversion_service.subprocess.run', side_effect=soffice):
+            stats = run_batch(rows, checkpoint, workers=2)
+        checkpoint.close()
+
+        assert (stats["done"], stats["failed"]) == (2, 1)
+        assert all(os.path.exists(row["output"]) for row in rows[:2])
+        with open(checkpoint_path) as f:
+            entries = {entry["output"]: entry for entry in map(json.loads, f)}
+        assert entries[rows[2]["output"]]["status"] == "failed"
+        assert "missing.doc" in entries[rows[2]["output"]]["error"]
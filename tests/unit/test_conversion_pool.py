@@ -0,0 +1,91 @@
+import pytest
+import os
+import time
+from unittest.mock import patch, MagicMock
+import logging
+from flask import Flask
+from app.services.conversion_pool import ConversionPool, ConversionTimeout, SofficeInstance
+
+class TestConversionPool:
+    @pytest.fixture
+    def pool(self, tmp_path):
+        pool = ConversionPool()
+        pool.size = 2
+        pool.timeout = 0.5
+        pool.profile_root = str(tmp_path)
+        return pool
+
+    def test_reuses_idle_instance(self, pool):
+        instance = MagicMock()
+        instance.is_healthy.return_value = True
+        with patch.object(pool, '_spawn', return_value=instance) as mock_spawn:
+            pool.convert('a.doc', 'a.docx', 'docx')
+            pool.convert('b.doc', 'b.docx', 'docx')
+
+        assert mock_spawn.call_count == 1
+        assert instance.convert.call_count == 2
+
+    def test_respawns_hung_instance(self, pool):
+        instance = MagicMock()
+        instance.convert.side_effect = lambda *args: time.sleep(2)
+        with patch.object(pool, '_spawn', return_value=instance):
+            with pytest.raises(ConversionTimeout):
+                pool.convert('a.doc', 'a.docx', 'docx')
+
+        instance.kill.assert_called_once()
+        instance.start.assert_called_once()
+        assert pool._idle.qsize() == 1
+
+    def test_restarts_unhealthy_instance_on_checkout(self, pool):
+        pool.size = 1
+        instance = MagicMock()
+        with patch.object(pool, '_spawn', return_value=instance):
+            pool.convert('a.doc', 'a.docx', 'docx')
+            instance.is_healthy.return_value = False
+            pool.convert('b.doc', 'b.docx', 'docx')
+
+        instance.kill.assert_called_once()
+        instance.start.assert_called_once()
+
+    def test_rejects_unknown_format(self, pool):
+        with pytest.raises(ValueError):
+            pool.convert('a.doc', 'a.odt', 'odt')
+
+    def test_replacement_gets_a_fresh_profile(self, pool):
+        pool.size = 1
+        started = []
+        healthy = [True]
+
+        def start(instance):
+            os.makedirs(instance.profile_dir)
+            started.append(instance)
+
+        with patch.object(SofficeInstance, 'start', start), \
+                patch.object(SofficeInstance, 'convert'), \
+                patch.object(SofficeInstance, 'kill'), \
+                patch.object(SofficeInstance, 'is_healthy', lambda instance: healthy[0]):
+            pool.convert('a.doc', 'a.docx', 'docx')
+            # An unhealthy instance that cannot be restarted is discarded
+            healthy[0] = False
+            with patch.object(pool, '_restart', side_effect=RuntimeError("restart failed")):
+                with pytest.raises(RuntimeError):
+                    pool.convert('b.doc', 'b.docx', 'docx')
+            healthy[0] = True
+            pool.convert('c.doc', 'c.docx', 'docx')
+
+        first, replacement = started
+        assert not os.path.exists(first.profile_dir)
+        assert replacement.profile_dir != first.profile_dir
+        assert os.path.isdir(replacement.profile_dir)
+
+    @pytest.mark.parametrize('uno, binary', [(None, '/usr/bin/soffice'), (MagicMock(), None)])
+    def test_warns_when_configured_pool_cannot_run(self, tmp_path, caplog, uno, binary):
+        app = Flask(__name__, instance_path=str(tmp_path))
+        app.config['LIBREOFFICE_POOL_SIZE'] = 2
+        with patch('app.services.conversion_pool.uno', uno), \
+             patch('app.services.conversion_pool.shutil.which', return_value=binary), \
+             caplog.at_level(logging.WARNING, logger='app.services.conversion_pool'):
+            pool = ConversionPool(app)
+
+        assert not pool.enabled
+        assert 'LIBREOFFICE_POOL_SIZE is 2' in caplog.text
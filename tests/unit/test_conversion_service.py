@@ -0,0 +1,92 @@
+import pytest
+import os
+from unittest.mock import patch
+from app.services.conversion_service import ConversionService
+
+class TestConvertBatch:
+    def _inputs(self, folder, names):
+        paths = []
+        for name in names:
+            path = os.path.join(folder, name)
+            with open(path, 'wb') as f:
+                f.write(name.encode())
+            paths.append(path)
+        return paths
+
+    def _fake_soffice(self, failing=()):
+        def run(command, check, timeout):
+            output_dir = command[command.index('--outdir') + 1]
+            for input_path in command[command.index('--outdir') + 2:]:
+                if os.path.basename(input_path) in failing:
+                    continue
+                stem = os.path.splitext(os.path.basename(input_path))[0]
+                with open(os.path.join(output_dir, f"{stem}.{command[3]}"), 'wb') as f:
+                    f.write(b'%PDF')
+        return run
+
+    def test_one_soffice_run_for_the_batch(self, tmp_path):
+        inputs = self._inputs(tmp_path, ['a.docx', 'b.docx', 'c.docx'])
+        out = os.path.join(tmp_path, 'pdf')
+        os.makedirs(out)
+
+        with patch('app.services.conversion_service.subprocess.run', side_effect=self._fake_soffice()) as run:
+            results = ConversionService.convert_batch(inputs, 'pdf', out)
+
+        assert run.call_count == 1
+        assert run.call_args[0][0][-3:] == inputs
+        assert results == [(path, os.path.join(out, f"{name}.pdf"), None) for path, name in zip(inputs, 'abc')]
+
+    def test_reports_failures_per_file(self, tmp_path):
+        inputs = self._inputs(tmp_path, ['good.docx', 'broken.docx', 'old.doc'])
+
+        with patch('app.services.conversion_service.subprocess.run',
+                   side_effect=self._fake_soffice(failing=('broken.docx',))):
+            results = ConversionService.convert_batch(inputs, 'pdf')
+
+        good, broken, wrong_type = results
+        assert good[1] == os.path.join(tmp_path, 'good.pdf') and good[2] is None
+        assert broken[1] is None and 'no output' in broken[2]
+        assert wrong_type[1] is None and '.docx' in wrong_type[2]
+
+    @pytest.mark.parametrize('cached', [False, True])
+    def test_missing_input_fails_alone(self, tmp_path, cached):
+        good = self._inputs(tmp_path, ['a.docx', 'c.docx'])
+        missing = os.path.join(tmp_path, 'b.docx')
+        out = os.path.join(tmp_path, 'pdf')
+        os.makedirs(out)
+
+        with patch('app.services.conversion_service.conversion_cache.cache_dir', os.path.join(tmp_path, 'cache') if cached else None), \
+             patch('app.services.conversion_service.conversion_cache.max_bytes', 1024 * 1024), \
+             patch('app.services.conversion_service.subprocess.run', side_effect=self._fake_soffice()) as run:
+            results = ConversionService.convert_batch([good[0], missing, good[1]], 'pdf', out)
+
+        assert run.call_args[0][0][-2:] == good
+        assert results[0] == (good[0], os.path.join(out, 'a.pdf'), None)
+        assert results[1][1] is None and 'b.docx' in results[1][2]
+        assert results[2] == (good[1], os.path.join(out, 'c.pdf'), None)
+
+    def test_colliding_output_names_are_rejected(self, tmp_path):
+        first = self._inputs(tmp_path, ['resume.docx'])[0]
+        os.makedirs(os.path.join(tmp_path, 'other'))
+        second = self._inputs(os.path.join(tmp_path, 'other'), ['resume.docx'])[0]
+        out = os.path.join(tmp_path, 'pdf')
+        os.makedirs(out)
+
+        with patch('app.services.conversion_service.subprocess.run', side_effect=self._fake_soffice()):
+            results = ConversionService.convert_batch([first, second], 'pdf', out)
+
+        assert results[0][2] is None
+        assert results[1][1] is None and 'already converts' in results[1][2]
+
+    def test_rejects_unknown_format(self, tmp_path):
+        with pytest.raises(ValueError):
+            ConversionService.convert_batch([], 'odt')
+
+    def test_fallback_uses_configured_binary(self, tmp_path):
+        [input_path] = self._inputs(tmp_path, ['a.docx'])
+
+        with patch('app.services.conversion_service.conversion_pool.binary', '/opt/libreoffice/program/soffice'), \
+                patch('app.services.conversion_service.subprocess.run', side_effect=self._fake_soffice()) as run:
+            ConversionService.convert_to_pdf(input_path)
+
+        assert run.call_args[0][0][0] == '/opt/libreoffice/program/soffice'
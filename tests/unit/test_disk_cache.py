@@ -0,0 +1,92 @@
+import pytest
+import os
+import time
+from app.utils.disk_cache import DiskCache
+
+class TestDiskCache:
+    @pytest.fixture
+    def cache(self, tmp_path):
+        return DiskCache(os.path.join(tmp_path, "cache"), max_bytes=1024)
+
+    def _write(self, path, content):
+        with open(path, 'wb') as f:
+            f.write(content)
+        return path
+
+    def test_store_and_fetch(self, cache, tmp_path):
+        src = self._write(os.path.join(tmp_path, "src.docx"), b"converted")
+        dest = os.path.join(tmp_path, "dest.docx")
+
+        assert not cache.fetch("abc.docx", dest)
+        cache.store("abc.docx", src)
+        assert cache.fetch("abc.docx", dest)
+
+        with open(dest, 'rb') as f:
+            assert f.read() == b"converted"
+        assert cache.stats()['hits'] == 1
+        assert cache.stats()['misses'] == 1
+
+    def test_writes_to_a_fetched_file_leave_the_entry_alone(self, cache, tmp_path):
+        cache.store("abc.docx", self._write(os.path.join(tmp_path, "src.docx"), b"converted"))
+        dest = os.path.join(tmp_path, "dest.docx")
+        assert cache.fetch("abc.docx", dest)
+
+        # e.g. Document.save(dest) or soffice overwriting an existing output
+        with open(dest, 'r+b') as f:
+            f.write(b"CHANGED")
+
+        other = os.path.join(tmp_path, "other.docx")
+        assert cache.fetch("abc.docx", other)
+        with open(other, 'rb') as f:
+            assert f.read() == b"converted"
+
+    def test_evicts_least_recently_used(self, cache, tmp_path):
+        now = time.time()
+        for name, age in (("a", 30), ("b", 20)):
+            cache.store(name, self._write(os.path.join(tmp_path, name), b"x" * 400))
+            os.utime(cache._entry_path(name), (now - age, now - age))
+
+        # Reading "a" makes "b" the least recently used entry
+        cache.fetch("a", os.path.join(tmp_path, "a.out"))
+        cache.store("c", self._write(os.path.join(tmp_path, "c"), b"x" * 400))
+
+        assert os.path.exists(cache._entry_path("a"))
+        assert not os.path.exists(cache._entry_path("b"))
+        assert os.path.exists(cache._entry_path("c"))
+        assert cache.stats()['evictions'] == 1
+
+    def test_expires_entries_by_store_time(self, tmp_path):
+        cache = DiskCache(os.path.join(tmp_path, "cache"), max_bytes=1024, ttl=60)
+        for name in ("old", "new"):
+            cache.store(name, self._write(os.path.join(tmp_path, name), b"x"))
+        stale = time.time() - 120
+        os.utime(cache._entry_path("old"), (time.time(), stale))
+
+        assert cache.lookup("old") is None
+        assert not os.path.exists(cache._entry_path("old"))
+        # A hit bumps the access time but leaves the store time alone
+        mtime = os.stat(cache._entry_path("new")).st_mtime
+        assert cache.lookup("new") is not None
+        assert os.stat(cache._entry_path("new")).st_mtime == mtime
+
+    def test_hash_file(self, tmp_path):
+        path = self._write(os.path.join(tmp_path, "f"), b"abc")
+        assert DiskCache.hash_file(path) == \
+            "ba7816bf8f01cfea414140de5dae2223b00361a396177a9cb410ff61f20015ad"
+
+    def test_walks_the_folder_only_when_over_budget(self, cache, tmp_path, monkeypatch):
+        src = self._write(os.path.join(tmp_path, "src"), b"x" * 100)
+        cache.store("first", src)
+
+        walks = []
+        real_walk = os.walk
+        monkeypatch.setattr(os, 'walk', lambda *args: walks.append(args) or real_walk(*args))
+        for i in range(9):
+            cache.store(f"entry{i}", src)
+        assert walks == []
+
+        # The eleventh entry takes the running total over 1024 bytes
+        cache.store("entry9", src)
+        assert len(walks) == 1
+        assert cache.stats()['evictions'] == 2
+        assert not os.path.exists(cache._entry_path("first"))
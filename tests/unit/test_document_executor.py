@@ -0,0 +1,81 @@
+import pytest
+import os
+import threading
+from types import SimpleNamespace
+from app.services.conversion_pool import conversion_pool
+from app.services.document_executor import DocumentExecutor, ExecutorBusy
+
+def _adopt_instance(profile_dir):
+    """Stand in for a soffice instance started by a worker's conversion pool"""
+    os.makedirs(profile_dir)
+    conversion_pool._instances.append(SimpleNamespace(kill=lambda: None, profile_dir=profile_dir))
+    return len(conversion_pool._instances)
+
+_held = threading.Lock()
+
+def _acquire_held():
+    """Stand in for a background thread's lock, held while the pool starts"""
+    return _held.acquire(timeout=1)
+
+class TestDocumentExecutor:
+    def test_runs_in_worker_process(self):
+        executor = DocumentExecutor()
+        executor.max_workers = 1
+        try:
+            assert executor.run(os.getpid) != os.getpid()
+        finally:
+            executor.shutdown()
+
+    def test_workers_do_not_inherit_held_locks(self):
+        executor = DocumentExecutor()
+        executor.max_workers = 1
+        try:
+            with _held:
+                assert executor.run(_acquire_held)
+        finally:
+            executor.shutdown()
+
+    def test_worker_pools_are_shut_down_with_the_executor(self, tmp_path):
+        inherited = SimpleNamespace(kill=lambda: None, profile_dir=str(tmp_path / 'parent'))
+        conversion_pool._instances.append(inherited)
+        executor = DocumentExecutor()
+        executor.max_workers = 1
+        executor._instance_path = str(tmp_path)
+        profile_dir = os.path.join(tmp_path, 'libreoffice_profiles', 'worker')
+        try:
+            # The worker starts from an empty pool rather than the parent's instances
+            assert executor.run(_adopt_instance, profile_dir) == 1
+            assert os.path.isdir(profile_dir)
+        finally:
+            executor.shutdown()
+            conversion_pool._instances.remove(inherited)
+
+        assert not os.path.exists(profile_dir)
+
+    def test_rejects_when_queue_full(self):
+        executor = DocumentExecutor()
+        executor.mode = 'thread'
+        executor.max_workers = 1
+        executor.max_pending = 1
+        executor.queue_timeout = 0.1
+        release = threading.Event()
+        try:
+            executor.submit(release.wait)
+            executor.submit(release.wait)
+            with pytest.raises(ExecutorBusy):
+                executor.submit(release.wait)
+        finally:
+            release.set()
+            executor.shutdown()
+
+    def test_frees_slot_when_task_finishes(self):
+        executor = DocumentExecutor()
+        executor.mode = 'thread'
+        executor.max_workers = 1
+        executor.max_pending = 0
+        executor.queue_timeout = 1
+        try:
+            assert executor.run(len, 'abc') == 3
+            assert executor.run(len, 'abcd') == 4
+        finally:
+            executor.shutdown()
@@ -1,8 +1,12 @@
 import pytest
 from unittest.mock import patch, MagicMock
-from app.services.document_service import DocumentService
+from app.services.document_service import AnchorIndex, DocumentService
 from docx import Document
+import io
 import os
+import struct
+import zipfile
+import zlib
 
 class TestDocumentService:
     @pytest.fixture
@@ -60,4 +64,171 @@ class TestDocumentService:
         
         # Project 2 should get bullets 3-4 from each stack
         result = DocumentService._collect_bullets_for_project(tech_stacks, 2)
-        assert result == ["bullet3", "bullet4", "bullet3", "bullet4"]
\ No newline at end of file
+        assert result == ["bullet3", "bullet4", "bullet3", "bullet4"]
+
+    def test_bulk_insert_matches_per_bullet_insert(self):
+        doc = Document()
+        source = doc.add_paragraph("Project 1: Portal", style='List Bullet')
+        source.runs[0].font.name = 'Arial'
+        anchors = [doc.add_paragraph("Responsibilities"), doc.add_paragraph("Responsibilities")]
+        bullets = ["first", " padded\twith tab ", "", "line\nbreak"]
+
+        for bullet in bullets:
+            DocumentService._copy_paragraph_style(source, anchors[0].insert_paragraph_before(bullet))
+        DocumentService._insert_before(anchors[1], bullets, DocumentService._capture_paragraph_style(source))
+
+        body = list(doc.element.body)
+        one_by_one, bulk = body[1:6], body[6:11]
+        assert [p.xml for p in bulk] == [p.xml for p in one_by_one]
+
+class TestCompiledTemplate:
+    TECH_STACKS = {
+        "Python": [f"py{i}" for i in range(1, 7)],
+        "AWS": [f"aws{i}" for i in range(1, 7)]
+    }
+
+    @pytest.fixture
+    def placeholder_docx(self, tmp_path):
+        doc = Document()
+        for project_num in range(1, 4):
+            doc.add_paragraph(f"Project {project_num}")
+            doc.add_paragraph(f"Duties: {{{{PROJECT{project_num}_RESP}}}}", style="List Bullet")
+        file_path = os.path.join(tmp_path, "placeholders.docx")
+        doc.save(file_path)
+        return file_path
+
+    @pytest.fixture
+    def heuristic_docx(self, tmp_path):
+        doc = Document()
+        for project_num in range(1, 4):
+            doc.add_paragraph(f"Project {project_num}: Platform").runs[0].font.name = "Arial"
+            doc.add_paragraph("Client: Example")
+            doc.add_paragraph("Responsibilities")
+        file_path = os.path.join(tmp_path, "heuristic.docx")
+        doc.save(file_path)
+        return file_path
+
+    def _body_xml(self, path):
+        return Document(path).element.body.xml
+
+    @pytest.mark.parametrize("anchor_method, fixture", [
+        ("placeholders", "placeholder_docx"),
+        ("heuristics", "heuristic_docx"),
+    ])
+    def test_render_many_matches_inject_bullet_points(self, anchor_method, fixture, request, tmp_path):
+        input_path = request.getfixturevalue(fixture)
+        other_stacks = {"Go": [f"go{i}" for i in range(1, 7)]}
+
+        expected = []
+        for i, tech_stacks in enumerate([self.TECH_STACKS, other_stacks]):
+            output_path = os.path.join(tmp_path, f"expected_{i}.docx")
+            DocumentService.inject_bullet_points(input_path, output_path, tech_stacks, anchor_method)
+            expected.append(self._body_xml(output_path))
+
+        outputs = DocumentService.inject_bullet_points_many(
+            input_path,
+            [
+                (os.path.join(tmp_path, "variant_0.docx"), self.TECH_STACKS),
+                (os.path.join(tmp_path, "variant_1.docx"), other_stacks)
+            ],
+            anchor_method
+        )
+
+        assert [self._body_xml(path) for path in outputs] == expected
+
+
+class TestZipDocument:
+    TECH_STACKS = {"Python": [f"py{i}" for i in range(1, 7)]}
+
+    @staticmethod
+    def _png():
+        def chunk(kind, data):
+            return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+        return (b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', struct.pack('>2I5B', 1, 1, 8, 2, 0, 0, 0)) +
+                chunk(b'IDAT', zlib.compress(b'\x00\xff\x00\x00')) + chunk(b'IEND', b''))
+
+    @pytest.fixture
+    def image_docx(self, tmp_path):
+        doc = Document()
+        doc.add_picture(io.BytesIO(self._png()))
+        for project_num in range(1, 4):
+            doc.add_paragraph(f"Project {project_num}: Platform").runs[0].font.name = "Arial"
+            doc.add_paragraph(f"{{{{PROJECT{project_num}_RESP}}}}", style="List Bullet")
+            doc.add_paragraph("Responsibilities")
+        file_path = os.path.join(tmp_path, "image.docx")
+        doc.save(file_path)
+        return file_path
+
+    @pytest.mark.parametrize("anchor_method", ["placeholders", "heuristics"])
+    def test_matches_python_docx_engine(self, image_docx, anchor_method, tmp_path):
+        outputs = {}
+        for engine in ("zip", "python-docx"):
+            outputs[engine] = os.path.join(tmp_path, f"{engine}.docx")
+            DocumentService.inject_bullet_points(
+                image_docx, outputs[engine], self.TECH_STACKS, anchor_method, engine)
+
+        with zipfile.ZipFile(outputs["zip"]) as fast, zipfile.ZipFile(outputs["python-docx"]) as full:
+            assert fast.read("word/document.xml") == full.read("word/document.xml")
+        assert "py1" in [p.text for p in Document(outputs["zip"]).paragraphs]
+
+    def test_bytes_pipeline_matches_file_pipeline(self, image_docx, tmp_path):
+        output_path = os.path.join(tmp_path, "out.docx")
+        DocumentService.inject_bullet_points(image_docx, output_path, self.TECH_STACKS)
+        with open(image_docx, 'rb') as f:
+            output = DocumentService.inject_bullet_points_bytes(f.read(), "image.docx", self.TECH_STACKS)
+
+        with zipfile.ZipFile(io.BytesIO(output)) as in_memory, zipfile.ZipFile(output_path) as on_disk:
+            assert in_memory.read("word/document.xml") == on_disk.read("word/document.xml")
+
+    def test_copies_other_members_without_recompressing(self, image_docx, tmp_path):
+        output_path = os.path.join(tmp_path, "out.docx")
+        DocumentService.inject_bullet_points(image_docx, output_path, self.TECH_STACKS)
+
+        with zipfile.ZipFile(image_docx) as source, zipfile.ZipFile(output_path) as output:
+            assert output.testzip() is None
+            assert output.namelist() == source.namelist()
+            for info in source.infolist():
+                if info.filename == "word/document.xml":
+                    continue
+                copied = output.getinfo(info.filename)
+                assert (copied.CRC, copied.compress_size, copied.compress_type) == \
+                    (info.CRC, info.compress_size, info.compress_type)
+
+class TestAnchorIndex:
+    def test_finds_anchors_inside_tables(self):
+        doc = Document()
+        doc.add_paragraph("{{PROJECT1_RESP}}")
+        cell = doc.add_table(rows=1, cols=1).cell(0, 0)
+        cell.paragraphs[0].text = "Project 2"
+        cell.add_paragraph("Responsibilities")
+        cell.add_paragraph("{{PROJECT3_RESP}}")
+
+        index = AnchorIndex(doc)
+
+        assert [p.text for p in index.placeholders[1]] == ["{{PROJECT1_RESP}}"]
+        assert [p.text for p in index.placeholders[3]] == ["{{PROJECT3_RESP}}"]
+        header, responsibilities = index.heuristics[2]
+        assert (header.text, responsibilities.text) == ("Project 2", "Responsibilities")
+
+    def test_ignores_leading_zero_placeholders(self):
+        doc = Document()
+        doc.add_paragraph("{{PROJECT01_RESP}}")
+        doc.add_paragraph("{{PROJECT2_RESP}}")
+
+        index = AnchorIndex(doc)
+
+        assert index.placeholders[1] == []
+        assert [p.text for p in index.placeholders[2]] == ["{{PROJECT2_RESP}}"]
+
+    def test_heuristic_window(self):
+        doc = Document()
+        doc.add_paragraph("Project 1")
+        for _ in range(5):
+            doc.add_paragraph("filler")
+        doc.add_paragraph("Responsibilities")
+        doc.add_paragraph("Project 1 (continued)")
+        doc.add_paragraph("Responsibilities")
+
+        header, _ = AnchorIndex(doc).heuristics[1]
+
+        assert header.text == "Project 1 (continued)"
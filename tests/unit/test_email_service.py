@@ -1,14 +1,46 @@
 import pytest
 from unittest.mock import patch, MagicMock
 from app.services.email_service import EmailService
+from app.services.attachment_cache import attachment_cache
+from app.services.smtp_pool import smtp_pool
+from email import message_from_bytes
 from email.mime.multipart import MIMEMultipart
+import itertools
+import os
+import smtplib
+import socket
 
 class TestEmailService:
+    @pytest.fixture(autouse=True)
+    def fresh_pool(self):
+        smtp_pool.close_all()
+        yield
+        smtp_pool.close_all()
+
+    @pytest.fixture
+    def attachment(self, tmp_path):
+        path = os.path.join(tmp_path, "test.txt")
+        with open(path, 'w') as f:
+            f.write("attachment")
+        return path
+
+    def _mock_server(self):
+        server = MagicMock()
+        server.noop.return_value = (250, b'OK')
+        server.mail.return_value = (250, b'OK')
+        server.rcpt.return_value = (250, b'OK')
+        # DATA is answered with 354, the end of the message with 250
+        server.getreply.side_effect = itertools.cycle([(354, b'Go ahead'), (250, b'OK')])
+        return server
+
+    def _sent_bytes(self, server):
+        return b''.join(c.args[0] for c in server.send.call_args_list)
+
     @patch('smtplib.SMTP')
-    def test_send_email(self, mock_smtp):
+    def test_send_email(self, mock_smtp, attachment):
         # Setup mock SMTP
-        mock_server = MagicMock()
-        mock_smtp.return_value.__enter__.return_value = mock_server
+        mock_server = self._mock_server()
+        mock_smtp.return_value = mock_server
         
         # Test data
         test_config = {
@@ -24,15 +56,200 @@ class TestEmailService:
             recipient='to@test.com',
             subject='Test',
             body='Test body',
-            attachments=['test.txt'],
+            attachments=[attachment],
             smtp_config=test_config
         )
         
         # Verify SMTP calls
-        mock_smtp.assert_called_with('smtp.test.com', 587)
+        mock_smtp.assert_called_with('smtp.test.com', 587, timeout=30)
         mock_server.starttls.assert_called_once()
         mock_server.login.assert_called_with('user', 'pass')
-        mock_server.send_message.assert_called_once()
+        mock_server.mail.assert_called_once_with('from@test.com')
+        mock_server.rcpt.assert_called_once_with('to@test.com')
+        
+        msg = message_from_bytes(self._sent_bytes(mock_server)[:-len(b'.\r\n')])
+        assert msg['To'] == 'to@test.com'
+        assert msg.get_payload()[1].get_payload(decode=True) == b"attachment"
+
+    @patch('smtplib.SMTP')
+    def test_send_email_reuses_session(self, mock_smtp, attachment):
+        mock_server = self._mock_server()
+        mock_smtp.return_value = mock_server
+        test_config = {
+            'host': 'smtp.test.com',
+            'port': 587,
+            'username': 'user',
+            'password': 'pass',
+            'sender_email': 'from@test.com'
+        }
+
+        for recipient in ['a@test.com', 'b@test.com', 'c@test.com']:
+            EmailService.send_email(recipient, 'Test', 'Test body', [attachment], test_config)
+
+        assert mock_smtp.call_count == 1
+        mock_server.login.assert_called_once()
+        assert mock_server.mail.call_count == 3
+
+    @patch('smtplib.SMTP')
+    def test_send_email_reconnects_dead_session(self, mock_smtp, attachment):
+        dead_server, live_server = self._mock_server(), self._mock_server()
+        dead_server.noop.side_effect = smtplib.SMTPServerDisconnected()
+        mock_smtp.side_effect = [dead_server, live_server]
+        test_config = {
+            'host': 'smtp.test.com',
+            'port': 587,
+            'username': 'user',
+            'password': 'pass',
+            'sender_email': 'from@test.com'
+        }
+
+        EmailService.send_email('a@test.com', 'Test', 'Test body', [attachment], test_config)
+        EmailService.send_email('b@test.com', 'Test', 'Test body', [attachment], test_config)
+
+        assert mock_smtp.call_count == 2
+        live_server.mail.assert_called_once()
+
+    @patch('smtplib.SMTP')
+    def test_drop_after_data_is_not_resent(self, mock_smtp, attachment):
+        server = self._mock_server()
+        # The final '.' went out but the 250 reply never arrived
+        server.getreply.side_effect = [(354, b'Go ahead'), smtplib.SMTPServerDisconnected()]
+        mock_smtp.return_value = server
+        test_config = {
+            'host': 'smtp.test.com',
+            'port': 587,
+            'sender_email': 'from@test.com'
+        }
+
+        with pytest.raises(smtplib.SMTPServerDisconnected):
+            EmailService.send_email('a@test.com', 'Test', 'Test body', [attachment], test_config)
+
+        assert mock_smtp.call_count == 1
+        server.mail.assert_called_once()
+
+    @patch('smtplib.SMTP')
+    def test_drop_before_mail_reconnects(self, mock_smtp, attachment):
+        stale, fresh = self._mock_server(), self._mock_server()
+        stale.ehlo_or_helo_if_needed.side_effect = smtplib.SMTPServerDisconnected()
+        mock_smtp.side_effect = [stale, fresh]
+        test_config = {
+            'host': 'smtp.test.com',
+            'port': 587,
+            'sender_email': 'from@test.com'
+        }
+
+        EmailService.send_email('a@test.com', 'Test', 'Test body', [attachment], test_config)
+
+        stale.mail.assert_not_called()
+        fresh.mail.assert_called_once()
+
+    def test_send_bulk_emails_against_local_server(self, attachment):
+        controller_module = pytest.importorskip('aiosmtpd.controller')
+        received = []
+
+        class Handler:
+            async def handle_DATA(self, server, session, envelope):
+                received.append(envelope)
+                return '250 OK'
+
+        with socket.socket() as sock:
+            sock.bind(('127.0.0.1', 0))
+            port = sock.getsockname()[1]
+        controller = controller_module.Controller(Handler(), hostname='127.0.0.1', port=port)
+        controller.start()
+        try:
+            EmailService.send_bulk_emails(
+                recipients=['a@test.com', 'b@test.com'],
+                subject='Test',
+                body='Test body',
+                attachments_list=[[attachment], [attachment]],
+                smtp_config={
+                    'host': '127.0.0.1',
+                    'port': port,
+                    'username': None,
+                    'password': None,
+                    'sender_email': 'from@test.com',
+                    'use_tls': False
+                }
+            )
+        finally:
+            smtp_pool.close_all()
+            controller.stop()
+
+        assert [e.rcpt_tos for e in received] == [['a@test.com'], ['b@test.com']]
+        msg = message_from_bytes(received[0].original_content)
+        assert msg.get_payload()[1].get_payload(decode=True) == b"attachment"
+
+    @patch('smtplib.SMTP')
+    def test_attachment_encoded_once(self, mock_smtp, tmp_path):
+        mock_smtp.return_value = self._mock_server()
+        large = os.path.join(tmp_path, "large.pdf")
+        content = os.urandom(3 * 1024 * 1024 + 5)
+        with open(large, 'wb') as f:
+            f.write(content)
+        test_config = {
+            'host': 'smtp.test.com',
+            'port': 587,
+            'username': 'user',
+            'password': 'pass',
+            'sender_email': 'from@test.com'
+        }
+        attachment_cache.cache_dir = os.path.join(tmp_path, "cache")
+        attachment_cache.max_bytes = 64 * 1024 * 1024
+        try:
+            with patch.object(attachment_cache, 'encode', wraps=attachment_cache.encode) as mock_encode:
+                for recipient in ['a@test.com', 'b@test.com']:
+                    mock_smtp.return_value.send.reset_mock()
+                    EmailService.send_email(recipient, 'Test', 'Body', [large], test_config)
+        finally:
+            attachment_cache.cache_dir, attachment_cache.max_bytes = None, 0
+
+        assert mock_encode.call_count == 1
+        sent = mock_smtp.return_value.send.call_args_list
+        # The attachment body goes out in bounded chunks, never as one buffer
+        assert max(len(c.args[0]) for c in sent) <= 64 * 1024
+        msg = message_from_bytes(b''.join(c.args[0] for c in sent)[:-len(b'.\r\n')])
+        assert msg.get_payload()[1].get_payload(decode=True) == content
+
+    @patch('smtplib.SMTP')
+    def test_send_email_with_in_memory_attachment(self, mock_smtp):
+        mock_smtp.return_value = self._mock_server()
+        content = os.urandom(100 * 1024)
+        test_config = {'host': 'smtp.test.com', 'port': 587, 'sender_email': 'from@test.com'}
+
+        EmailService.send_email('to@test.com', 'Test', 'Body', [("resume.docx", content)], test_config)
+
+        msg = message_from_bytes(self._sent_bytes(mock_smtp.return_value)[:-len(b'.\r\n')])
+        assert msg.get_payload()[1].get_filename() == "resume.docx"
+        assert msg.get_payload()[1].get_payload(decode=True) == content
+
+    @patch('smtplib.SMTP')
+    def test_missing_attachment_fails_before_mail(self, mock_smtp, attachment, tmp_path):
+        mock_server = self._mock_server()
+        mock_smtp.return_value = mock_server
+        test_config = {'host': 'smtp.test.com', 'port': 587, 'sender_email': 'from@test.com'}
+
+        with pytest.raises(FileNotFoundError):
+            EmailService.send_email('to@test.com', 'Test', 'Body',
+                                    [attachment, os.path.join(tmp_path, "missing.pdf")], test_config)
+
+        mock_server.mail.assert_not_called()
+        mock_server.putcmd.assert_not_called()
+
+    @patch('smtplib.SMTP')
+    def test_failure_during_data_drops_the_connection(self, mock_smtp, attachment):
+        mock_server = self._mock_server()
+        mock_smtp.return_value = mock_server
+        test_config = {'host': 'smtp.test.com', 'port': 587, 'sender_email': 'from@test.com'}
+
+        with patch.object(attachment_cache, 'iter_chunks', side_effect=OSError("read failed")):
+            with pytest.raises(OSError, match="read failed"):
+                EmailService.send_email('to@test.com', 'Test', 'Body', [attachment], test_config)
+
+        mock_server.close.assert_called()
+        # QUIT must not be sent into the open message body before the socket is dropped
+        calls = [name for name, _, _ in mock_server.mock_calls]
+        assert 'quit' not in calls[:calls.index('close')]
 
     @patch('app.services.email_service.EmailService.send_email')
     def test_send_bulk_emails(self, mock_send):
@@ -0,0 +1,161 @@
+import pytest
+import hashlib
+import io
+import os
+from flask import Flask, jsonify, request
+from werkzeug.datastructures import FileStorage
+from app.utils.file_utils import FileUtils
+from app.utils.upload_utils import UploadRequest, blob_folder
+
+class TestSecureSave:
+    def _upload(self, content, filename="resume.docx"):
+        return FileStorage(stream=io.BytesIO(content), filename=filename)
+
+    @pytest.mark.parametrize("allowed", [['doc', 'docx'], ['.doc', '.docx']])
+    def test_accepts_extensions_with_or_without_dot(self, tmp_path, allowed):
+        path = FileUtils.secure_save(self._upload(b"resume"), str(tmp_path), allowed)
+
+        with open(path, 'rb') as f:
+            assert f.read() == b"resume"
+        with pytest.raises(ValueError):
+            FileUtils.secure_save(self._upload(b"x", "resume.exe"), str(tmp_path), allowed)
+
+    def test_identical_uploads_share_one_blob(self, tmp_path):
+        first = FileUtils.secure_save(self._upload(b"same"), str(tmp_path))
+        second = FileUtils.secure_save(self._upload(b"same"), str(tmp_path))
+        FileUtils.secure_save(self._upload(b"other"), str(tmp_path))
+
+        assert first != second
+        assert os.path.samefile(first, second)
+        blobs = os.listdir(blob_folder(str(tmp_path)))
+        assert len(blobs) == 2
+        assert all(name.endswith('.docx') for name in blobs)
+
+        # Removing one request's copy leaves the other intact
+        FileUtils.cleanup_files([first])
+        with open(second, 'rb') as f:
+            assert f.read() == b"same"
+
+class TestUploadRequest:
+    @pytest.fixture
+    def client(self, tmp_path):
+        app = Flask(__name__)
+        app.request_class = UploadRequest
+        app.config.update(
+            UPLOAD_FOLDER=str(tmp_path),
+            UPLOAD_EXTENSIONS=['doc', 'docx'],
+            MAX_UPLOAD_FILE_SIZE=1024,
+        )
+
+        @app.route('/upload', methods=['POST'])
+        def upload():
+            path = FileUtils.secure_save(request.files['resume'], str(tmp_path), ['doc', 'docx'])
+            return jsonify({'path': path})
+
+        return app.test_client()
+
+    def _post(self, client, content, filename):
+        return client.post('/upload', data={'resume': (io.BytesIO(content), filename)},
+                           content_type='multipart/form-data')
+
+    def test_streams_into_content_addressed_blob(self, client, tmp_path):
+        first = self._post(client, b"resume", "cv.docx").get_json()['path']
+        second = self._post(client, b"resume", "cv.docx").get_json()['path']
+
+        assert os.path.samefile(first, second)
+        assert os.listdir(blob_folder(str(tmp_path))) == [hashlib.sha256(b"resume").hexdigest() + '.docx']
+
+    def test_rejects_oversized_upload_while_streaming(self, client, tmp_path):
+        response = self._post(client, b"x" * 4096, "cv.docx")
+
+        assert response.status_code == 413
+        assert os.listdir(blob_folder(str(tmp_path))) == []
+
+    def test_rejects_extension_before_reading_body(self, client, tmp_path):
+        response = self._post(client, b"MZ", "cv.exe")
+
+        assert response.status_code == 415
+        assert not os.path.exists(blob_folder(str(tmp_path)))
+
+    def test_memory_pipeline_keeps_uploads_off_disk(self, client, tmp_path):
+        client.application.config['PIPELINE_MODE'] = 'memory'
+
+        @client.application.route('/read', methods=['POST'])
+        def read():
+            return request.files['resume'].read()
+
+        response = client.post('/read', data={'resume': (io.BytesIO(b"resume"), "cv.docx")},
+                               content_type='multipart/form-data')
+
+        assert response.data == b"resume"
+        assert not os.path.exists(blob_folder(str(tmp_path)))
+
+class TestSendDownload:
+    CONTENT = b"tailored resume " * 64
+
+    @pytest.fixture
+    def client(self, tmp_path):
+        app = Flask(__name__)
+        app.config['UPLOAD_FOLDER'] = str(tmp_path)
+        os.makedirs(os.path.join(tmp_path, 'jobs', 'abc'))
+        with open(os.path.join(tmp_path, 'jobs', 'abc', 'processed_0.docx'), 'wb') as f:
+            f.write(self.CONTENT)
+        os.makedirs(os.path.join(tmp_path, 'blobs'))
+        with open(os.path.join(tmp_path, 'blobs', 'x.docx'), 'wb') as f:
+            f.write(self.CONTENT)
+
+        @app.route('/download/<path:filename>')
+        def download(filename):
+            return FileUtils.send_download(filename, app.config['UPLOAD_FOLDER'])
+
+        return app.test_client()
+
+    def test_strong_etag_and_not_modified(self, client):
+        response = client.get('/download/jobs/abc/processed_0.docx')
+
+        assert response.status_code == 200
+        assert response.data == self.CONTENT
+        assert 'attachment' in response.headers['Content-Disposition']
+        etag = response.headers['ETag']
+        assert not etag.startswith('W/')
+
+        cached = client.get('/download/jobs/abc/processed_0.docx', headers={'If-None-Match': etag})
+        assert cached.status_code == 304
+        assert cached.data == b""
+
+    def test_etag_changes_with_the_file(self, client, tmp_path):
+        path = os.path.join(tmp_path, 'jobs', 'abc', 'processed_0.docx')
+        etag = client.get('/download/jobs/abc/processed_0.docx').headers['ETag']
+        with open(path, 'ab') as f:
+            f.write(b"!")
+
+        response = client.get('/download/jobs/abc/processed_0.docx', headers={'If-None-Match': etag})
+
+        assert response.status_code == 200
+        assert response.headers['ETag'] != etag
+
+    def test_range_request(self, client):
+        response = client.get('/download/jobs/abc/processed_0.docx', headers={'Range': 'bytes=16-31'})
+
+        assert response.status_code == 206
+        assert response.data == self.CONTENT[16:32]
+        assert response.headers['Content-Range'] == f'bytes 16-31/{len(self.CONTENT)}'
+
+    @pytest.mark.parametrize("filename", [
+        "../secret.docx", "jobs/abc/missing.docx", "blobs/x.docx",
+        "./blobs/x.docx", "jobs/../blobs/x.docx", "jobs/abc/../../blobs/x.docx",
+    ])
+    def test_confined_to_upload_folder(self, client, filename):
+        assert client.get(f'/download/{filename}').status_code == 404
+
+    def test_offloads_to_proxy(self, client):
+        client.application.config.update(BEHIND_PROXY=True, DOWNLOAD_OFFLOAD='x-accel')
+
+        response = client.get('/download/jobs/abc/processed_0.docx')
+        assert response.headers['X-Accel-Redirect'] == '/protected-uploads/jobs/abc/processed_0.docx'
+        assert response.data == b""
+
+        cached = client.get('/download/jobs/abc/processed_0.docx',
+                            headers={'If-None-Match': response.headers['ETag']})
+        assert cached.status_code == 304
+        assert 'X-Accel-Redirect' not in cached.headers
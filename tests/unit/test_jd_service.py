@@ -0,0 +1,123 @@
+import pytest
+import io
+import json
+from app.services.jd_service import BULLETS_PER_STACK, JDService
+from app.services.skill_index import SkillIndex, skill_catalog
+
+POSTING = """
+Senior Backend Engineer
+
+Responsibilities:
+- Design and build REST APIs in Python and Flask for our hiring platform.
+- Own Python services end to end, from design reviews to on-call.
+- Write well-tested Python code with pytest and continuous integration.
+- Profile and optimise Python workers that process millions of documents.
+- Deploy containerised services to AWS using Docker and Terraform.
+- Mentor engineers on Python best practices and code review.
+• Automate data pipelines in Python that feed our analytics warehouse.
+• Operate AWS infrastructure including Lambda, S3 and RDS at scale.
+• Build internal tooling on AWS with a focus on cost and reliability.
+• Monitor AWS workloads with CloudWatch dashboards and alerts.
+• Harden AWS accounts with least-privilege IAM policies and audits.
+• Plan AWS capacity with finance and product for yearly growth.
+Nice to have: Kubernetes.
+"""
+
+class TestSkillIndex:
+    @pytest.fixture
+    def index(self):
+        return SkillIndex({
+            'Java': ['java'],
+            'JavaScript': ['javascript', 'js'],
+            'React': ['react', 'reactjs'],
+            'React Native': ['react native'],
+            'C++': ['c++'],
+            '.NET': ['.net', '.net core'],
+        })
+
+    def test_matches_whole_tokens_and_synonyms(self, index):
+        text = "JavaScript (JS) and Java; C++ or .NET Core."
+        assert [(text[start:end], skill) for start, end, skill in index.scan(text)] == [
+            ('JavaScript', 'JavaScript'),
+            ('JS', 'JavaScript'),
+            ('Java', 'Java'),
+            ('C++', 'C++'),
+            ('.NET Core', '.NET'),
+        ]
+
+    def test_prefers_longest_overlapping_phrase(self, index):
+        assert [skill for _, _, skill in index.scan("React Native apps and ReactJS sites")] == \
+            ['React Native', 'React']
+
+    def test_shared_catalog_is_built_once(self):
+        assert skill_catalog.index is skill_catalog.index
+        assert skill_catalog.index.size > 400
+
+class TestJDService:
+    def test_split_sentences_strips_markers(self):
+        sentences = JDService.split_sentences("- Build APIs with Flask daily.\n2) Ship code. Review designs with the team.")
+        assert sentences == ['Build APIs with Flask daily.', 'Ship code.', 'Review designs with the team.']
+        assert [JDService.is_bullet(sentence) for sentence in sentences] == [True, False, True]
+
+    def test_counts_skills_outside_bullets(self):
+        analysis = JDService.analyze("Stack: React, Go\nReactJS")
+        assert analysis['skills'] == {'React': 2}
+        assert analysis['tech_stacks'] == {} and analysis['incomplete'] == {}
+
+    def test_analyze_groups_sentences_into_stacks(self):
+        analysis = JDService.analyze(POSTING)
+
+        assert list(analysis['tech_stacks']) == ['Python', 'AWS']
+        assert all(len(bullets) == BULLETS_PER_STACK for bullets in analysis['tech_stacks'].values())
+        # Each sentence serves a single stack, even when it names several skills
+        python, aws = analysis['tech_stacks'].values()
+        assert not set(python) & set(aws)
+        assert analysis['skills']['Python'] == 6
+        assert analysis['skills']['Flask'] == 1
+        assert analysis['incomplete'] == {'Kubernetes': ['Nice to have: Kubernetes.']}
+
+    @pytest.mark.parametrize("raw_text", [1, None, ['a posting'], {'raw_text': POSTING}])
+    def test_to_job_descriptions_rejects_non_text(self, raw_text):
+        with pytest.raises(ValueError, match="must be a text"):
+            JDService.to_job_descriptions([POSTING, raw_text])
+
+    def test_to_job_description_validates(self):
+        jd = JDService.to_job_description(POSTING)
+        jd.validate_bullet_points()
+        assert jd.raw_text == POSTING
+
+        with pytest.raises(ValueError):
+            JDService.to_job_description("We are hiring a Python developer.")
+
+class TestAnalyzeEndpoint:
+    @pytest.fixture
+    def client(self):
+        from flask import Flask
+        from app.routes.api import api_bp
+        app = Flask(__name__)
+        app.register_blueprint(api_bp, url_prefix='/api')
+        return app.test_client()
+
+    def test_analyzes_one_or_many_postings(self, client):
+        assert client.post('/api/analyze', json={'raw_text': POSTING}).get_json()['skills']['Python'] == 6
+        results = client.post('/api/analyze', json={'jds': [POSTING, 'Kubernetes']}).get_json()['results']
+        assert list(results[1]['skills']) == ['Kubernetes']
+
+    @pytest.mark.parametrize("body", [[POSTING], "a posting", 42, {'jds': 'a posting'}, {'jds': [1]}, {}])
+    def test_rejects_malformed_bodies(self, client, body):
+        response = client.post('/api/analyze', json=body)
+        assert response.status_code == 400
+        assert 'error' in response.get_json()
+
+class TestJobDescriptionFields:
+    def test_process_rejects_non_text_job_descriptions(self, app):
+        data = {'resumes[]': [(io.BytesIO(b'docx'), f'resume{i}.docx') for i in range(3)], 'jds': json.dumps([1, 2, 3])}
+        response = app.test_client().post('/api/process', data=data, content_type='multipart/form-data')
+        assert response.status_code == 400
+        assert 'Invalid job descriptions' in response.get_json()['error']
+
+    def test_batch_rejects_non_text_raw_text(self, app):
+        data = {'resumes[]': (io.BytesIO(b'docx'), 'resume.docx'), 'jds': json.dumps([{'raw_text': 1}])}
+        response = app.test_client().post('/api/batch', data=data, content_type='multipart/form-data')
+        assert response.status_code == 400
+        assert 'Invalid batch request' in response.get_json()['error']
@@ -0,0 +1,114 @@
+import pytest
+import json
+import logging
+import os
+import threading
+import time
+from unittest.mock import patch
+from app.services.job_service import JobManager
+from app.utils.logging_utils import RequestIdFilter, request_id
+
+class TestJobManager:
+    @pytest.fixture
+    def manager(self, tmp_path):
+        manager = JobManager()
+        manager.jobs_folder = str(tmp_path)
+        manager.max_workers = 2
+        yield manager
+        manager.shutdown()
+
+    def _wait(self, manager, job_id):
+        for _ in range(100):
+            job = manager.get(job_id)
+            if job['status'] in ('completed', 'failed'):
+                return job
+            time.sleep(0.01)
+        raise AssertionError("Job did not finish")
+
+    def test_tracks_per_file_results(self, manager):
+        job_id = manager.submit([
+            ('a.docx', lambda x: x.upper(), ('a',)),
+            ('b.docx', lambda x: x.upper(), ('b',)),
+        ])
+
+        job = self._wait(manager, job_id)
+
+        assert job['status'] == 'completed'
+        assert [f['result'] for f in job['files']] == ['A', 'B']
+
+    def test_failed_file_fails_job(self, manager):
+        def boom():
+            raise RuntimeError("conversion failed")
+
+        job = self._wait(manager, manager.submit([('a.docx', boom, ())]))
+
+        assert job['status'] == 'failed'
+        assert job['files'][0]['error'] == "conversion failed"
+
+    def test_tasks_log_under_the_submitting_request_id(self, manager):
+        def boom():
+            raise RuntimeError("conversion failed")
+
+        records = []
+        handler = logging.Handler()
+        handler.addFilter(RequestIdFilter())
+        handler.emit = records.append
+        logger = logging.getLogger('app.services.job_service')
+        logger.addHandler(handler)
+        token = request_id.set('req-123')
+        try:
+            self._wait(manager, manager.submit([('a.docx', boom, ())]))
+        finally:
+            request_id.reset(token)
+            logger.removeHandler(handler)
+
+        assert [r.request_id for r in records if 'conversion failed' in r.getMessage()] == ['req-123']
+
+    def test_expires_finished_jobs(self, manager):
+        job_id = manager.submit([('a.docx', lambda: None, ())])
+        self._wait(manager, job_id)
+
+        manager.ttl = -1
+
+        assert manager.get(job_id) is None
+
+    def test_purge_is_throttled_and_drops_stalled_jobs(self, manager, tmp_path):
+        job_id = manager.submit([('a.docx', lambda: None, ())])
+        self._wait(manager, job_id)
+        # Left 'running' by a worker that died
+        stalled = {'id': 'b' * 32, 'status': 'running', 'workspace': None, 'created_at': 0,
+                   'finished_at': None, 'files': []}
+        path = os.path.join(tmp_path, f"{stalled['id']}.json")
+        with open(path, 'w') as f:
+            json.dump(stalled, f)
+        stamp = time.time() - manager.max_age - 60
+        os.utime(path, (stamp, stamp))
+
+        with patch('app.services.job_service.os.scandir', wraps=os.scandir) as scandir:
+            assert manager.get(job_id)['status'] == 'completed'
+            assert manager.get(stalled['id']) is None
+        scandir.assert_not_called()
+        assert os.path.exists(path)
+
+        manager.purge_expired(force=True)
+        assert not os.path.exists(path)
+        assert manager.get(job_id) is not None
+
+    def test_reports_workspaces_of_unfinished_jobs(self, manager):
+        started = threading.Event()
+        release = threading.Event()
+
+        def slow():
+            started.set()
+            release.wait(5)
+
+        job_id = manager.submit([('a.docx', slow, ())], 'a' * 32)
+        started.wait(5)
+        assert manager.active_workspaces() == {'a' * 32}
+
+        release.set()
+        self._wait(manager, job_id)
+        assert manager.active_workspaces() == set()
+
+    def test_rejects_malformed_job_id(self, manager):
+        assert manager.get('../../etc/passwd') is None
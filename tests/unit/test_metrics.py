@@ -0,0 +1,70 @@
+import pytest
+import logging
+from flask import Flask
+from app.services.document_executor import DocumentExecutor
+from app.utils.logging_utils import RequestIdFilter, init_request_ids, request_id
+from app.utils.metrics import Metrics, metrics
+
+def _record_stage(stage):
+    with metrics.stage(stage):
+        return request_id.get()
+
+class TestMetrics:
+    def test_stage_records_histogram_and_errors(self):
+        registry = Metrics()
+        with registry.stage('inject'):
+            pass
+        with pytest.raises(ValueError):
+            with registry.stage('inject'):
+                raise ValueError("bad resume")
+
+        text = registry.render()
+        assert 'resume_stage_duration_seconds_bucket{stage="inject",le="+Inf"} 2' in text
+        assert 'resume_stage_duration_seconds_count{stage="inject"} 2' in text
+        assert 'resume_stage_errors_total{stage="inject"} 1' in text
+        assert 'resume_stage_in_progress{stage="inject"} 0' in text
+
+    def test_histogram_buckets_are_cumulative(self):
+        registry = Metrics()
+        for value in (0.004, 0.3, 100):
+            registry.observe('latency', value)
+
+        text = registry.render()
+        assert 'latency_bucket{le="0.005"} 1' in text
+        assert 'latency_bucket{le="0.5"} 2' in text
+        assert 'latency_bucket{le="60"} 2' in text
+        assert 'latency_bucket{le="+Inf"} 3' in text
+
+    def test_worker_process_ships_metrics_and_request_id(self):
+        executor = DocumentExecutor()
+        executor.max_workers = 1
+        metrics.drain()
+        token = request_id.set('abc123')
+        try:
+            assert executor.run(_record_stage, 'remote') == 'abc123'
+        finally:
+            request_id.reset(token)
+            executor.shutdown()
+
+        assert 'resume_stage_duration_seconds_count{stage="remote"} 1' in metrics.render()
+
+    def test_endpoint_and_request_id_header(self, caplog):
+        app = Flask(__name__)
+        init_request_ids(app)
+        Metrics(app)
+
+        @app.route('/ping')
+        def ping():
+            logging.getLogger('test').info('handling ping')
+            return 'pong'
+
+        client = app.test_client()
+        caplog.handler.addFilter(RequestIdFilter())
+        with caplog.at_level(logging.INFO):
+            response = client.get('/ping', headers={'X-Request-ID': 'trace-1'})
+        assert response.headers['X-Request-ID'] == 'trace-1'
+        assert [r.request_id for r in caplog.records if r.name == 'test'] == ['trace-1']
+        assert client.get('/ping').headers['X-Request-ID'] != 'trace-1'
+
+        text = client.get('/metrics').get_data(as_text=True)
+        assert 'resume_http_requests_total{endpoint="ping",method="GET",status="200"} 2' in text
@@ -0,0 +1,190 @@
+import pytest
+import itertools
+import os
+import smtplib
+import threading
+import time
+from unittest.mock import patch, MagicMock
+from app.services.attachment_cache import attachment_cache
+from app.services.outbox import EmailOutbox
+
+class TestEmailOutbox:
+    @pytest.fixture
+    def outbox(self, tmp_path):
+        outbox = EmailOutbox()
+        outbox.folder = str(tmp_path)
+        outbox.smtp_config = {'host': 'smtp.test.com', 'port': 587}
+        outbox.max_attempts = 2
+        outbox.backoff_base = 0
+        for state in ('queued', 'sending', 'sent', 'dead'):
+            os.makedirs(os.path.join(tmp_path, state))
+        # Drive deliveries by hand instead of through the background thread
+        with patch.object(outbox, 'ensure_started'):
+            yield outbox
+        outbox.stop()
+
+    @patch('app.services.email_service.EmailService.send_email')
+    def test_delivers_queued_email(self, mock_send, outbox, tmp_path):
+        attachment = os.path.join(tmp_path, 'a.docx')
+        with open(attachment, 'wb') as f:
+            f.write(b'docx')
+        message_id = outbox.enqueue('to@test.com', 'Subject', 'Body', [attachment])
+        assert outbox.status(message_id)['status'] == 'queued'
+        assert outbox.status(message_id)['attachments'] == ['a.docx']
+
+        # The workspace holding the original may be cleaned up before delivery
+        os.remove(attachment)
+        sent = []
+        mock_send.side_effect = lambda *args: sent.append(open(args[3][0], 'rb').read())
+        assert outbox.process_due(wait=True) == 1
+
+        mock_send.assert_called_once()
+        assert os.path.basename(mock_send.call_args.args[3][0]) == 'a.docx'
+        assert sent == [b'docx']
+        assert outbox.status(message_id)['status'] == 'sent'
+        assert not os.path.exists(os.path.join(tmp_path, 'attachments', message_id))
+
+    def test_missing_attachment_is_rejected_at_enqueue(self, outbox, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            outbox.enqueue('to@test.com', 'Subject', 'Body', [os.path.join(tmp_path, 'missing.docx')])
+        assert os.listdir(os.path.join(tmp_path, 'queued')) == []
+
+    @patch('app.services.email_service.EmailService.send_email')
+    def test_delivers_in_memory_attachment(self, mock_send, outbox):
+        message_id = outbox.enqueue('to@test.com', 'Subject', 'Body', [("a.docx", b"\x00docx")])
+        assert outbox.status(message_id)['attachments'] == ["a.docx"]
+
+        outbox.process_due(wait=True)
+
+        mock_send.assert_called_once_with(
+            'to@test.com', 'Subject', 'Body', [("a.docx", b"\x00docx")], outbox.smtp_config)
+
+    @patch('app.services.email_service.EmailService.send_email')
+    def test_retries_then_dead_letters(self, mock_send, outbox):
+        mock_send.side_effect = ConnectionError("mail server down")
+        message_id = outbox.enqueue('to@test.com', 'Subject', 'Body', [])
+
+        outbox.process_due(wait=True)
+        message = outbox.status(message_id)
+        assert (message['status'], message['attempts']) == ('queued', 1)
+
+        outbox.process_due(wait=True)
+        message = outbox.status(message_id)
+        assert (message['status'], message['attempts']) == ('dead', 2)
+        assert message['last_error'] == "mail server down"
+
+    @pytest.mark.parametrize('error, status', [
+        (smtplib.SMTPRecipientsRefused({'to@test.com': (550, b'No such user')}), 'dead'),
+        (smtplib.SMTPRecipientsRefused({'to@test.com': (451, b'Try again later')}), 'queued'),
+        (smtplib.SMTPDataError(554, b'Rejected'), 'dead'),
+        (smtplib.SMTPServerDisconnected('Connection unexpectedly closed'), 'queued'),
+        (FileNotFoundError('resume.docx'), 'dead'),
+    ])
+    @patch('app.services.email_service.EmailService.send_email')
+    def test_only_transient_failures_are_retried(self, mock_send, outbox, error, status):
+        mock_send.side_effect = error
+        outbox.max_attempts = 5
+        message_id = outbox.enqueue('to@test.com', 'Subject', 'Body', [])
+
+        outbox.process_due(wait=True)
+
+        message = outbox.status(message_id)
+        assert (message['status'], message['attempts']) == (status, 1)
+
+    @patch('app.services.email_service.EmailService.send_email')
+    def test_backoff_delays_retry(self, mock_send, outbox):
+        mock_send.side_effect = ConnectionError()
+        outbox.backoff_base = 60
+        outbox.enqueue('to@test.com', 'Subject', 'Body', [])
+
+        outbox.process_due(wait=True)
+
+        with patch('app.services.outbox.json.load') as mock_load:
+            assert outbox.process_due(wait=True) == 0
+        assert mock_send.call_count == 1
+        # A record that is backing off is skipped without being read
+        mock_load.assert_not_called()
+
+    @patch('app.services.email_service.EmailService.send_email')
+    def test_slow_send_does_not_hold_up_the_sweep(self, mock_send, outbox):
+        release = threading.Event()
+        mock_send.side_effect = lambda *args: release.wait(5)
+        outbox.concurrency = 1
+        first = outbox.enqueue('a@test.com', 'Subject', 'Body', [])
+        second = outbox.enqueue('b@test.com', 'Subject', 'Body', [])
+
+        assert outbox.process_due() == 1
+        # The one delivery slot is busy, so nothing more is claimed
+        assert outbox.process_due() == 0
+        release.set()
+        outbox.stop()
+
+        assert outbox.process_due(wait=True) == 1
+        assert {outbox.status(first)['status'], outbox.status(second)['status']} == {'sent'}
+
+    def test_requeues_stale_claims(self, outbox):
+        message_id = outbox.enqueue('to@test.com', 'Subject', 'Body', [])
+        assert outbox._claim(message_id)
+        stale = time.time() - outbox.lease_timeout - 1
+        os.utime(outbox._path('sending', message_id), (stale, stale))
+
+        outbox._requeue_stale()
+
+        assert outbox.status(message_id)['status'] == 'queued'
+
+    @patch('app.services.email_service.EmailService.send_email')
+    def test_prunes_sent_and_dead_records_past_retention(self, mock_send, outbox, tmp_path):
+        attachment = os.path.join(tmp_path, 'a.docx')
+        with open(attachment, 'wb') as f:
+            f.write(b'docx')
+
+        def send(recipient, *args):
+            if recipient == 'b@test.com':
+                raise ConnectionError("mail server down")
+        mock_send.side_effect = send
+        old_sent = outbox.enqueue('a@test.com', 'Subject', 'Body', [("a.docx", b"docx")])
+        dead = outbox.enqueue('b@test.com', 'Subject', 'Body', [attachment])
+        outbox.process_due(wait=True)
+        outbox.process_due(wait=True)
+        assert outbox.status(dead)['status'] == 'dead'
+        assert os.path.isdir(os.path.join(tmp_path, 'attachments', dead))
+        stale = time.time() - outbox.retention - 1
+        for state, message_id in (('sent', old_sent), ('dead', dead)):
+            os.utime(outbox._path(state, message_id), (stale, stale))
+        new_sent = outbox.enqueue('c@test.com', 'Subject', 'Body', [])
+        outbox._pruned = None
+
+        outbox.process_due(wait=True)
+
+        assert outbox.status(old_sent) is None and outbox.status(dead) is None
+        assert outbox.status(new_sent)['status'] == 'sent'
+        assert not os.path.exists(os.path.join(tmp_path, 'attachments', dead))
+
+    def test_outbox_copies_share_encoded_attachment(self, outbox, tmp_path):
+        attachment = os.path.join(tmp_path, 'resume.pdf')
+        with open(attachment, 'wb') as f:
+            f.write(os.urandom(4096))
+        outbox.smtp_config = {'host': 'smtp.test.com', 'port': 587, 'sender_email': 'from@test.com'}
+        def send(config, transmit):
+            server = MagicMock()
+            server.mail.return_value = (250, b'OK')
+            server.rcpt.return_value = (250, b'OK')
+            server.getreply.side_effect = itertools.cycle([(354, b'Go ahead'), (250, b'OK')])
+            transmit(server)
+
+        attachment_cache.cache_dir = os.path.join(tmp_path, 'cache')
+        attachment_cache.max_bytes = 64 * 1024 * 1024
+        attachment_cache.hits = attachment_cache.misses = 0
+        try:
+            with patch('app.services.smtp_pool.smtp_pool.send', side_effect=send):
+                # One delivery at a time, so the second is sure to find the first's entry
+                for recipient in ['a@test.com', 'b@test.com']:
+                    message_id = outbox.enqueue(recipient, 'Subject', 'Body', [attachment])
+                    outbox.process_due(wait=True)
+                    assert outbox.status(message_id)['status'] == 'sent'
+            stats = attachment_cache.stats()
+        finally:
+            attachment_cache.cache_dir, attachment_cache.max_bytes = None, 0
+
+        # Each message links the file into its own folder; both share one entry
+        assert (stats['hits'], stats['misses']) == (1, 1)
@@ -0,0 +1,97 @@
+import pytest
+import os
+import pstats
+from flask import Flask
+from app.routes.admin import admin_bp
+from app.services.document_executor import DocumentExecutor, _run_in_worker
+from app.utils.logging_utils import init_request_ids
+from app.utils.profiling import request_profiler
+
+class TestRequestProfiler:
+    @pytest.fixture
+    def client(self, tmp_path):
+        app = Flask(__name__)
+        app.config.update(
+            PROFILING_ENABLED=True,
+            PROFILE_TOKEN='secret',
+            PROFILE_FOLDER=str(tmp_path),
+            PROFILE_MAX_FILES=10,
+        )
+        init_request_ids(app)
+        request_profiler.init_app(app)
+        app.register_blueprint(admin_bp, url_prefix='/admin')
+        executor = DocumentExecutor()
+        executor.max_workers = 1
+
+        @app.route('/work')
+        def work():
+            return str(executor.run(sum, range(1000)))
+
+        @app.route('/work-twice')
+        def work_twice():
+            return str(executor.run(sum, range(1000)) + executor.run(sum, range(1000)))
+
+        yield app.test_client()
+        executor.shutdown()
+        request_profiler.enabled = False
+
+    def test_captures_request_and_worker(self, client, tmp_path):
+        assert client.get('/work').status_code == 200
+        assert client.get('/work?profile=1').status_code == 200
+        assert os.listdir(tmp_path) == []
+
+        client.get('/work', headers={'X-Profile': '1', 'X-Profile-Token': 'secret', 'X-Request-ID': 'slow'})
+
+        names = {name.split('-', 2)[2]: name for name in os.listdir(tmp_path)}
+        worker = [suffix for suffix in names if suffix.startswith('slow-worker')]
+        assert sorted(names) == sorted(['slow.alloc.txt', 'slow.pstats'] + worker)
+        assert len(worker) == 1
+        pstats.Stats(os.path.join(tmp_path, names['slow.pstats']))
+        pstats.Stats(os.path.join(tmp_path, names[worker[0]]))
+        with open(os.path.join(tmp_path, names['slow.alloc.txt'])) as f:
+            assert f.readline().startswith('Top 25 allocation sites for GET /work')
+
+    def test_ignores_profile_requests_without_a_token(self, client, tmp_path):
+        request_profiler.token = None
+
+        assert client.get('/work?profile=1').status_code == 200
+        assert client.get('/work?profile=1&profile_token=').status_code == 200
+        assert client.get('/admin/profiles').status_code == 404
+        assert os.listdir(tmp_path) == []
+
+    def test_prunes_oldest_captures(self, client, tmp_path):
+        request_profiler.max_files = 4
+        for i in range(4):
+            client.get('/work?profile=1&profile_token=secret', headers={'X-Request-ID': f'r{i}'})
+
+        names = os.listdir(tmp_path)
+        assert len(names) == 4
+        assert not any('-r0' in name for name in names)
+
+    def test_keeps_every_task_of_a_request(self, client, tmp_path):
+        client.get('/work-twice?profile=1&profile_token=secret', headers={'X-Request-ID': 'twice'})
+
+        # Both tasks ran in the single worker; neither capture overwrote the other
+        assert len([name for name in os.listdir(tmp_path) if '-twice-worker' in name]) == 2
+
+    def test_worker_captures_are_pruned(self, tmp_path):
+        for i in range(3):
+            with open(os.path.join(tmp_path, f'old{i}.pstats'), 'w') as f:
+                f.write('x')
+            os.utime(os.path.join(tmp_path, f'old{i}.pstats'), (i, i))
+
+        result, error, _ = _run_in_worker('req', (str(tmp_path), 'label', 2, 0), sum, range(10))
+
+        assert (result, error) == (45, None)
+        capture, kept = sorted(os.listdir(tmp_path))
+        assert capture.startswith('label-worker') and kept == 'old2.pstats'
+
+    def test_admin_routes_require_token(self, client):
+        client.get('/work?profile=1&profile_token=secret', headers={'X-Request-ID': 'listed'})
+
+        assert client.get('/admin/profiles').status_code == 404
+        profiles = client.get('/admin/profiles?token=secret').get_json()['profiles']
+        name = next(p['name'] for p in profiles if p['name'].endswith('listed.pstats'))
+        response = client.get(f'/admin/profiles/{name}', headers={'X-Profile-Token': 'secret'})
+        assert response.status_code == 200
+        assert client.get('/admin/profiles/..%2Fsecret.pstats?token=secret').status_code == 404
@@ -0,0 +1,79 @@
+import pytest
+import os
+from docx import Document
+from app.services.document_executor import document_executor
+from app.services.document_service import DocumentService
+from app.services.result_cache import ResultCache
+
+TECH_STACKS = {'Python': ['Built APIs', 'Wrote tests'], 'AWS': ['Deployed services']}
+
+class TestResultCache:
+    @pytest.fixture
+    def cache(self, tmp_path, monkeypatch):
+        calls = []
+
+        def submit(fn, *args):
+            calls.append(fn)
+            return ResultCache._completed(fn(*args))
+
+        monkeypatch.setattr(document_executor, 'submit', submit)
+        cache = ResultCache(os.path.join(tmp_path, 'cache'), max_bytes=1024 * 1024)
+        cache.calls = calls
+        return cache
+
+    @pytest.fixture
+    def resume(self, tmp_path):
+        path = os.path.join(tmp_path, 'resume.docx')
+        doc = Document()
+        doc.add_paragraph('Experience')
+        for project_num in range(1, 4):
+            doc.add_paragraph(f'{{{{PROJECT{project_num}_RESP}}}}')
+        doc.save(path)
+        return path
+
+    def test_identical_request_skips_injection(self, cache, resume, tmp_path):
+        first = os.path.join(tmp_path, 'first.docx')
+        second = os.path.join(tmp_path, 'second.docx')
+
+        assert cache.submit(DocumentService.inject_bullet_points, resume, first, TECH_STACKS).result() == first
+        assert cache.submit(DocumentService.inject_bullet_points, resume, second, TECH_STACKS).result() == second
+
+        assert len(cache.calls) == 1
+        with open(first, 'rb') as a, open(second, 'rb') as b:
+            assert a.read() == b.read()
+        assert cache.stats() == {'hits': 1, 'misses': 1, 'evictions': 0}
+
+    def test_different_bullets_miss(self, cache, resume, tmp_path):
+        output = os.path.join(tmp_path, 'out.docx')
+        cache.submit(DocumentService.inject_bullet_points, resume, output, TECH_STACKS).result()
+        cache.submit(DocumentService.inject_bullet_points, resume, output, {'Python': ['Built APIs']}).result()
+        cache.submit(DocumentService.inject_bullet_points, resume, output, TECH_STACKS, 'headings').result()
+
+        assert len(cache.calls) == 3
+
+    def test_key_follows_tech_stack_order(self):
+        key = ResultCache.key_for('abc', TECH_STACKS, 'placeholders')
+        assert key == ResultCache.key_for('abc', dict(TECH_STACKS), 'placeholders')
+        # Stack order decides bullet order in the output
+        assert key != ResultCache.key_for('abc', dict(reversed(TECH_STACKS.items())), 'placeholders')
+        assert key != ResultCache.key_for('abc', TECH_STACKS, 'headings')
+        assert key.endswith('.docx')
+
+    def test_bytes_pipeline_is_cached(self, cache, resume):
+        with open(resume, 'rb') as f:
+            data = f.read()
+
+        first = cache.submit(DocumentService.inject_bullet_points_bytes, data, 'resume.docx', TECH_STACKS).result()
+        second = cache.submit(DocumentService.inject_bullet_points_bytes, data, 'resume.docx', TECH_STACKS).result()
+
+        assert first == second
+        assert cache.calls == [DocumentService.inject_bullet_points_bytes]
+
+    def test_disabled_cache_passes_through(self, cache, resume, tmp_path):
+        cache.max_bytes = 0
+        output = os.path.join(tmp_path, 'out.docx')
+        for _ in range(2):
+            cache.submit(DocumentService.inject_bullet_points, resume, output, TECH_STACKS).result()
+
+        assert len(cache.calls) == 2
+        assert not os.path.exists(cache.cache_dir)
@@ -0,0 +1,81 @@
+import pytest
+import concurrent.futures
+import io
+import os
+import threading
+import zipfile
+from unittest.mock import patch
+from docx import Document
+from app.services.email_service import EmailService
+from app.services.result_cache import result_cache
+
+def _resume() -> bytes:
+    doc = Document()
+    for n in range(1, 4):
+        doc.add_paragraph(f"{{{{PROJECT{n}_RESP}}}}")
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+class TestIndexView:
+    def _form(self, with_bullets=True):
+        data = {f'resume{i}': (io.BytesIO(_resume()), f'resume{i}.docx') for i in range(1, 4)}
+        for i in range(1, 4):
+            data[f'jd{i}_stack1'] = 'Python'
+            if with_bullets:
+                data[f'jd{i}_stack1_bullets'] = '\n'.join(f'bullet {n}' for n in range(1, 7))
+        return data
+
+    def test_memory_mode_sends_outputs_directly(self, app):
+        app.config['PIPELINE_MODE'] = 'memory'
+        response = app.test_client().post('/', data=self._form(), content_type='multipart/form-data')
+
+        assert response.status_code == 200
+        assert response.mimetype == 'application/zip'
+        with zipfile.ZipFile(io.BytesIO(response.data)) as archive:
+            assert archive.namelist() == [f'processed_{i}.docx' for i in range(3)]
+        assert not os.path.exists(os.path.join(app.config['UPLOAD_FOLDER'], 'jobs')) or \
+            not os.listdir(os.path.join(app.config['UPLOAD_FOLDER'], 'jobs'))
+
+    def _workspaces(self, app):
+        return os.listdir(os.path.join(app.config['UPLOAD_FOLDER'], 'jobs'))
+
+    def test_rejected_request_removes_its_workspace(self, app):
+        data = self._form()
+        # Resumes 1 and 2 are saved into a new workspace before the missing one is noticed
+        del data['resume3']
+        response = app.test_client().post('/', data=data, content_type='multipart/form-data')
+
+        assert response.status_code == 302
+        assert self._workspaces(app) == []
+
+    def test_failed_request_removes_its_workspace(self, app):
+        response = app.test_client().post('/', data=self._form(with_bullets=False), content_type='multipart/form-data')
+
+        assert response.status_code == 302
+        assert self._workspaces(app) == []
+
+    def test_disk_mode_emails_each_recipient_their_own_resume(self, app):
+        app.config['PIPELINE_MODE'] = 'disk'
+        futures = []
+
+        def submit(fn, input_path, output_path, *args):
+            future = concurrent.futures.Future()
+            futures.append((future, output_path))
+            if len(futures) == 3:
+                # A cache hit for the last resume finishes first, then the others in reverse
+                future.set_result(output_path)
+                for index, delay in ((1, 0.05), (0, 0.1)):
+                    earlier, path = futures[index]
+                    threading.Timer(delay, earlier.set_result, (path,)).start()
+            return future
+
+        data = self._form()
+        for i in range(1, 4):
+            data[f'email{i}'] = f'candidate{i}@example.com'
+        with patch.object(result_cache, 'submit', side_effect=submit), \
+                patch.object(EmailService, 'send_email') as send_email:
+            app.test_client().post('/', data=data, content_type='multipart/form-data')
+
+        sent = sorted((c.args[0], os.path.basename(c.args[3][0])) for c in send_email.call_args_list)
+        assert sent == [(f'candidate{i + 1}@example.com', f'processed_{i}.docx') for i in range(3)]
@@ -0,0 +1,98 @@
+import pytest
+import io
+import os
+import time
+from unittest.mock import patch
+from werkzeug.datastructures import FileStorage
+from app.services.job_service import job_manager
+from app.services.workspace import WorkspaceManager
+from app.utils.file_utils import FileUtils
+from app.utils.metrics import metrics
+from app.utils.upload_utils import blob_folder
+
+class TestWorkspaceManager:
+    @pytest.fixture
+    def manager(self, tmp_path):
+        manager = WorkspaceManager()
+        manager.upload_folder = str(tmp_path)
+        manager.root = os.path.join(tmp_path, 'jobs')
+        manager.max_bytes = 0
+        os.makedirs(manager.root)
+        return manager
+
+    def _fill(self, folder, size, age=0):
+        path = os.path.join(folder, 'processed_0.docx')
+        with open(path, 'wb') as f:
+            f.write(b'x' * size)
+        stamp = time.time() - age
+        os.utime(path, (stamp, stamp))
+        os.utime(folder, (stamp, stamp))
+
+    def test_workspaces_are_isolated(self, manager):
+        first_id, first = manager.create()
+        second_id, second = manager.create()
+
+        assert first != second
+        assert manager.path(first_id) == first
+        assert manager.path('../jobs') is None
+        manager.remove(first_id)
+        assert manager.path(first_id) is None
+        assert os.path.isdir(second)
+
+    def test_sweep_expires_old_workspaces(self, manager):
+        old_id, old = manager.create()
+        new_id, new = manager.create()
+        self._fill(old, 10, age=manager.ttl + 60)
+        self._fill(new, 10)
+
+        assert manager.sweep() == 10
+        assert manager.path(old_id) is None
+        assert manager.path(new_id) == new
+        assert 'resume_upload_folder_bytes 10' in metrics.render()
+
+    def test_quota_evicts_oldest_idle_workspaces(self, manager):
+        manager.max_bytes = 250
+        ids = []
+        for age in (3000, 2000, 1000, 0):
+            workspace_id, folder = manager.create()
+            self._fill(folder, 100, age=age)
+            ids.append(workspace_id)
+
+        assert manager.sweep() == 200
+        assert [manager.path(i) is not None for i in ids] == [False, False, True, True]
+
+    def test_quota_spares_active_workspaces(self, manager):
+        manager.max_bytes = 50
+        workspace_id, folder = manager.create()
+        self._fill(folder, 100)
+
+        assert manager.sweep() == 100
+        assert manager.path(workspace_id) == folder
+
+    def test_workspaces_of_unfinished_jobs_are_kept(self, manager):
+        manager.max_bytes = 50
+        expired_id, expired = manager.create()
+        evictable_id, evictable = manager.create()
+        self._fill(expired, 100, age=manager.ttl + 60)
+        self._fill(evictable, 100, age=1000)
+
+        with patch.object(job_manager, 'active_workspaces', return_value={expired_id, evictable_id}):
+            assert manager.sweep() == 200
+        assert manager.path(expired_id) == expired
+        assert manager.path(evictable_id) == evictable
+
+    def test_unlinked_blobs_are_pruned(self, manager):
+        workspace_id, folder = manager.create()
+        upload = FileStorage(stream=io.BytesIO(b'resume'), filename='resume.docx')
+        saved = FileUtils.secure_save(upload, manager.upload_folder, ['docx'], folder)
+        assert os.path.dirname(saved) == folder
+        blob = os.path.join(blob_folder(manager.upload_folder), os.listdir(blob_folder(manager.upload_folder))[0])
+        stale = time.time() - 3600
+        os.utime(blob, (stale, stale))
+
+        manager.sweep()
+        assert os.path.exists(blob)
+
+        manager.remove(workspace_id)
+        manager.sweep()
+        assert not os.path.exists(blob)
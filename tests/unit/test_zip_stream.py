@@ -0,0 +1,64 @@
+import pytest
+import io
+import os
+import zipfile
+from flask import Flask
+from app.routes.views import main_bp
+from app.services.workspace import workspaces
+from app.utils.zip_stream import CHUNK_SIZE, stream_zip
+
+class TestStreamZip:
+    def test_stores_docx_and_deflates_text(self, tmp_path):
+        docx = os.path.join(tmp_path, 'processed_0.docx')
+        content = os.urandom(3 * CHUNK_SIZE)
+        with open(docx, 'wb') as f:
+            f.write(content)
+
+        chunks = list(stream_zip([('processed_0.docx', docx), ('notes.txt', b'note ' * 1000)]))
+
+        # Bounded chunks: the archive was produced piece by piece, not buffered whole
+        assert len(chunks) > 3
+        assert max(len(chunk) for chunk in chunks) < 2 * CHUNK_SIZE
+        archive = zipfile.ZipFile(io.BytesIO(b''.join(chunks)))
+        assert archive.testzip() is None
+        assert archive.getinfo('processed_0.docx').compress_type == zipfile.ZIP_STORED
+        assert archive.getinfo('notes.txt').compress_type == zipfile.ZIP_DEFLATED
+        assert archive.read('processed_0.docx') == content
+
+    def test_starts_before_reading_later_members(self, tmp_path):
+        first = os.path.join(tmp_path, 'processed_0.docx')
+        with open(first, 'wb') as f:
+            f.write(b'first')
+
+        stream = stream_zip([('processed_0.docx', first), ('processed_1.docx', os.path.join(tmp_path, 'later'))])
+        assert next(stream).startswith(b'PK')
+        # The second member is only opened once the client has taken the first
+        with pytest.raises(FileNotFoundError):
+            list(stream)
+
+class TestBundleRoute:
+    @pytest.fixture
+    def client(self, tmp_path):
+        app = Flask(__name__)
+        app.config['UPLOAD_FOLDER'] = str(tmp_path)
+        app.config['WORKSPACE_JANITOR_INTERVAL'] = 0
+        workspaces.init_app(app)
+        app.register_blueprint(main_bp)
+        return app.test_client()
+
+    def test_bundles_workspace_outputs(self, client):
+        workspace_id, folder = workspaces.create()
+        for name in ('processed_0.docx', 'processed_1.docx', 'resume_1234abcd.docx'):
+            with open(os.path.join(folder, name), 'wb') as f:
+                f.write(name.encode())
+
+        response = client.get(f'/bundle/{workspace_id}')
+
+        assert response.status_code == 200
+        assert response.is_streamed
+        archive = zipfile.ZipFile(io.BytesIO(response.data))
+        assert archive.namelist() == ['processed_0.docx', 'processed_1.docx']
+
+    def test_unknown_workspace(self, client):
+        assert client.get(f'/bundle/{"0" * 32}').status_code == 404
+        assert client.get('/bundle/..').status_code == 404